@@ -0,0 +1,43 @@
+"""
+Compares `Compose.batch` with one `Compose` call per sample for a pipeline of per-voxel transforms.
+
+Usage:
+    python benchmarks/benchmark_batch.py --batch-size 64 --shape 32 32 32 --repeats 5
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+import dicaugment as dca
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=64, help="number of volumes in the batch")
+    parser.add_argument("--shape", type=int, nargs=3, default=(32, 32, 32), help="volume shape (H W D)")
+    parser.add_argument("--repeats", type=int, default=5, help="best of N runs is reported")
+    args = parser.parse_args()
+
+    images = np.random.randint(0, 4096, (args.batch_size,) + tuple(args.shape)).astype(np.uint16)
+    aug = dca.Compose(
+        [
+            dca.HorizontalFlip(),
+            dca.SliceFlip(),
+            dca.RandomBrightnessContrast(),
+            dca.RandomGamma(),
+            dca.InvertImg(),
+            dca.Normalize(mean=2048, std=1024),
+        ]
+    )
+
+    per_sample = min(timeit.repeat(lambda: [aug(image=image) for image in images], number=1, repeat=args.repeats))
+    batched = min(timeit.repeat(lambda: aug.batch(images=images), number=1, repeat=args.repeats))
+
+    print("batch_size={} shape={}".format(args.batch_size, tuple(args.shape)))
+    print("{:>14} {:>12} {:>8}".format("per-sample (s)", "batch (s)", "speedup"))
+    print("{:>14.4f} {:>12.4f} {:>7.1f}x".format(per_sample, batched, per_sample / batched))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Compares the separable mean filter behind `dicaugment.blur` with the dense 3D convolution it replaced.
+
+Usage:
+    python benchmarks/benchmark_blur.py --shape 128 128 64 --repeats 3
+"""
+import argparse
+import timeit
+
+import numpy as np
+from scipy import ndimage
+
+import dicaugment as dca
+
+
+def dense_blur(img: np.ndarray, ksize: int, by_slice: bool) -> np.ndarray:
+    """The previous implementation: a dense normalized kernel passed to `ndimage.convolve`"""
+    kernel = np.ones((ksize, ksize, 1) if by_slice else (ksize,) * 3, dtype=np.float32)
+    kernel /= np.sum(kernel)
+    return ndimage.convolve(img, kernel, mode="constant", cval=0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shape", type=int, nargs=3, default=(128, 128, 64), help="volume shape (H W D)")
+    parser.add_argument("--repeats", type=int, default=3, help="best of N runs is reported")
+    parser.add_argument("--by-slice", action="store_true", help="blur each slice with a 2D kernel")
+    args = parser.parse_args()
+
+    img = np.random.randint(-1024, 3072, args.shape).astype(np.int16)
+
+    print("shape={} by_slice={}".format(tuple(args.shape), args.by_slice))
+    print("{:>5} {:>14} {:>14} {:>8}".format("ksize", "dense (s)", "separable (s)", "speedup"))
+    for ksize in range(3, 16, 2):
+        dense = min(timeit.repeat(lambda: dense_blur(img, ksize, args.by_slice), number=1, repeat=args.repeats))
+        separable = min(
+            timeit.repeat(lambda: dca.blur(img, ksize, by_slice=args.by_slice), number=1, repeat=args.repeats)
+        )
+        print("{:>5} {:>14.4f} {:>14.4f} {:>7.1f}x".format(ksize, dense, separable, dense / separable))
+
+
+if __name__ == "__main__":
+    main()
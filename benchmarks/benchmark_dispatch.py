@@ -0,0 +1,60 @@
+"""
+Measures the time a `Compose` call spends outside of the `apply` methods of its transforms, for a pipeline of
+cheap transforms on small patches with an image and a mask.
+
+The bookkeeping is the time per call of the pipeline minus the time of calling the `apply` methods of its
+transforms directly and making the results contiguous.
+
+Usage:
+    python benchmarks/benchmark_dispatch.py --shape 64 64 64 --number 200 --repeats 5
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+import dicaugment as dca
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shape", type=int, nargs=3, default=(64, 64, 64), help="patch shape (H W D)")
+    parser.add_argument("--number", type=int, default=200, help="calls per run")
+    parser.add_argument("--repeats", type=int, default=5, help="best of N runs is reported")
+    args = parser.parse_args()
+
+    image = np.random.randint(0, 256, tuple(args.shape)).astype(np.uint8)
+    mask = (image > 128).astype(np.uint8)
+    transforms = [
+        dca.HorizontalFlip(p=1),
+        dca.VerticalFlip(p=1),
+        dca.SliceFlip(p=1),
+        dca.Transpose(p=1),
+        dca.InvertImg(p=1),
+        dca.NoOp(),
+    ]
+    aug = dca.Compose(transforms)
+
+    def pipeline():
+        aug(image=image, mask=mask)
+
+    def apply_only():
+        img, msk = image, mask
+        for t in transforms:
+            params = t.update_params(t.get_params(), image=img)
+            img = t.apply(img, **params)
+            msk = t.apply_to_mask(msk, **params) if isinstance(t, dca.DualTransform) else msk
+        # `Compose` returns contiguous arrays
+        np.ascontiguousarray(img)
+        np.ascontiguousarray(msk)
+
+    total = min(timeit.repeat(pipeline, number=args.number, repeat=args.repeats)) / args.number
+    voxels = min(timeit.repeat(apply_only, number=args.number, repeat=args.repeats)) / args.number
+
+    print("shape={} transforms={}".format(tuple(args.shape), len(transforms)))
+    print("{:>14} {:>14} {:>18}".format("call (us)", "apply (us)", "bookkeeping (us)"))
+    print("{:>14.1f} {:>14.1f} {:>18.1f}".format(total * 1e6, voxels * 1e6, (total - voxels) * 1e6))
+
+
+if __name__ == "__main__":
+    main()
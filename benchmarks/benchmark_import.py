@@ -0,0 +1,42 @@
+"""
+Measures the time of `import dicaugment` in a fresh interpreter, as paid by every spawned DataLoader worker, and of
+importing a transform from it. Exits with status 1 if `import dicaugment` takes longer than the budget.
+
+Usage:
+    python benchmarks/benchmark_import.py --repeats 10 --budget-ms 50
+"""
+import argparse
+import subprocess
+import sys
+
+TIMED_IMPORT = "import time; start = time.perf_counter(); {}; print(time.perf_counter() - start)"
+
+
+def _best_time(statement: str, repeats: int) -> float:
+    code = TIMED_IMPORT.format(statement)
+    return min(
+        float(subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout)
+        for _ in range(repeats)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=10, help="best of N interpreters is reported")
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="time allowed for `import dicaugment`")
+    args = parser.parse_args()
+
+    package = _best_time("import dicaugment", args.repeats)
+    transform = _best_time("import dicaugment; dicaugment.Rotate", args.repeats)
+
+    print("{:>24} {:>12}".format("statement", "time (ms)"))
+    print("{:>24} {:>12.1f}".format("import dicaugment", package * 1e3))
+    print("{:>24} {:>12.1f}".format("+ dicaugment.Rotate", transform * 1e3))
+
+    if package * 1e3 > args.budget_ms:
+        print("import dicaugment took longer than the budget of {} ms".format(args.budget_ms))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,155 @@
 from __future__ import absolute_import
 
+import importlib
+from typing import Any, Dict, List, Tuple
+
 __version__ = "1.0.1"
 
-from .augmentations import *
-from .core.composition import *
-from .core.serialization import *
-from .core.transforms_interface import *
-from .core.bbox_utils import BboxParams
-from .core.keypoints_utils import KeypointParams
-
-try:
-    from .pytorch.transforms import *
-except ImportError:
-    # torch is not installed by default, so we import stubs.
-    # Run `pip install -U albumentations[torch] if you need augmentations from torch.`
-    from .pytorch.stubs import *  # type: ignore
-
-try:
-    from .tensorflow.transforms import *
-except ImportError:
-    # tensorflow is not installed by default, so we import stubs.
-    # Run `pip install -U albumentations[tensorflow] if you need augmentations from tensorflow.`
-    from .tensorflow.stubs import *  # type: ignore
+# The public names of the package, imported from their submodule on first access (PEP 562) so that
+# `import dicaugment` does not import cv2, scipy, pydicom or the deep learning frameworks.
+# Where two submodules export the same name, the later one wins, as with `from submodule import *`.
+_EXPORTS: Dict[str, Tuple[str, ...]] = {
+    "augmentations.blur.functional": (
+        "blur", "median_blur", "gaussian_blur",
+    ),
+    "augmentations.blur.transforms": (
+        "Blur", "GaussianBlur", "MedianBlur",
+    ),
+    "augmentations.crops.functional": (
+        "get_random_crop_coords", "random_crop", "crop_bbox_by_coords", "crop_bboxes_by_coords", "bbox_random_crop",
+        "bboxes_random_crop", "crop_keypoint_by_coords", "crop_keypoints_by_coords", "keypoint_random_crop",
+        "keypoints_random_crop", "get_center_crop_coords", "center_crop", "bbox_center_crop", "bboxes_center_crop",
+        "keypoint_center_crop", "keypoints_center_crop", "crop", "bbox_crop", "bboxes_crop", "clamping_crop",
+        "get_clamping_crop_shape", "crop_and_pad", "crop_and_pad_bbox", "crop_and_pad_bboxes",
+        "crop_and_pad_keypoint", "crop_and_pad_keypoints",
+    ),
+    "augmentations.crops.transforms": (
+        "RandomCrop", "CenterCrop", "Crop", "RandomSizedCrop", "RandomCropNearBBox", "RandomSizedBBoxSafeCrop",
+        "CropAndPad", "RandomCropFromBorders", "BBoxSafeRandomCrop",
+    ),
+    "augmentations.dicom.transforms": (
+        "RescaleSlopeIntercept", "SetPixelSpacing", "NPSNoise",
+    ),
+    "augmentations.dicom.functional": (
+        "rescale_slope_intercept", "reset_dicom_slope_intercept", "dicom_scale", "transpose_dicom",
+    ),
+    "augmentations.dropout.coarse_dropout": (
+        "CoarseDropout",
+    ),
+    "augmentations.dropout.functional": (
+        "cutout",
+    ),
+    "augmentations.dropout.grid_dropout": (
+        "GridDropout",
+    ),
+    "augmentations.functional": (
+        "apply_lut", "brightness_contrast_adjust", "compose_luts", "convolve", "downscale", "equalize",
+        "from_float", "gamma_transform", "gauss_noise", "invert", "make_lut", "multiply", "noop", "normalize",
+        "supports_lut", "to_float", "unsharp_mask",
+    ),
+    "augmentations.geometric.functional": (
+        "pad", "pad_with_params", "bbox_rot90", "bboxes_rot90", "keypoint_rot90", "keypoints_rot90", "rotate",
+        "warp_affine", "get_rotate_affine", "get_shift_scale_rotate_affine", "get_scale_affine", "get_flip_affine",
+        "bbox_rotate", "bboxes_rotate", "keypoint_rotate", "keypoints_rotate", "shift_scale_rotate",
+        "keypoint_shift_scale_rotate", "keypoints_shift_scale_rotate", "bbox_shift_scale_rotate",
+        "bboxes_shift_scale_rotate", "resize", "scale", "keypoint_scale", "keypoints_scale", "py3round",
+        "_func_max_size", "longest_max_size", "smallest_max_size", "bbox_flip", "bboxes_flip", "bbox_hflip",
+        "bboxes_hflip", "bbox_transpose", "bbox_vflip", "bboxes_vflip", "bbox_zflip", "bboxes_zflip", "hflip",
+        "vflip", "zflip", "transpose", "keypoint_flip", "keypoints_flip", "keypoint_hflip", "keypoints_hflip",
+        "keypoint_transpose", "keypoints_transpose", "keypoint_vflip", "keypoints_vflip", "keypoint_zflip",
+        "keypoints_zflip",
+    ),
+    "augmentations.geometric.resize": (
+        "RandomScale", "LongestMaxSize", "SmallestMaxSize", "Resize",
+    ),
+    "augmentations.geometric.rotate": (
+        "Rotate", "RandomRotate90",
+    ),
+    "augmentations.geometric.transforms": (
+        "ShiftScaleRotate", "VerticalFlip", "HorizontalFlip", "SliceFlip", "Flip", "Transpose", "PadIfNeeded",
+    ),
+    "augmentations.transforms": (
+        "Normalize", "RandomGamma", "GaussNoise", "InvertImg", "ToFloat", "FromFloat", "RandomBrightnessContrast",
+        "Equalize", "Posterize", "Downscale", "Sharpen", "UnsharpMask", "PixelDropout",
+    ),
+    "augmentations.utils": (
+        "read_dcm_image", "cache_dcm_image", "read_cached_dcm_image", "MAX_VALUES_BY_DTYPE", "MIN_VALUES_BY_DTYPE",
+        "NPDTYPE_TO_OPENCV_DTYPE", "NPDTYPE_TO_OPENCV_DTYPE", "clipped", "angle_2pi_range", "clip",
+        "preserve_shape", "preserve_channel_dim", "ensure_contiguous", "is_rgb_image", "is_grayscale_image",
+        "is_multispectral_image", "get_num_channels", "non_rgb_warning", "_maybe_process_in_chunks",
+        "_maybe_process_by_channel", "_maybe_process_in_slabs", "_stack_batch_param", "set_num_threads",
+        "get_num_threads", "inplace_mode", "is_inplace", "set_precision", "get_precision",
+    ),
+    "core.composition": (
+        "BaseCompose", "Compose", "SomeOf", "OneOf", "OneOrOther", "ReplayCompose", "ReplayRecord",
+        "CompiledReplay", "Sequential",
+    ),
+    "core.lazy": (
+        "LazyVolume", "ShapeOnlyVolume", "PixelDataUnavailableError",
+    ),
+    "core.replay_log": (
+        "ReplayLog",
+    ),
+    "core.serialization": (
+        "to_dict", "from_dict", "save", "load",
+    ),
+    "core.transforms_interface": (
+        "to_tuple", "BasicTransform", "DualTransform", "ImageOnlyTransform", "NoOp", "BoxType", "KeypointType",
+        "ImageColorType", "ScaleFloatType", "ScaleIntType", "ImageColorType", "INTER_NEAREST", "INTER_LINEAR",
+        "INTER_QUADRATIC", "INTER_CUBIC", "INTER_QUARTIC", "INTER_QUINTIC",
+    ),
+    "core.bbox_utils": ("BboxParams",),
+    "core.keypoints_utils": ("KeypointParams",),
+}
+
+# Framework adapters, imported from the first of their submodules that can be imported. The stubs raise an
+# `ImportError` when the adapter is used without the framework installed.
+_ADAPTERS: Dict[str, Tuple[str, ...]] = {
+    "ToPytorch": ("pytorch.transforms", "pytorch.stubs"),
+    "ToTensorflow": ("tensorflow.transforms", "tensorflow.stubs"),
+}
+
+# the submodules of the package, and those of `augmentations` that are also available from it, e.g.
+# `dicaugment.functional`
+_SUBMODULES = ("augmentations", "core", "pytorch", "random_utils", "tensorflow")
+_SUBMODULE_ALIASES = ("crops", "dicom", "dropout", "functional", "geometric", "transforms", "utils")
+
+_LAZY_NAMES: Dict[str, str] = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__: List[str] = list(_LAZY_NAMES) + list(_ADAPTERS)
+
+
+def _load(name: str) -> Any:
+    if name in _LAZY_NAMES:
+        return getattr(importlib.import_module("." + _LAZY_NAMES[name], __name__), name)
+
+    for module in _ADAPTERS[name][:-1]:
+        try:
+            return getattr(importlib.import_module("." + module, __name__), name)
+        except ImportError:
+            pass
+    return getattr(importlib.import_module("." + _ADAPTERS[name][-1], __name__), name)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_NAMES or name in _ADAPTERS:
+        value = _load(name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module("." + name, __name__)
+    elif name in _SUBMODULE_ALIASES:
+        value = importlib.import_module(".augmentations." + name, __name__)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__) | set(_SUBMODULES) | set(_SUBMODULE_ALIASES))
+
+
+def _import_all() -> None:
+    """Imports every public name of the package, which registers all transforms for deserialization"""
+    for name in __all__:
+        if name not in globals():
+            __getattr__(name)
@@ -1,19 +1,32 @@
-# Common classes
-from .blur.functional import *
-from .blur.transforms import *
-from .crops.functional import *
-from .crops.transforms import *
-from .dicom.transforms import *
-from .dicom.functional import *
-
-# New transformations goes to individual files listed below
-from .dropout.coarse_dropout import *
-from .dropout.functional import *
-from .dropout.grid_dropout import *
-from .functional import *
-from .geometric.functional import *
-from .geometric.resize import *
-from .geometric.rotate import *
-from .geometric.transforms import *
-from .transforms import *
-from .utils import *
+import importlib
+from typing import Any, Dict, List
+
+from .. import _EXPORTS
+
+# the public names of the augmentation submodules, imported on first access as in `dicaugment/__init__.py`
+_LAZY_NAMES: Dict[str, str] = {
+    name: module[len("augmentations") :]
+    for module, names in _EXPORTS.items()
+    if module.startswith("augmentations.")
+    for name in names
+}
+
+# the submodules of the package, imported on first access, e.g. `dicaugment.augmentations.geometric.functional`
+_SUBMODULES = ("blur", "crops", "dicom", "dropout", "functional", "geometric", "transforms", "utils")
+
+__all__: List[str] = list(_LAZY_NAMES)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_NAMES:
+        value = getattr(importlib.import_module(_LAZY_NAMES[name], __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module("." + name, __name__)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__) | set(_SUBMODULES))
@@ -1,16 +1,16 @@
 from itertools import product
 from math import ceil
-from typing import Sequence, Union
+from typing import Optional, Sequence, Union
 
 import cv2
 import numpy as np
 from scipy import ndimage
 
-from dicaugment.augmentations.functional import convolve
 from dicaugment.augmentations.geometric.functional import scale
 from dicaugment.augmentations.utils import (
     _maybe_process_in_chunks,
     _maybe_process_by_channel,
+    _maybe_process_in_slabs,
     clipped,
     preserve_shape,
 )
@@ -23,14 +23,17 @@ __all__ = [
 
 
 @preserve_shape
+@clipped
 def blur(
     img: np.ndarray,
     ksize: int,
     by_slice: bool = False,
     mode: str = "constant",
     cval: Union[float, int] = 0,
+    num_threads: Optional[int] = None,
 ) -> np.ndarray:
-    """Blur the input image using an mean kernel.
+    """Blur the input image using an mean kernel. The mean kernel is separable, so it is applied as one
+    1D pass per axis.
 
     Args:
         ksize (int): The kernel size for blurring the input image.
@@ -48,15 +51,51 @@ def blur(
 
             Default: `constant`
         cval (int,float): The fill value when mode = `constant`. Default: 0
+        num_threads (int): the number of worker threads used to process the channels and overlapping z-slabs of the
+            image. If None, `dicaugment.get_num_threads()` is used. Default: None
 
     """
-    if by_slice:
-        kernel = np.ones((ksize, ksize, 1), dtype=np.float32)
-    else:
-        kernel = np.ones((ksize,) * 3, dtype=np.float32)
-    kernel /= np.sum(kernel)
+    axes = (0, 1) if by_slice else (0, 1, 2)
+    blur_fn = _maybe_process_in_slabs(
+        _box_filter,
+        halo=0 if by_slice else ksize // 2,
+        num_threads=num_threads,
+        ksize=ksize,
+        axes=axes,
+        mode=mode,
+        cval=cval,
+        # float32 cannot hold the mean of larger integers precisely enough to truncate it exactly
+        output=np.float32 if img.dtype == np.float32 else np.float64,
+    )
+    return blur_fn(img)
 
-    return convolve(img, kernel=kernel, mode=mode, cval=cval)
+
+def _box_filter(
+    img: np.ndarray,
+    ksize: int,
+    axes: Sequence[int],
+    mode: str,
+    cval: Union[float, int],
+    output: Union[np.dtype, type, np.ndarray],
+) -> np.ndarray:
+    """
+    Mean filter over `axes` computed as one `correlate1d` pass of ones per axis, which costs O(ksize) per voxel
+    instead of the O(ksize^3) of a dense convolution. Even kernel sizes are aligned like `ndimage.convolve`.
+    As with the Scipy filters, `output` is the dtype of the output or an array the result is written into.
+
+    The passes accumulate sums in float64, which are exact for integer images, and the sums are divided by the
+    size of the kernel once at the end, so integer images are truncated when cast back as with a dense kernel.
+    """
+    origin = 0 if ksize % 2 else -1
+    weights = np.ones(ksize)
+    sums = img
+    for axis in axes:
+        sums = ndimage.correlate1d(sums, weights, axis=axis, output=np.float64, mode=mode, cval=cval, origin=origin)
+        # the border of the next pass sums `ksize` fill values
+        cval = cval * ksize
+    if isinstance(output, np.ndarray):
+        return np.divide(sums, ksize ** len(axes), out=output)
+    return np.divide(sums, ksize ** len(axes), out=sums).astype(output, copy=False)
 
 
 @preserve_shape
@@ -66,6 +105,7 @@ def median_blur(
     by_slice: bool = False,
     mode: str = "constant",
     cval: Union[float, int] = 0,
+    num_threads: Optional[int] = None,
 ) -> np.ndarray:
     """Blur the input image using median blue technique.
 
@@ -85,13 +125,19 @@ def median_blur(
 
             Default: `constant`
         cval (int,float): The fill value when mode = `constant`. Default: 0
+        num_threads (int): the number of worker threads used to process the channels and overlapping z-slabs of the
+            image. If None, `dicaugment.get_num_threads()` is used. Default: None
 
     """
-    if by_slice:
-        ksize = (ksize, ksize, 1)
-
-    blur_fn = _maybe_process_by_channel(
-        ndimage.median_filter, size=ksize, mode=mode, cval=cval
+    size = (ksize, ksize, 1) if by_slice else (ksize, ksize, ksize)
+
+    blur_fn = _maybe_process_in_slabs(
+        ndimage.median_filter,
+        halo=size[2] // 2,
+        num_threads=num_threads,
+        size=size,
+        mode=mode,
+        cval=cval,
     )
     return blur_fn(img)
 
@@ -104,6 +150,7 @@ def gaussian_blur(
     by_slice: bool = False,
     mode: str = "constant",
     cval: Union[float, int] = 0,
+    num_threads: Optional[int] = None,
 ) -> np.ndarray:
     """Blur the input image using a Gaussian kernel.
 
@@ -124,6 +171,8 @@ def gaussian_blur(
 
             Default: `constant`
         cval (int,float): The fill value when mode = `constant`. Default: 0
+        num_threads (int): the number of worker threads used to process the channels and overlapping z-slabs of the
+            image. If None, `dicaugment.get_num_threads()` is used. Default: None
 
     """
     if ksize == 0:
@@ -137,7 +186,13 @@ def gaussian_blur(
     else:
         radius = ((ksize - 1) // 2,) * 3
 
-    blur_fn = _maybe_process_by_channel(
-        ndimage.gaussian_filter, sigma=sigma, radius=radius, mode=mode, cval=cval
+    blur_fn = _maybe_process_in_slabs(
+        ndimage.gaussian_filter,
+        halo=radius[2],
+        num_threads=num_threads,
+        sigma=sigma,
+        radius=radius,
+        mode=mode,
+        cval=cval,
     )
     return blur_fn(img)
@@ -8,7 +8,12 @@ from dicaugment.augmentations.utils import (
     preserve_channel_dim,
 )
 
-from ...core.bbox_utils import denormalize_bbox, normalize_bbox
+from ...core.bbox_utils import (
+    denormalize_bbox,
+    denormalize_bboxes_array,
+    normalize_bbox,
+    normalize_bboxes_array,
+)
 from ...core.transforms_interface import BoxInternalType, KeypointInternalType
 from ..geometric import functional as FGeometric
 
@@ -16,19 +21,29 @@ __all__ = [
     "get_random_crop_coords",
     "random_crop",
     "crop_bbox_by_coords",
+    "crop_bboxes_by_coords",
     "bbox_random_crop",
+    "bboxes_random_crop",
     "crop_keypoint_by_coords",
+    "crop_keypoints_by_coords",
     "keypoint_random_crop",
+    "keypoints_random_crop",
     "get_center_crop_coords",
     "center_crop",
     "bbox_center_crop",
+    "bboxes_center_crop",
     "keypoint_center_crop",
+    "keypoints_center_crop",
     "crop",
     "bbox_crop",
+    "bboxes_crop",
     "clamping_crop",
+    "get_clamping_crop_shape",
     "crop_and_pad",
     "crop_and_pad_bbox",
+    "crop_and_pad_bboxes",
     "crop_and_pad_keypoint",
+    "crop_and_pad_keypoints",
 ]
 
 
@@ -166,6 +181,24 @@ def crop_bbox_by_coords(
     return normalize_bbox(cropped_bbox, crop_height, crop_width, crop_depth)
 
 
+def crop_bboxes_by_coords(
+    bboxes: np.ndarray,
+    crop_coords: Tuple[int, int, int, int, int, int],
+    crop_height: int,
+    crop_width: int,
+    crop_depth: int,
+    rows: int,
+    cols: int,
+    slices: int,
+) -> np.ndarray:
+    """Crop an array of bounding boxes of shape `(N, 6)`. See `crop_bbox_by_coords`."""
+    x1, y1, z1 = crop_coords[:3]
+    bboxes = denormalize_bboxes_array(bboxes, rows, cols, slices)
+    return normalize_bboxes_array(
+        bboxes - np.array([x1, y1, z1, x1, y1, z1]), crop_height, crop_width, crop_depth
+    )
+
+
 def bbox_random_crop(
     bbox: BoxInternalType,
     crop_height: int,
@@ -212,6 +245,35 @@ def bbox_random_crop(
     )
 
 
+def bboxes_random_crop(
+    bboxes: np.ndarray,
+    crop_height: int,
+    crop_width: int,
+    crop_depth: int,
+    h_start: float,
+    w_start: float,
+    d_start: float,
+    rows: int,
+    cols: int,
+    slices: int,
+) -> np.ndarray:
+    """Crop an array of bounding boxes of shape `(N, 6)`. See `bbox_random_crop`."""
+    crop_coords = get_random_crop_coords(
+        rows,
+        cols,
+        slices,
+        crop_height,
+        crop_width,
+        crop_depth,
+        h_start,
+        w_start,
+        d_start,
+    )
+    return crop_bboxes_by_coords(
+        bboxes, crop_coords, crop_height, crop_width, crop_depth, rows, cols, slices
+    )
+
+
 def crop_keypoint_by_coords(
     keypoint: KeypointInternalType, crop_coords: Tuple[int, int, int, int, int, int]
 ):  # skipcq: PYL-W0613
@@ -231,6 +293,14 @@ def crop_keypoint_by_coords(
     return x - x1, y - y1, z - z1, angle, scale
 
 
+def crop_keypoints_by_coords(
+    keypoints: np.ndarray, crop_coords: Tuple[int, int, int, int, int, int]
+) -> np.ndarray:
+    """Crop an array of keypoints of shape `(N, 5)`. See `crop_keypoint_by_coords`."""
+    x1, y1, z1 = crop_coords[:3]
+    return keypoints[:, :5] - np.array([x1, y1, z1, 0, 0])
+
+
 def keypoint_random_crop(
     keypoint: KeypointInternalType,
     crop_height: int,
@@ -275,6 +345,33 @@ def keypoint_random_crop(
     return crop_keypoint_by_coords(keypoint, crop_coords)
 
 
+def keypoints_random_crop(
+    keypoints: np.ndarray,
+    crop_height: int,
+    crop_width: int,
+    crop_depth: int,
+    h_start: float,
+    w_start: float,
+    d_start: float,
+    rows: int,
+    cols: int,
+    slices: int,
+) -> np.ndarray:
+    """Crop an array of keypoints of shape `(N, 5)`. See `keypoint_random_crop`."""
+    crop_coords = get_random_crop_coords(
+        rows,
+        cols,
+        slices,
+        crop_height,
+        crop_width,
+        crop_depth,
+        h_start,
+        w_start,
+        d_start,
+    )
+    return crop_keypoints_by_coords(keypoints, crop_coords)
+
+
 def get_center_crop_coords(
     height: int,
     width: int,
@@ -371,6 +468,24 @@ def bbox_center_crop(
     )
 
 
+def bboxes_center_crop(
+    bboxes: np.ndarray,
+    crop_height: int,
+    crop_width: int,
+    crop_depth: int,
+    rows: int,
+    cols: int,
+    slices: int,
+) -> np.ndarray:
+    """Crop an array of bounding boxes of shape `(N, 6)` around the center of the image. See `bbox_center_crop`."""
+    crop_coords = get_center_crop_coords(
+        rows, cols, slices, crop_height, crop_width, crop_depth
+    )
+    return crop_bboxes_by_coords(
+        bboxes, crop_coords, crop_height, crop_width, crop_depth, rows, cols, slices
+    )
+
+
 def keypoint_center_crop(
     keypoint: KeypointInternalType,
     crop_height: int,
@@ -401,6 +516,22 @@ def keypoint_center_crop(
     return crop_keypoint_by_coords(keypoint, crop_coords)
 
 
+def keypoints_center_crop(
+    keypoints: np.ndarray,
+    crop_height: int,
+    crop_width: int,
+    crop_depth: int,
+    rows: int,
+    cols: int,
+    slices: int,
+) -> np.ndarray:
+    """Crop an array of keypoints of shape `(N, 5)` around the center of the image. See `keypoint_center_crop`."""
+    crop_coords = get_center_crop_coords(
+        rows, cols, slices, crop_height, crop_width, crop_depth
+    )
+    return crop_keypoints_by_coords(keypoints, crop_coords)
+
+
 def crop(
     img: np.ndarray,
     x_min: int,
@@ -505,6 +636,25 @@ def bbox_crop(
     )
 
 
+def bboxes_crop(
+    bboxes: np.ndarray,
+    x_min: int,
+    y_min: int,
+    z_min: int,
+    x_max: int,
+    y_max: int,
+    z_max: int,
+    rows: int,
+    cols: int,
+    slices: int,
+) -> np.ndarray:
+    """Crop an array of bounding boxes of shape `(N, 6)`. See `bbox_crop`."""
+    crop_coords = x_min, y_min, z_min, x_max, y_max, z_max
+    return crop_bboxes_by_coords(
+        bboxes, crop_coords, y_max - y_min, x_max - x_min, z_max - z_min, rows, cols, slices
+    )
+
+
 def clamping_crop(
     img: np.ndarray,
     x_min: int,
@@ -543,6 +693,34 @@ def clamping_crop(
     ]
 
 
+def get_clamping_crop_shape(
+    shape: Sequence[int],
+    x_min: int,
+    y_min: int,
+    z_min: int,
+    x_max: int,
+    y_max: int,
+    z_max: int,
+) -> Tuple[int, int, int]:
+    """Returns the `(rows, cols, slices)` of the image returned by `clamping_crop`
+
+    Args:
+        shape (tuple): the `(rows, cols, slices)` of the image
+        x_min (int): Minimum closest upper left x coordinate.
+        y_min (int): Minimum closest upper left y coordinate.
+        z_min (int): Minimum closest upper left z coordinate.
+        x_max (int): Maximum furthest lower right x coordinate.
+        y_max (int): Maximum furthest lower right y coordinate.
+        z_max (int): Maximum furthest lower right z coordinate.
+    """
+    h, w, d = shape[:3]
+    return (
+        len(range(h)[int(max(y_min, 0)) : int(min(y_max, h - 1))]),
+        len(range(w)[int(max(x_min, 0)) : int(min(x_max, w - 1))]),
+        len(range(d)[int(max(z_min, 0)) : int(min(z_max, d - 1))]),
+    )
+
+
 @preserve_channel_dim
 def crop_and_pad(
     img: np.ndarray,
@@ -653,6 +831,31 @@ def crop_and_pad_bbox(
     )
 
 
+def crop_and_pad_bboxes(
+    bboxes: np.ndarray,
+    crop_params: Optional[Sequence[int]],
+    pad_params: Optional[Sequence[int]],
+    rows: int,
+    cols: int,
+    slices: int,
+    result_rows: int,
+    result_cols: int,
+    result_slices: int,
+) -> np.ndarray:
+    """Performs cropping and padding operations on an array of bounding boxes of shape `(N, 6)`.
+    See `crop_and_pad_bbox`."""
+    bboxes = denormalize_bboxes_array(bboxes, rows, cols, slices)
+
+    if crop_params is not None:
+        crop_x, _, crop_y, _, crop_z, _ = crop_params
+        bboxes = bboxes - np.array([crop_x, crop_y, crop_z, crop_x, crop_y, crop_z])
+    if pad_params is not None:
+        top, bottom, left, right, close, far = pad_params
+        bboxes = bboxes + np.array([left, top, close, left, top, close])
+
+    return normalize_bboxes_array(bboxes, result_rows, result_cols, result_slices)
+
+
 def crop_and_pad_keypoint(
     keypoint: KeypointInternalType,
     crop_params: Optional[Sequence[int]],
@@ -707,3 +910,36 @@ def crop_and_pad_keypoint(
         )
 
     return x, y, z, angle, scale
+
+
+def crop_and_pad_keypoints(
+    keypoints: np.ndarray,
+    crop_params: Optional[Sequence[int]],
+    pad_params: Optional[Sequence[int]],
+    rows: int,
+    cols: int,
+    slices: int,
+    result_rows: int,
+    result_cols: int,
+    result_slices: int,
+    keep_size: bool,
+) -> np.ndarray:
+    """Performs cropping and padding operations on an array of keypoints of shape `(N, 5)`.
+    See `crop_and_pad_keypoint`."""
+    keypoints = keypoints[:, :5]
+
+    if crop_params is not None:
+        crop_x, _, crop_y, _, crop_z, _ = crop_params
+        keypoints = keypoints - np.array([crop_x, crop_y, crop_z, 0, 0])
+    if pad_params is not None:
+        top, bottom, left, right, close, far = pad_params
+        keypoints = keypoints + np.array([left, top, close, 0, 0])
+
+    if keep_size and (
+        result_cols != cols or result_rows != rows or result_cols != slices
+    ):
+        return FGeometric.keypoints_scale(
+            keypoints, cols / result_cols, rows / result_rows, slices / result_slices
+        )
+
+    return keypoints
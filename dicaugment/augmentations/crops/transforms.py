@@ -84,6 +84,10 @@ class RandomCrop(DualTransform):
         """Applies the transformation to a bbox"""
         return F.bbox_random_crop(bbox, self.height, self.width, self.depth, **params)
 
+    def apply_to_bboxes_array(self, bboxes: np.ndarray, **params) -> np.ndarray:
+        """Applies the transformation to an array of bboxes"""
+        return F.bboxes_random_crop(bboxes, self.height, self.width, self.depth, **params)
+
     def apply_to_keypoint(
         self, keypoint: KeypointInternalType, **params
     ) -> KeypointInternalType:
@@ -92,10 +96,27 @@ class RandomCrop(DualTransform):
             keypoint, self.height, self.width, self.depth, **params
         )
 
+    def apply_to_keypoints_array(
+        self, keypoints: np.ndarray, **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        return F.keypoints_random_crop(
+            keypoints, self.height, self.width, self.depth, **params
+        )
+
+    def get_output_shape(self, **params) -> Tuple[int, int, int]:
+        """Returns the `(rows, cols, slices)` of the image that `apply` would return"""
+        return self.height, self.width, self.depth
+
     def get_transform_init_args_names(self) -> Tuple[str, ...]:
         """Returns initialization argument names. (e.g. Transform(arg1 = 1, arg2 = 2) -> ('arg1', 'arg2'))"""
         return ("height", "width", "depth")
 
+    @property
+    def is_crop(self) -> bool:
+        """Returns whether `apply` only slices a region of the image, see `DualTransform.is_crop`"""
+        return True
+
 
 class CenterCrop(DualTransform):
     """Crop the central part of the input.
@@ -128,6 +149,10 @@ class CenterCrop(DualTransform):
         """Applies the transformation to a bbox"""
         return F.bbox_center_crop(bbox, self.height, self.width, self.depth, **params)
 
+    def apply_to_bboxes_array(self, bboxes: np.ndarray, **params) -> np.ndarray:
+        """Applies the transformation to an array of bboxes"""
+        return F.bboxes_center_crop(bboxes, self.height, self.width, self.depth, **params)
+
     def apply_to_keypoint(
         self, keypoint: KeypointInternalType, **params
     ) -> KeypointInternalType:
@@ -136,10 +161,27 @@ class CenterCrop(DualTransform):
             keypoint, self.height, self.width, self.depth, **params
         )
 
+    def apply_to_keypoints_array(
+        self, keypoints: np.ndarray, **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        return F.keypoints_center_crop(
+            keypoints, self.height, self.width, self.depth, **params
+        )
+
+    def get_output_shape(self, **params) -> Tuple[int, int, int]:
+        """Returns the `(rows, cols, slices)` of the image that `apply` would return"""
+        return self.height, self.width, self.depth
+
     def get_transform_init_args_names(self) -> Tuple[str, ...]:
         """Returns initialization argument names. (e.g. Transform(arg1 = 1, arg2 = 2) -> ('arg1', 'arg2'))"""
         return ("height", "width", "depth")
 
+    @property
+    def is_crop(self) -> bool:
+        """Returns whether `apply` only slices a region of the image, see `DualTransform.is_crop`"""
+        return True
+
 
 class Crop(DualTransform):
     """Crop region from image.
@@ -205,6 +247,19 @@ class Crop(DualTransform):
             **params
         )
 
+    def apply_to_bboxes_array(self, bboxes: np.ndarray, **params) -> np.ndarray:
+        """Applies the transformation to an array of bboxes"""
+        return F.bboxes_crop(
+            bboxes,
+            x_min=self.x_min,
+            y_min=self.y_min,
+            z_min=self.z_min,
+            x_max=self.x_max,
+            y_max=self.y_max,
+            z_max=self.z_max,
+            **params
+        )
+
     def apply_to_keypoint(
         self, keypoint: KeypointInternalType, **params
     ) -> KeypointInternalType:
@@ -221,10 +276,35 @@ class Crop(DualTransform):
             ),
         )
 
+    def apply_to_keypoints_array(
+        self, keypoints: np.ndarray, **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        return F.crop_keypoints_by_coords(
+            keypoints,
+            crop_coords=(
+                self.x_min,
+                self.y_min,
+                self.z_min,
+                self.x_max,
+                self.y_max,
+                self.z_max,
+            ),
+        )
+
+    def get_output_shape(self, **params) -> Tuple[int, int, int]:
+        """Returns the `(rows, cols, slices)` of the image that `apply` would return"""
+        return self.y_max - self.y_min, self.x_max - self.x_min, self.z_max - self.z_min
+
     def get_transform_init_args_names(self) -> Tuple[str, ...]:
         """Returns initialization argument names. (e.g. Transform(arg1 = 1, arg2 = 2) -> ('arg1', 'arg2'))"""
         return ("x_min", "y_min", "z_min", "x_max", "y_max", "z_max")
 
+    @property
+    def is_crop(self) -> bool:
+        """Returns whether `apply` only slices a region of the image, see `DualTransform.is_crop`"""
+        return True
+
 
 class _BaseRandomSizedCrop(DualTransform):
     # Base class for RandomSizedCrop and RandomResizedCrop
@@ -244,6 +324,15 @@ class _BaseRandomSizedCrop(DualTransform):
         self.depth = depth
         self.interpolation = interpolation
 
+    @property
+    def is_crop(self) -> bool:
+        """Returns whether `apply` only slices a region of the image, see `DualTransform.is_crop`"""
+        return True
+
+    def get_output_shape(self, **params) -> Tuple[int, int, int]:
+        """Returns the `(rows, cols, slices)` of the image that `apply` would return"""
+        return self.height, self.width, self.depth
+
     def apply(
         self,
         img: np.ndarray,
@@ -292,6 +381,34 @@ class _BaseRandomSizedCrop(DualTransform):
             slices,
         )
 
+    def apply_to_bboxes_array(
+        self,
+        bboxes: np.ndarray,
+        crop_height: int = 0,
+        crop_width: int = 0,
+        crop_depth: int = 0,
+        h_start: int = 0,
+        w_start: int = 0,
+        d_start: int = 0,
+        rows: int = 0,
+        cols: int = 0,
+        slices: int = 0,
+        **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of bboxes"""
+        return F.bboxes_random_crop(
+            bboxes,
+            crop_height,
+            crop_width,
+            crop_depth,
+            h_start,
+            w_start,
+            d_start,
+            rows,
+            cols,
+            slices,
+        )
+
     def apply_to_keypoint(
         self,
         keypoint,
@@ -325,6 +442,39 @@ class _BaseRandomSizedCrop(DualTransform):
         keypoint = FGeometric.keypoint_scale(keypoint, scale_x, scale_y, scale_z)
         return keypoint
 
+    def apply_to_keypoints_array(
+        self,
+        keypoints: np.ndarray,
+        crop_height: int = 0,
+        crop_width: int = 0,
+        crop_depth: int = 0,
+        h_start: int = 0,
+        w_start: int = 0,
+        d_start: int = 0,
+        rows: int = 0,
+        cols: int = 0,
+        slices: int = 0,
+        **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        keypoints = F.keypoints_random_crop(
+            keypoints,
+            crop_height,
+            crop_width,
+            crop_depth,
+            h_start,
+            w_start,
+            d_start,
+            rows,
+            cols,
+            slices,
+        )
+        scale_x = self.width / crop_width
+        scale_y = self.height / crop_height
+        scale_z = self.depth / crop_depth
+        keypoints = FGeometric.keypoints_scale(keypoints, scale_x, scale_y, scale_z)
+        return keypoints
+
 
 class RandomSizedCrop(_BaseRandomSizedCrop):
     """Crop a random part of the input and rescale it to some size.
@@ -500,6 +650,10 @@ class RandomCropNearBBox(DualTransform):
         """Applies the transformation to a bbox"""
         return F.bbox_crop(bbox, **params)
 
+    def apply_to_bboxes_array(self, bboxes: np.ndarray, **params) -> np.ndarray:
+        """Applies the transformation to an array of bboxes"""
+        return F.bboxes_crop(bboxes, **params)
+
     def apply_to_keypoint(
         self,
         keypoint: KeypointInternalType,
@@ -516,6 +670,40 @@ class RandomCropNearBBox(DualTransform):
             keypoint, crop_coords=(x_min, y_min, z_min, x_max, y_max, z_max)
         )
 
+    def apply_to_keypoints_array(
+        self,
+        keypoints: np.ndarray,
+        x_min: int = 0,
+        y_min: int = 0,
+        z_min: int = 0,
+        x_max: int = 0,
+        y_max: int = 0,
+        z_max: int = 0,
+        **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        return F.crop_keypoints_by_coords(
+            keypoints, crop_coords=(x_min, y_min, z_min, x_max, y_max, z_max)
+        )
+
+    def get_output_shape(
+        self,
+        x_min: int = 0,
+        y_min: int = 0,
+        z_min: int = 0,
+        x_max: int = 0,
+        y_max: int = 0,
+        z_max: int = 0,
+        rows: int = 0,
+        cols: int = 0,
+        slices: int = 0,
+        **params
+    ) -> Tuple[int, int, int]:
+        """Returns the `(rows, cols, slices)` of the image that `apply` would return"""
+        return F.get_clamping_crop_shape(
+            (rows, cols, slices), x_min, y_min, z_min, x_max, y_max, z_max
+        )
+
     @property
     def targets_as_params(self) -> List[str]:
         return [self.cropping_bbox_key]
@@ -640,6 +828,40 @@ class BBoxSafeRandomCrop(DualTransform):
             slices,
         )
 
+    def apply_to_bboxes_array(
+        self,
+        bboxes: np.ndarray,
+        crop_height: int = 0,
+        crop_width: int = 0,
+        crop_depth: int = 0,
+        h_start: int = 0,
+        w_start: int = 0,
+        d_start: int = 0,
+        rows: int = 0,
+        cols: int = 0,
+        slices: int = 0,
+        **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of bboxes"""
+        return F.bboxes_random_crop(
+            bboxes,
+            crop_height,
+            crop_width,
+            crop_depth,
+            h_start,
+            w_start,
+            d_start,
+            rows,
+            cols,
+            slices,
+        )
+
+    def get_output_shape(
+        self, crop_height: int = 0, crop_width: int = 0, crop_depth: int = 0, **params
+    ) -> Tuple[int, int, int]:
+        """Returns the `(rows, cols, slices)` of the image that `apply` would return"""
+        return crop_height, crop_width, crop_depth
+
     @property
     def targets_as_params(self) -> List[str]:
         return ["image", "bboxes"]
@@ -704,6 +926,12 @@ class RandomSizedBBoxSafeCrop(BBoxSafeRandomCrop):
             crop, self.height, self.width, self.depth, interpolation
         )
 
+    def get_output_shape(
+        self, crop_height: int = 0, crop_width: int = 0, crop_depth: int = 0, **params
+    ) -> Tuple[int, int, int]:
+        """Returns the `(rows, cols, slices)` of the image that `apply` would return"""
+        return self.height, self.width, self.depth
+
     def get_transform_init_args_names(self) -> Tuple[str, ...]:
         """Returns initialization argument names. (e.g. Transform(arg1 = 1, arg2 = 2) -> ('arg1', 'arg2'))"""
         return super().get_transform_init_args_names() + (
@@ -898,6 +1126,32 @@ class CropAndPad(DualTransform):
             result_slices,
         )
 
+    def apply_to_bboxes_array(
+        self,
+        bboxes: np.ndarray,
+        crop_params: Optional[Sequence[int]] = None,
+        pad_params: Optional[Sequence[int]] = None,
+        rows: int = 0,
+        cols: int = 0,
+        slices: int = 0,
+        result_rows: int = 0,
+        result_cols: int = 0,
+        result_slices: int = 0,
+        **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of bboxes"""
+        return F.crop_and_pad_bboxes(
+            bboxes,
+            crop_params,
+            pad_params,
+            rows,
+            cols,
+            slices,
+            result_rows,
+            result_cols,
+            result_slices,
+        )
+
     def apply_to_keypoint(
         self,
         keypoint: KeypointInternalType,
@@ -925,6 +1179,48 @@ class CropAndPad(DualTransform):
             self.keep_size,
         )
 
+    def apply_to_keypoints_array(
+        self,
+        keypoints: np.ndarray,
+        crop_params: Optional[Sequence[int]] = None,
+        pad_params: Optional[Sequence[int]] = None,
+        rows: int = 0,
+        cols: int = 0,
+        slices: int = 0,
+        result_rows: int = 0,
+        result_cols: int = 0,
+        result_slices: int = 0,
+        **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        return F.crop_and_pad_keypoints(
+            keypoints,
+            crop_params,
+            pad_params,
+            rows,
+            cols,
+            slices,
+            result_rows,
+            result_cols,
+            result_slices,
+            self.keep_size,
+        )
+
+    def get_output_shape(
+        self,
+        result_rows: int = 0,
+        result_cols: int = 0,
+        result_slices: int = 0,
+        rows: int = 0,
+        cols: int = 0,
+        slices: int = 0,
+        **params
+    ) -> Tuple[int, int, int]:
+        """Returns the `(rows, cols, slices)` of the image that `apply` would return"""
+        if self.keep_size:
+            return rows, cols, slices
+        return result_rows, result_cols, result_slices
+
     @property
     def targets_as_params(self) -> List[str]:
         return ["image"]
@@ -1212,6 +1508,23 @@ class RandomCropFromBorders(DualTransform):
             bbox, x_min, y_min, z_min, x_max, y_max, z_max, rows, cols, slices
         )
 
+    def apply_to_bboxes_array(
+        self,
+        bboxes: np.ndarray,
+        x_min: int = 0,
+        x_max: int = 0,
+        y_min: int = 0,
+        y_max: int = 0,
+        z_min: int = 0,
+        z_max: int = 0,
+        **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of bboxes"""
+        rows, cols, slices = params["rows"], params["cols"], params["slices"]
+        return F.bboxes_crop(
+            bboxes, x_min, y_min, z_min, x_max, y_max, z_max, rows, cols, slices
+        )
+
     def apply_to_keypoint(
         self,
         keypoint: KeypointInternalType,
@@ -1228,6 +1541,40 @@ class RandomCropFromBorders(DualTransform):
             keypoint, crop_coords=(x_min, y_min, z_min, x_max, y_max, z_max)
         )
 
+    def apply_to_keypoints_array(
+        self,
+        keypoints: np.ndarray,
+        x_min: int = 0,
+        x_max: int = 0,
+        y_min: int = 0,
+        y_max: int = 0,
+        z_min: int = 0,
+        z_max: int = 0,
+        **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        return F.crop_keypoints_by_coords(
+            keypoints, crop_coords=(x_min, y_min, z_min, x_max, y_max, z_max)
+        )
+
+    def get_output_shape(
+        self,
+        x_min: int = 0,
+        y_min: int = 0,
+        z_min: int = 0,
+        x_max: int = 0,
+        y_max: int = 0,
+        z_max: int = 0,
+        rows: int = 0,
+        cols: int = 0,
+        slices: int = 0,
+        **params
+    ) -> Tuple[int, int, int]:
+        """Returns the `(rows, cols, slices)` of the image that `apply` would return"""
+        return F.get_clamping_crop_shape(
+            (rows, cols, slices), x_min, y_min, z_min, x_max, y_max, z_max
+        )
+
     @property
     def targets_as_params(self) -> List[str]:
         return ["image"]
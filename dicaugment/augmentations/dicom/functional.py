@@ -1,7 +1,10 @@
+from functools import lru_cache
+from typing import Dict, Tuple
+
 import numpy as np
+import scipy.fft
 from ...core.transforms_interface import DicomType
-import pkg_resources
-from typing import Tuple
+from ..utils import get_precision
 
 __all__ = [
     "rescale_slope_intercept",
@@ -81,27 +84,46 @@ def transpose_dicom(dicom: DicomType) -> DicomType:
     return res
 
 
+_KERNEL_CACHE: Dict[str, np.ndarray] = {}
+
+
 def _load_kernel(kname: str = "STANDARD") -> np.ndarray:
     """
-    Return a numpy array of the specified kernel name
+    Return a numpy array of the specified kernel name. Kernels are read from disk once and
+    kept in memory as read-only arrays.
 
     """
+    kname = kname.lower()
+    if kname in _KERNEL_CACHE:
+        return _KERNEL_CACHE[kname]
+
+    import pkg_resources
+
     fname = pkg_resources.resource_filename(
-        __name__, "data/kernels/{}.npy".format(kname.lower())
+        __name__, "data/kernels/{}.npy".format(kname)
     )
 
     try:
-        return np.load(fname)
+        kernel = np.load(fname)
     except Exception as e:
         raise ValueError(
-            "{}\nCould not find kernel with name {}.npy".format(e, kname.lower())
+            "{}\nCould not find kernel with name {}.npy".format(e, kname)
         )
 
+    kernel.setflags(write=False)
+    _KERNEL_CACHE[kname] = kernel
+    return kernel
+
 
 def _generate_NPS_noise(NPS: np.ndarray) -> np.ndarray:
-    n = np.random.random(NPS.shape).astype("float64")
-    phase_shift = np.sqrt(NPS) * (np.cos(2 * np.pi * n) + 1j * np.sin(2 * np.pi * n))
-    ift = np.fft.ifftn(phase_shift, axes=tuple(range(NPS.ndim)))
+    dtype = get_precision()
+    n = np.random.random(NPS.shape).astype(dtype)
+    phase_shift = np.sqrt(NPS, dtype=dtype) * (np.cos(2 * np.pi * n) + 1j * np.sin(2 * np.pi * n))
+    if dtype == np.float64:
+        ift = np.fft.ifftn(phase_shift, axes=tuple(range(NPS.ndim)))
+    else:
+        # np.fft always computes in complex128, scipy.fft keeps complex64
+        ift = scipy.fft.ifftn(phase_shift, axes=tuple(range(NPS.ndim)))
     noise = np.real(ift) + np.imag(ift)
     coef = 1 / np.std(noise)
     return coef * noise
@@ -110,41 +132,42 @@ def _generate_NPS_noise(NPS: np.ndarray) -> np.ndarray:
 def _nps_radial_to_cartesian(
     rad_nps: np.ndarray, shape: Tuple, x_step: float, y_step: float
 ) -> np.ndarray:
-    nNPS = np.zeros(shape=shape)
     freq_row = np.fft.fftfreq(n=shape[1], d=x_step)
     freq_col = np.fft.fftfreq(n=shape[0], d=y_step)
+    spatial_val = np.hypot(freq_row[np.newaxis, :], freq_col[:, np.newaxis])
+
+    # Nearest tabulated frequency (ignoring the last entry), ties go to the lower frequency
+    spatial_freq = rad_nps["Spatial_frequency"][:-1]
+    right = np.clip(np.searchsorted(spatial_freq, spatial_val), 1, len(spatial_freq) - 1)
+    left = right - 1
+    idx = np.where(
+        np.abs(spatial_freq[left] - spatial_val) <= np.abs(spatial_freq[right] - spatial_val),
+        left,
+        right,
+    )
 
-    spatial_freq = rad_nps["Spatial_frequency"]
-    radial_val = rad_nps["nNPS"]
-
-    for i in range(shape[1]):
-        for j in range(shape[0]):
-            spatial_val = np.sqrt(freq_row[i] ** 2 + freq_col[j] ** 2)
+    return np.maximum(rad_nps["nNPS"][idx], 0)
 
-            idx = min(
-                range(len(spatial_freq) - 1),
-                key=lambda x: abs(spatial_freq[x] - spatial_val),
-            )
-            nNPS[j, i] = radial_val[idx]
 
-    nNPS[nNPS < 0] = 0
-    return nNPS
+@lru_cache(maxsize=32)
+def _get_cartesian_nps(kernel: str, shape: Tuple[int, int], x_step: float, y_step: float) -> np.ndarray:
+    """Returns the read-only cartesian NPS of `kernel` for an image of `shape` and pixel spacing, cached per geometry"""
+    nps = _nps_radial_to_cartesian(
+        rad_nps=_load_kernel(kernel), shape=shape, x_step=x_step, y_step=y_step
+    )
+    nps.setflags(write=False)
+    return nps
 
 
-def _noise_to_3d(nps: np.ndarray, slices: int, magnitude: int) -> np.ndarray:
-    return (
-        np.repeat(_generate_NPS_noise(nps)[..., np.newaxis], slices, axis=2) * magnitude
-    )
+def _noise_slice(nps: np.ndarray, magnitude: int) -> np.ndarray:
+    """Returns a noise slice of shape (H, W, 1), which is added to every slice of the image"""
+    return (_generate_NPS_noise(nps) * magnitude)[..., np.newaxis]
 
 
 def add_noise_nps(
     img: np.ndarray, kernel: str, x_step: float, y_step: float, magnitude: int
 ) -> np.ndarray:
-    height, width, depth = img.shape[:3]
-    rad_nps = _load_kernel(kernel)
-    nps = _nps_radial_to_cartesian(
-        rad_nps=rad_nps, shape=(height, width), x_step=x_step, y_step=y_step
-    )
-    nps3d = _noise_to_3d(nps=nps, slices=depth, magnitude=magnitude)
-    out = img.copy()
-    return out + nps3d.astype(np.int16)
+    height, width = img.shape[:2]
+    nps = _get_cartesian_nps(kernel.lower(), (height, width), float(x_step), float(y_step))
+    noise = _noise_slice(nps=nps, magnitude=magnitude)
+    return img + noise.astype(np.int16)
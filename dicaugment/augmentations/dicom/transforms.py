@@ -173,6 +173,18 @@ class SetPixelSpacing(DualTransform):
         """Applies the augmentation to a dicom type"""
         return F.dicom_scale(dicom, scale_x, scale_y)
 
+    def get_output_shape(
+        self,
+        scale_x: float = 1.0,
+        scale_y: float = 1.0,
+        rows: int = 0,
+        cols: int = 0,
+        slices: int = 0,
+        **params
+    ) -> Tuple[int, int, int]:
+        """Returns the `(rows, cols, slices)` of the image that `apply` would return"""
+        return int(round(rows * scale_y)), int(round(cols * scale_x)), slices
+
     def get_params_dependent_on_targets(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Returns additional parameters needed for the `apply` methods that depend on a target
         (e.g. `apply_to_bboxes` method expects image size)
@@ -1,6 +1,7 @@
 from __future__ import division
 
-from typing import Optional, Sequence, Union, Tuple, Any
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
 from warnings import warn
 
 import cv2
@@ -11,8 +12,11 @@ from dicaugment import random_utils
 from dicaugment.augmentations.utils import (
     MAX_VALUES_BY_DTYPE,
     MIN_VALUES_BY_DTYPE,
+    _get_float_dtype,
+    _get_out,
     _maybe_process_in_chunks,
     _maybe_process_by_channel,
+    _maybe_process_in_slabs,
     clip,
     clipped,
     ensure_contiguous,
@@ -35,7 +39,9 @@ from ..core.transforms_interface import (
 )
 
 __all__ = [
+    "apply_lut",
     "brightness_contrast_adjust",
+    "compose_luts",
     "convolve",
     "downscale",
     "equalize",
@@ -43,28 +49,121 @@ __all__ = [
     "gamma_transform",
     "gauss_noise",
     "invert",
+    "make_lut",
     "multiply",
     "noop",
     "normalize",
+    "supports_lut",
     "to_float",
     "unsharp_mask",
 ]
 
 
+# the unsigned dtype whose view of an image indexes its lookup table
+_LUT_INDEX_DTYPES: Dict[np.dtype, np.dtype] = {
+    np.dtype("uint8"): np.dtype("uint8"),
+    np.dtype("uint16"): np.dtype("uint16"),
+    np.dtype("int16"): np.dtype("uint16"),
+}
+
+
+def supports_lut(dtype: Union[np.dtype, str, type]) -> bool:
+    """Returns whether images of `dtype` (uint8, uint16, int16) can be mapped through a table from `make_lut`"""
+    return np.dtype(dtype) in _LUT_INDEX_DTYPES
+
+
+def _use_lut(img: np.ndarray) -> bool:
+    """Returns whether a lookup table is cheaper than computing a point-wise function on every voxel of `img`"""
+    return supports_lut(img.dtype) and img.size >= len(_lut_values(img.dtype))
+
+
+@lru_cache(maxsize=None)
+def _lut_values(dtype: np.dtype) -> np.ndarray:
+    """Returns every value of `dtype` ordered by its bit pattern, as a read-only array"""
+    index_dtype = _LUT_INDEX_DTYPES[dtype]
+    values = np.arange(np.iinfo(index_dtype).max + 1, dtype=index_dtype).view(dtype)
+    values.flags.writeable = False
+    return values
+
+
+def make_lut(dtype: Union[np.dtype, str, type], func: Callable, *args, **kwargs) -> np.ndarray:
+    """
+    Returns the lookup table of a point-wise function for images of an integer `dtype` of at most 16 bits.
+
+    The table maps every value of `dtype`, ordered by its bit pattern, through `func(values, *args, **kwargs)`, so
+    that `apply_lut(img, lut)` equals `func(img, *args, **kwargs)` without computing `func` per voxel.
+
+    Args:
+        dtype (np.dtype): the data type of the images. Must be one of uint8, uint16, int16
+        func (callable): a point-wise function of an image
+        *args: positional arguments passed to `func`
+        **kwargs: keyword arguments passed to `func`
+
+    Raises:
+        TypeError: if `dtype` is not supported, see `supports_lut`
+    """
+    dtype = np.dtype(dtype)
+    if not supports_lut(dtype):
+        raise TypeError(
+            "Lookup tables require an image of dtype {}, got {}".format(
+                tuple(d.name for d in _LUT_INDEX_DTYPES), dtype.name
+            )
+        )
+    # the table covers every value of the dtype, most of which an image does not contain, e.g. the negative half
+    # of int16 for `np.power`, so floating point errors on those entries are not reported
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return func(_lut_values(dtype), *args, **kwargs)
+
+
+def apply_lut(img: np.ndarray, lut: np.ndarray) -> np.ndarray:
+    """
+    Maps each voxel of an image through a lookup table from `make_lut`, as a single gather without float temporaries.
+
+    Args:
+        img (np.ndarray): an image of dtype uint8, uint16 or int16
+        lut (np.ndarray): a lookup table for the dtype of `img`
+    """
+    return lut[img.view(_LUT_INDEX_DTYPES[img.dtype])]
+
+
+def compose_luts(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    Returns the lookup table that applies `first` then `second`, so that a chain of point-wise operations
+    is applied to an image as a single gather.
+
+    Args:
+        first (np.ndarray): a lookup table from `make_lut`, whose values have the dtype it was made for
+        second (np.ndarray): a lookup table for the same dtype
+
+    Raises:
+        ValueError: if `first` does not map the dtype onto itself or the tables do not have the same size
+    """
+    if not supports_lut(first.dtype) or len(first) != len(second) or len(first) != len(_lut_values(first.dtype)):
+        raise ValueError(
+            "Expected two lookup tables for the same dtype, got tables of {} {} and {} {}".format(
+                len(first), first.dtype.name, len(second), second.dtype.name
+            )
+        )
+    return apply_lut(first, second)
+
+
 def normalize(
         img: np.ndarray,
-        mean: Union[float, np.ndarray, None],
-        std: Union[float, np.ndarray, None]
+        mean: Union[float, Sequence[float], np.ndarray, None],
+        std: Union[float, Sequence[float], np.ndarray, None],
+        out: Optional[np.ndarray] = None,
     ) -> np.ndarray:
     """
     Normalizes an image by the formula `img = (img - mean) / (std)`.
     
     Args:
         img (np.ndarray): an image
-        mean (float, np.ndarray, None): The offset for the image. 
+        mean (float, list of float, np.ndarray, None): The offset for the image. 
             If None, mean is calculated as the mean of the image. If np.ndarray, operation can be broadcast across dimensions.
-        std (float, np.ndarray, None): The standard deviation to divide the image by. 
+        std (float, list of float, np.ndarray, None): The standard deviation to divide the image by. 
             If None, std is calculated as the std of the image. If np.ndarray, operation can be broadcast across dimensions.
+        out (np.ndarray, None): Optional float array of the shape of `img` to write the result into.
+            In inplace mode (see `inplace_mode`) a float32 `img` is overwritten. Default: None
     
     """
     ndim = img.ndim
@@ -87,8 +186,7 @@ def normalize(
 
     denominator = np.reciprocal(std, dtype=np.float32)
 
-    img = img.astype(np.float32)
-    img -= mean
+    img = np.subtract(img, mean, out=_get_out(img, out, np.float32), dtype=np.float32)
     img *= denominator
     return img
 
@@ -183,31 +281,44 @@ def posterize(img, bits):
 
     return result_img
 
-def _calcHist(
-    img: np.ndarray, mask: Union[np.ndarray, None], nbins: int, hist_range: Tuple
-):
-    if not mask:
-        mask = np.ones_like(img, dtype=np.bool_)
 
-    bins = np.linspace(hist_range[0], hist_range[1] + 1, nbins + 1)
+def _offsets(img: np.ndarray, base: int) -> np.ndarray:
+    """Returns `img - base` as a non-negative integer array that can index a lookup table"""
+    dtype = np.int32 if img.dtype.itemsize < 4 else np.int64
+    return np.subtract(img, base, dtype=dtype)
+
 
-    return np.histogram(img[mask.astype(np.bool_)], bins=bins)[0]
+def _equalize_lut(img: np.ndarray, hist_range: Tuple[int, int], mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """Equalizes a single channel integer image through a lookup table indexed by `img - min(img, lo)`.
+
+    The histogram has `hi - lo` bins spread evenly over `[lo, hi + 1]`, values in `[lo, hi)` are remapped
+    and every other value (including negative HU values outside of `hist_range`) is left unchanged.
+    """
+    lo, hi = int(hist_range[0]), int(hist_range[1])
+    nbins = hi - lo
+    if nbins <= 0:
+        return img.copy()
 
+    base = min(lo, int(img.min()))
+    top = max(hi + 1, int(img.max()))
+    values = img if mask is None else img[mask]
 
-def _equalize_cv(img, hist_range, mask=None):
-    lo, hi = hist_range
-    histogram = sum(map(lambda x: _calcHist(x, mask, hi - lo, hist_range), img)).ravel()
+    # Count every integer value once, then fold the counts of lo..hi+1 into the (non-integer width) bins
+    counts = np.bincount(_offsets(values, base).ravel(), minlength=top - base + 1)[lo - base : hi + 2 - base]
+    edges = np.linspace(lo, hi + 1, nbins + 1)
+    bins = np.clip(np.searchsorted(edges, np.arange(lo, hi + 2), side="right") - 1, 0, nbins - 1)
+    histogram = np.bincount(bins, weights=counts, minlength=nbins)
 
     total = np.sum(histogram)
-    histogram = histogram / total
-    cumsum = (np.cumsum(histogram) * (hi - lo)) + lo
+    if total == 0:
+        return img.copy()
 
-    lut = {}
+    cumsum = (np.cumsum(histogram / total) * nbins) + lo
 
-    for i in range(lo, hi):
-        lut[i] = clip(round(cumsum[i - lo]), img.dtype, lo, hi)
+    lut = np.arange(base, top + 1, dtype=np.int64)
+    lut[lo - base : hi - base] = np.clip(np.rint(cumsum), lo, hi)
 
-    return np.vectorize(lambda x: lut.get(x, x))(img)
+    return np.take(lut.astype(img.dtype), _offsets(img, base))
 
 
 @preserve_channel_dim
@@ -250,7 +361,7 @@ def equalize(img, hist_range=None, mask=None):
         mask = mask.astype(np.bool_)
 
     if is_grayscale_image(img):
-        return _equalize_cv(img, hist_range, mask)
+        return _equalize_lut(img, hist_range, mask)
 
     # if not by_channels:
     #     result_img = cv2.cvtColor(img, cv2.COLOR_RGB2YCrCb)
@@ -266,7 +377,7 @@ def equalize(img, hist_range=None, mask=None):
         else:
             _mask = mask[..., i]
 
-        result_img[..., i] = _equalize_cv(img[..., i], hist_range, _mask)
+        result_img[..., i] = _equalize_lut(img[..., i], hist_range, _mask)
 
     return result_img
 
@@ -382,7 +493,8 @@ def convolve(
     img: np.ndarray,
     kernel: np.ndarray,
     mode: str = "constant",
-    cval: Union[int,float] = 0
+    cval: Union[int,float] = 0,
+    num_threads: Optional[int] = None,
     ) -> np.ndarray:
     """Applies a convolutional kernel to an image
     
@@ -401,12 +513,19 @@ def convolve(
 
                     Default: `constant`
         cval (int,float): The fill value when mode = `constant`. Default: 0
+        num_threads (int): the number of worker threads used to process the channels and overlapping z-slabs of the
+            image. If None, `dicaugment.get_num_threads()` is used. Default: None
 
     Returns:
         np.ndarray: the convolved image
     """
-    convolve_fn = _maybe_process_by_channel(
-        ndimage.convolve, weights=kernel, mode=mode, cval=cval
+    convolve_fn = _maybe_process_in_slabs(
+        ndimage.convolve,
+        halo=kernel.shape[2] // 2 if kernel.ndim > 2 else 0,
+        num_threads=num_threads,
+        weights=kernel,
+        mode=mode,
+        cval=cval,
     )
     return convolve_fn(img)
 
@@ -778,6 +897,12 @@ def invert(img: np.ndarray) -> np.ndarray:
             UserWarning,
         )
 
+    if _use_lut(img):
+        return apply_lut(img, make_lut(img.dtype, _invert))
+    return _invert(img)
+
+
+def _invert(img: np.ndarray) -> np.ndarray:
     return MAX_VALUES_BY_DTYPE[img.dtype] - (img + MIN_VALUES_BY_DTYPE[img.dtype])
 
 
@@ -786,36 +911,68 @@ def channel_shuffle(img, channels_shuffled):
     return img
 
 
-@preserve_shape
-@clipped
-def gamma_transform(img: np.ndarray, gamma: float) -> np.ndarray:
+def gamma_transform(img: np.ndarray, gamma: Union[float, np.ndarray]) -> np.ndarray:
     """
     Performs a Gamma correction on an image.
 
     Args:
         img (np.ndarray): an image
-        gamma (float): gamma parameter
+        gamma (float, np.ndarray): gamma parameter, or an array of them that broadcasts against `img`
     """
-    return np.power(img, gamma)
+    if np.ndim(gamma) == 0 and _use_lut(img):
+        return apply_lut(img, make_lut(img.dtype, _gamma_transform, gamma))
+    return _gamma_transform(img, gamma)
 
 
+@preserve_shape
 @clipped
-def gauss_noise(image, gauss):
+def _gamma_transform(img: np.ndarray, gamma: Union[float, np.ndarray]) -> np.ndarray:
+    return np.power(img, gamma, out=_get_out(img), dtype=_get_float_dtype(img))
+
+
+_NOISE_BLOCK_SIZE = 1 << 16
+
+
+@clipped
+def gauss_noise(image, gauss, out=None, scale=1.0, loc=0.0):
     """
     Adds noise to an image.
 
     Args:
         img (np.ndarray): an image
         guass (np.ndarray): guassian noise parameter
+        out (np.ndarray, None): Optional float array of the shape of `image` to write the noisy image into, before it
+            is clipped. In inplace mode (see `inplace_mode`) a float `image` is overwritten. Default: None
+        scale (float, np.ndarray): factor the noise is multiplied by before it is added. Default: 1.0
+        loc (float, np.ndarray): value added to the noise before it is added. Default: 0.0
     """
-    image = image.astype("float32")
-    return image + gauss
+    if not np.can_cast(image.dtype, np.float32):
+        image = image.astype("float32")
+    dtype = _get_float_dtype(image) or np.result_type(np.float32, gauss)
+    out = _get_out(image, out)
+    if np.all(scale == 1) and np.all(loc == 0):
+        return np.add(image, gauss, out=out, dtype=dtype)
+
+    if out is None:
+        out = np.empty(np.broadcast_shapes(image.shape, np.shape(gauss)), dtype=dtype)
+    image, gauss, scale, loc = np.broadcast_arrays(image, gauss, scale, loc)
+    # scale the noise in blocks of rows, so that only a small temporary array is needed
+    step = max(1, _NOISE_BLOCK_SIZE // max(1, out[0].size))
+    for i in range(0, len(out), step):
+        noise = np.multiply(gauss[i : i + step], scale[i : i + step], dtype=dtype)
+        noise += loc[i : i + step]
+        np.add(image[i : i + step], noise, out=out[i : i + step])
+    return out
 
 
 @clipped
-def _brightness_contrast_adjust(img, alpha=1, beta=0, max_brightness=None):
+def _brightness_contrast_adjust(img, alpha=1, beta=0, max_brightness=None, mean=None):
     dtype = img.dtype
-    img = img.astype("float32")
+    if beta != 0 and max_brightness is None and mean is None and dtype.kind in "iu":
+        # integer images get the mean `brightness_contrast_adjust` computes for their lookup tables
+        mean = alpha * np.mean(img, dtype=np.float64)
+    if _get_out(img, dtype=np.float32) is None:
+        img = img.astype("float32")
 
     if alpha != 1:
         img *= alpha
@@ -823,14 +980,32 @@ def _brightness_contrast_adjust(img, alpha=1, beta=0, max_brightness=None):
         if max_brightness is not None:
             img += beta * max_brightness
         else:
-            img += beta * np.mean(img)
+            img += beta * (np.mean(img) if mean is None else mean)
 
     if max_brightness is not None:
-        img = np.clip(img, MIN_VALUES_BY_DTYPE[dtype], max_brightness)
+        np.clip(img, MIN_VALUES_BY_DTYPE[dtype], max_brightness, out=img)
 
     return img
 
 
+@clipped
+def _brightness_contrast_adjust_batch(images, alpha, beta, max_brightness=None):
+    dtype = images.dtype
+    images = images.astype("float32")
+    images *= alpha.astype("float32")
+
+    axis = tuple(range(1, images.ndim))
+    if max_brightness is not None:
+        images += beta * max_brightness
+    else:
+        images += beta * np.mean(images, axis=axis, keepdims=True)
+
+    if max_brightness is not None:
+        images = np.clip(images, MIN_VALUES_BY_DTYPE[dtype], max_brightness)
+
+    return images
+
+
 def brightness_contrast_adjust(
         img: np.ndarray,
         alpha: Union[float,int] = 1, 
@@ -847,6 +1022,12 @@ def brightness_contrast_adjust(
         max_brightness (int,float,None): If not None, adjust contrast by specified maximum and clip to maximum,
                 else adjust contrast by image mean. Default: None
     """
+    if _use_lut(img):
+        mean = None
+        if beta != 0 and max_brightness is None:
+            # the mean of the contrast adjusted image, without computing that image
+            mean = alpha * np.mean(img, dtype=np.float64)
+        return apply_lut(img, make_lut(img.dtype, _brightness_contrast_adjust, alpha, beta, max_brightness, mean))
     return _brightness_contrast_adjust(img, alpha, beta, max_brightness)
 
 
@@ -946,7 +1127,7 @@ def downscale(
     return upscaled
 
 
-def to_float(img, min_value=None, max_value=None):
+def to_float(img, min_value=None, max_value=None, out=None):
     """
     Convert an image to a floating point image based on current dtype
     
@@ -954,6 +1135,8 @@ def to_float(img, min_value=None, max_value=None):
         img (np.ndarray): an image
         min_value (int,float,None): Optional custom minimum value of dtype. Maps this value to the lower bound of `float32` (0.0).
         max_value (int,float,None): Optional custom maximum value of dtype. Maps this value to the upper bound of `float32` (1.0).
+        out (np.ndarray, None): Optional float array of the shape of `img` to write the result into.
+            In inplace mode (see `inplace_mode`) a float32 `img` is overwritten. Default: None
 
     Returns:
         np.ndarray: image cast to `float32`
@@ -971,14 +1154,21 @@ def to_float(img, min_value=None, max_value=None):
                 "Can't infer the minimum and maximum value for dtype {}. You need to specify the minimum and maximum value manually by "
                 "passing the min_value and max_value arguments".format(img.dtype)
             )
-    return (img.astype("float32") - min_value) / (max_value - min_value)
+    # float32, unless the range of the dtype is too wide for it
+    dtype = np.result_type(np.result_type(np.float32, min_value), max_value - min_value)
+    if not np.can_cast(img.dtype, np.float32):
+        img = img.astype("float32")
+    img = np.subtract(img, min_value, out=_get_out(img, out, dtype), dtype=dtype)
+    img /= max_value - min_value
+    return img
 
 
 def from_float(
         img: np.ndarray,
         dtype: str,
         min_value: Optional[Union[int,float]] = None,
-        max_value: Optional[Union[int,float]] = None
+        max_value: Optional[Union[int,float]] = None,
+        out: Optional[np.ndarray] = None,
     ) -> np.ndarray:
     """
     Convert an image from a floating point image, to the specified dtype
@@ -988,6 +1178,8 @@ def from_float(
         dtype (str): a dtype to cast to. Must be one of {`uint8`, `uint16`, `uint32`, `float32`, `int16`, `int32`, `float64`}
         min_value (int,float,None): Optional custom minimum value of dtype. Maps lower bound of `float32` (0.0) to this value.
         max_value (int,float,None): Optional custom maximum value of dtype. Maps upper bound of `float32` (1.0) to this value.
+        out (np.ndarray, None): Optional array of the shape of `img` to write the result into, cast to its dtype.
+            In inplace mode (see `inplace_mode`) a float `img` is overwritten by the intermediate result. Default: None
 
     Returns:
         np.ndarray: image cast to `dtype`
@@ -1005,7 +1197,16 @@ def from_float(
                 "Can't infer the minimum and maximum value for dtype {}. You need to specify the minimum and maximum value manually by "
                 "passing the min_value and max_value arguments".format(dtype)
             )
-    return (img * (max_value - min_value) + min_value).astype(dtype)
+    scaled = np.multiply(img, max_value - min_value, out=_get_out(img))
+    if scaled.dtype.kind == "f":
+        scaled += min_value
+    else:
+        scaled = scaled + min_value
+
+    if out is not None:
+        np.copyto(out, scaled, casting="unsafe")
+        return out
+    return scaled.astype(dtype, copy=False)
 
 
 def noop(input_obj: Any, **params):  # skipcq: PYL-W0613
@@ -1070,7 +1271,7 @@ def _multiply_uint8_optimized(img, multiplier):
 
 @clipped
 def _multiply_non_uint8(img, multiplier):
-    return img * multiplier
+    return np.multiply(img, multiplier, dtype=_get_float_dtype(img))
 
 
 def multiply(img, multiplier):
@@ -1089,6 +1290,9 @@ def multiply(img, multiplier):
 
         return _multiply_uint8(img, multiplier)
 
+    if np.size(multiplier) == 1 and _use_lut(img):
+        return apply_lut(img, make_lut(img.dtype, _multiply_non_uint8, np.ravel(multiplier)[0]))
+
     return _multiply_non_uint8(img, multiplier)
 
 
@@ -1299,8 +1503,23 @@ def adjust_hue_torchvision(img, factor):
 
 
 @clipped
-def add_weighted(img1, alpha, img2, beta):
-    return img1.astype(float) * alpha + img2.astype(float) * beta
+def add_weighted(img1, alpha, img2, beta, out=None):
+    """
+    Returns the weighted sum `img1 * alpha + img2 * beta`, computed in float32 unless an image is of a wider dtype.
+
+    Args:
+        img1 (np.ndarray): an image
+        alpha (float): the weight of `img1`
+        img2 (np.ndarray): an image of the shape of `img1`
+        beta (float): the weight of `img2`
+        out (np.ndarray, None): Optional float array of the shape of `img1` to write the sum into, before it is clipped.
+            In inplace mode (see `inplace_mode`) a float `img1` is overwritten. Default: None
+    """
+    dtype = np.result_type(img1.dtype, img2.dtype, np.float32)
+    weighted = np.multiply(img2, beta, dtype=dtype)
+    result = np.multiply(img1, alpha, out=_get_out(img1, out, dtype), dtype=dtype)
+    result += weighted
+    return result
 
 
 @clipped
@@ -1360,26 +1579,31 @@ def unsharp_mask(
 
     blur_fn = _maybe_process_by_channel(
         ndimage.gaussian_filter,
+        channel_shape=image.shape[:3],
         sigma=sigma,
         radius=((ksize - 1) // 2,) * 3,
         mode=mode,
         cval=cval,
     )
+    # the intermediate volumes are computed in the buffers of the ones they replace
     blur = blur_fn(image)
-
-    residual = image - blur
+    residual = np.subtract(image, blur, out=blur)
 
     # Do not sharpen noise
-    mask = np.abs(residual) > threshold
-    mask = mask.astype("float32")
+    soft_mask = blur_fn((np.abs(residual) > threshold).astype("float32"))
 
-    sharp = image + alpha * residual
+    sharp = np.multiply(residual, alpha, out=residual)
+    sharp += image
     # Avoid color noise artefacts.
-    sharp = np.clip(sharp, 0, 1)
+    np.clip(sharp, 0, 1, out=sharp)
 
-    soft_mask = blur_fn(mask)
-
-    output = soft_mask * sharp + (1 - soft_mask) * image
+    if soft_mask.dtype == sharp.dtype:
+        output = np.multiply(soft_mask, sharp, out=sharp)
+        soft_mask = np.subtract(1, soft_mask, out=soft_mask)
+        soft_mask *= image
+        output += soft_mask
+    else:
+        output = soft_mask * sharp + (1 - soft_mask) * image
     return from_float(output, dtype=input_dtype)
 
 
@@ -19,7 +19,13 @@ from dicaugment.augmentations.utils import (
 )
 
 from ... import random_utils
-from ...core.bbox_utils import denormalize_bbox, normalize_bbox
+from ...core.bbox_utils import (
+    denormalize_bbox,
+    denormalize_bboxes_array,
+    normalize_bbox,
+    normalize_bboxes_array,
+)
+from ...core.keypoints_utils import angles_to_2pi_range
 from ...core.transforms_interface import (
     BoxInternalType,
     FillValueType,
@@ -38,34 +44,55 @@ __all__ = [
     "pad",
     "pad_with_params",
     "bbox_rot90",
+    "bboxes_rot90",
     "keypoint_rot90",
+    "keypoints_rot90",
     "rotate",
+    "warp_affine",
+    "get_rotate_affine",
+    "get_shift_scale_rotate_affine",
+    "get_scale_affine",
+    "get_flip_affine",
     "bbox_rotate",
+    "bboxes_rotate",
     "keypoint_rotate",
+    "keypoints_rotate",
     "shift_scale_rotate",
     "keypoint_shift_scale_rotate",
+    "keypoints_shift_scale_rotate",
     "bbox_shift_scale_rotate",
+    "bboxes_shift_scale_rotate",
     "resize",
     "scale",
     "keypoint_scale",
+    "keypoints_scale",
     "py3round",
     "_func_max_size",
     "longest_max_size",
     "smallest_max_size",
     "bbox_flip",
+    "bboxes_flip",
     "bbox_hflip",
+    "bboxes_hflip",
     "bbox_transpose",
     "bbox_vflip",
+    "bboxes_vflip",
     "bbox_zflip",
+    "bboxes_zflip",
     "hflip",
     "vflip",
     "zflip",
     "transpose",
     "keypoint_flip",
+    "keypoints_flip",
     "keypoint_hflip",
+    "keypoints_hflip",
     "keypoint_transpose",
+    "keypoints_transpose",
     "keypoint_vflip",
+    "keypoints_vflip",
     "keypoint_zflip",
+    "keypoints_zflip",
 ]
 
 
@@ -121,6 +148,44 @@ def bbox_rot90(
     return bbox
 
 
+def bboxes_rot90(
+    bboxes: np.ndarray, factor: int, axes: str, rows: int, cols: int, slices: int
+) -> np.ndarray:  # skipcq: PYL-W0613
+    """Rotates an array of bounding boxes of shape `(N, 6)` by 90 degrees. See `bbox_rot90`."""
+    if factor not in {0, 1, 2, 3}:
+        raise ValueError("Parameter n must be in set {0, 1, 2, 3}")
+    if axes not in {"xy", "yz", "xz"}:
+        raise ValueError("Parameter axes must be one of {'xy','yz','xz'}")
+    x_min, y_min, z_min, x_max, y_max, z_max = bboxes[:, :6].T
+
+    if factor == 0:
+        return bboxes[:, :6]
+    columns: Tuple[np.ndarray, ...]
+    if axes == "xy":
+        if factor == 1:
+            columns = y_min, 1 - x_max, z_min, y_max, 1 - x_min, z_max
+        elif factor == 2:
+            columns = 1 - x_max, 1 - y_max, z_min, 1 - x_min, 1 - y_min, z_max
+        elif factor == 3:
+            columns = 1 - y_max, x_min, z_min, 1 - y_min, x_max, z_max
+    elif axes == "xz":
+        if factor == 1:
+            columns = 1 - z_max, y_min, x_min, 1 - z_min, y_max, z_min
+        elif factor == 2:
+            columns = 1 - x_max, y_min, 1 - z_max, 1 - x_min, y_max, 1 - z_min
+        elif factor == 3:
+            columns = z_min, y_min, 1 - x_min, z_max, y_max, 1 - x_max
+    elif axes == "yz":
+        if factor == 1:
+            columns = x_min, 1 - z_max, y_min, x_max, 1 - z_min, y_max
+        elif factor == 2:
+            columns = x_min, 1 - y_max, 1 - z_max, x_max, 1 - y_min, 1 - z_min
+        elif factor == 3:
+            columns = x_min, z_min, 1 - y_max, x_max, z_max, 1 - y_min
+
+    return np.stack(columns, axis=1)
+
+
 @angle_2pi_range
 def keypoint_rot90(
     keypoint: KeypointInternalType,
@@ -183,6 +248,64 @@ def keypoint_rot90(
     return x, y, z, angle, scale
 
 
+def keypoints_rot90(
+    keypoints: np.ndarray,
+    factor: int,
+    axes: str,
+    rows: int,
+    cols: int,
+    slices: int,
+    **params,
+) -> np.ndarray:
+    """Rotates an array of keypoints of shape `(N, 5)` by 90 degrees. See `keypoint_rot90`."""
+    if factor not in {0, 1, 2, 3}:
+        raise ValueError("Parameter n must be in set {0, 1, 2, 3}")
+    if axes not in {"xy", "yz", "xz"}:
+        raise ValueError("Parameter axes must be one of {'xy','yz','xz'}")
+
+    x, y, z, angle, scale = keypoints[:, :5].T
+    if axes == "xy":
+        if factor == 1:
+            x, y, z, angle = y, (cols - 1) - x, z, angle - math.pi / 2
+        elif factor == 2:
+            x, y, z, angle = (cols - 1) - x, (rows - 1) - y, z, angle - math.pi
+        elif factor == 3:
+            x, y, z, angle = (rows - 1) - y, x, z, angle + math.pi / 2
+    if axes == "xz":
+        if factor == 1:
+            x, y, z = (slices - 1) - z, y, x
+        elif factor == 2:
+            x, y, z = (cols - 1) - x, y, (slices - 1) - z
+        elif factor == 3:
+            x, y, z = z, y, (cols - 1) - x
+    if axes == "yz":
+        if factor == 1:
+            x, y, z = x, (slices - 1) - z, y
+        elif factor == 2:
+            x, y, z = x, (rows - 1) - y, (slices - 1) - z
+        elif factor == 3:
+            x, y, z = x, z, (rows - 1) - y
+
+    return np.stack([x, y, z, angles_to_2pi_range(angle), scale], axis=1)
+
+
+def _transform_keypoints(
+    keypoints: np.ndarray,
+    matrix: np.ndarray,
+    in_center: np.ndarray,
+    offset: np.ndarray,
+    angle: float,
+    scale: float,
+) -> np.ndarray:
+    """Maps the points `(y, x, z)` of an array of keypoints of shape `(N, 5)` through `matrix` around `in_center`,
+    adds `offset`, `angle` to the angles and multiplies the scales by `scale`"""
+    points = keypoints[:, [1, 0, 2]] - in_center
+    y, x, z = (np.matmul(matrix, points.T).T + offset).T
+    return np.stack(
+        [x, y, z, angles_to_2pi_range(keypoints[:, 3] + angle), keypoints[:, 4] * scale], axis=1
+    )
+
+
 def _get_new_image_shape(rows, cols, slices, rot_mat, scale_x=1, scale_y=1, scale_z=1):
     """
     Finds the bounding box of the image transformation and provides the new shape that encapsulates the entire image
@@ -215,6 +338,176 @@ def _get_image_center(shape):
     return (np.array(shape) - 1) / 2
 
 
+def _to_homogeneous(matrix: np.ndarray, offset: np.ndarray) -> np.ndarray:
+    """Packs a 3x3 matrix and an offset vector into a 4x4 homogeneous matrix"""
+    affine = np.eye(4)
+    affine[:3, :3] = matrix
+    affine[:3, 3] = offset
+    return affine
+
+
+def get_rotate_affine(
+    shape: Sequence[int], angle: float, axes: str, crop_to_border: bool = False
+) -> Tuple[np.ndarray, Tuple[int, int, int]]:
+    """
+    Returns the homogeneous matrix used by `rotate`. As in `scipy.ndimage.affine_transform`, the matrix maps
+    output voxel coordinates `(row, col, slice, 1)` to input voxel coordinates.
+
+    Args:
+        shape (tuple): the `(rows, cols, slices)` of the input
+        angle (float): Angle of rotation in degrees.
+        axes (str): The axis of rotation. Must be one of `{'xy', 'xz', 'yz'}`.
+        crop_to_border (bool): whether the output shape is grown to fit the entire rotation
+
+    Returns:
+        the 4x4 matrix and the output shape
+    """
+    rows, cols, slices = shape[:3]
+    out_shape = in_shape = (rows, cols, slices)
+    in_center = _get_image_center(in_shape)
+    out_center = _get_image_center(out_shape)
+
+    rotation_matrix = _get_rotation_matrix(np.deg2rad(angle), axes, dir=-1)
+
+    if crop_to_border:
+        out_shape = _get_new_image_shape(rows, cols, slices, rotation_matrix)
+        out_center = _get_image_center(out_shape)
+
+    matrix = np.linalg.inv(rotation_matrix)
+    offset = in_center - np.dot(matrix, out_center)
+    return _to_homogeneous(matrix, offset), out_shape
+
+
+def get_shift_scale_rotate_affine(
+    shape: Sequence[int],
+    angle: float,
+    scale: float,
+    dx: float,
+    dy: float,
+    dz: float,
+    axes: str = "xy",
+    crop_to_border: bool = False,
+) -> Tuple[np.ndarray, Tuple[int, int, int]]:
+    """
+    Returns the homogeneous matrix used by `shift_scale_rotate`, with the translation folded into the offset.
+    See `get_rotate_affine` for the matrix convention.
+
+    Args:
+        shape (tuple): the `(rows, cols, slices)` of the input
+        angle (float): an angle in degrees
+        scale (float): the factor to scale the image by
+        dx (float): shift factor for width
+        dy (float): shift factor for height
+        dz (float): shift factor for depth
+        axes (str): the axes to rotate along
+        crop_to_border (bool): whether the output shape is grown to fit the entire rotation
+
+    Returns:
+        the 4x4 matrix and the output shape
+    """
+    rows, cols, slices = shape[:3]
+    out_shape = in_shape = (rows, cols, slices)
+    in_center = _get_image_center(in_shape)
+    out_center = _get_image_center(out_shape)
+
+    rotation_matrix = _get_rotation_matrix(np.deg2rad(angle), axes, dir=-1)
+    scale_matrix = _get_scale_matrix(scale, scale, scale)
+
+    if crop_to_border:
+        out_shape = _get_new_image_shape(rows, cols, slices, rotation_matrix, scale, scale, scale)
+        out_center = _get_image_center(out_shape)
+
+    matrix = np.linalg.inv(np.matmul(rotation_matrix, scale_matrix))
+    offset = in_center - np.dot(matrix, out_center)
+    # translating the output by `shift` samples the input at `matrix @ (x - shift) + offset`
+    shift = np.array([dy, dx, dz]) * np.array(out_shape)
+    offset = offset - np.dot(matrix, shift)
+    return _to_homogeneous(matrix, offset), out_shape
+
+
+def get_scale_affine(
+    shape: Sequence[int], out_shape: Sequence[int]
+) -> np.ndarray:
+    """
+    Returns the homogeneous matrix equivalent to `scipy.ndimage.zoom` from `shape` to `out_shape`, which aligns
+    the corner voxels of input and output. See `get_rotate_affine` for the matrix convention.
+
+    Args:
+        shape (tuple): the `(rows, cols, slices)` of the input
+        out_shape (tuple): the `(rows, cols, slices)` of the output
+    """
+    in_size = np.array(shape[:3], dtype=np.float64)
+    out_size = np.array(out_shape[:3], dtype=np.float64)
+    factors = np.divide(
+        in_size - 1, out_size - 1, out=np.ones(3), where=out_size > 1
+    )
+    return _to_homogeneous(np.diag(factors), np.zeros(3))
+
+
+def get_flip_affine(shape: Sequence[int], d: int) -> np.ndarray:
+    """
+    Returns the homogeneous matrix equivalent to `random_flip`. See `get_rotate_affine` for the matrix convention.
+
+    Args:
+        shape (tuple): the `(rows, cols, slices)` of the input
+        d (int): code that specifies how to flip the input. 0 for vertical flipping, 1 for horizontal flipping,
+            2 for z-axis flip, or -1 for vertical, horizontal, and z-axis flipping
+    """
+    if d not in {-1, 0, 1, 2}:
+        raise ValueError(
+            "Invalid d value {}. Valid values are -1, 0, 1, and 2".format(d)
+        )
+    axes = [0, 1, 2] if d == -1 else [d]
+    diagonal = np.ones(3)
+    offset = np.zeros(3)
+    for axis in axes:
+        diagonal[axis] = -1
+        offset[axis] = shape[axis] - 1
+    return _to_homogeneous(np.diag(diagonal), offset)
+
+
+@preserve_channel_dim
+def warp_affine(
+    img: np.ndarray,
+    matrix: np.ndarray,
+    output_shape: Sequence[int],
+    interpolation: int = INTER_LINEAR,
+    border_mode: str = "constant",
+    value: Union[float, int] = 0,
+    num_threads: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Resamples an image through a homogeneous matrix in a single interpolation pass.
+
+    Args:
+        img (np.ndarray): an image
+        matrix (np.ndarray): a 4x4 matrix mapping output voxel coordinates to input voxel coordinates
+        output_shape (tuple): the `(rows, cols, slices)` of the output
+        interpolation (int): scipy interpolation method (e.g. dicaugment.INTER_NEAREST).
+            Default: dicaugment.INTER_LINEAR
+        border_mode (str): scipy parameter to determine how the input image is extended. See `rotate`.
+            Default: `constant`
+        value: The fill value when border_mode = `constant`. Default: 0
+        num_threads (int): the number of worker threads used to process the channels.
+            If None, `dicaugment.get_num_threads()` is used. Default: None
+
+    Returns:
+        Image
+    """
+    warp_affine_fn = _maybe_process_by_channel(
+        ndimage.affine_transform,
+        num_threads=num_threads,
+        channel_shape=output_shape[:3],
+        matrix=matrix[:3, :3],
+        offset=matrix[:3, 3],
+        order=interpolation,
+        output_shape=tuple(output_shape[:3]),
+        mode=border_mode,
+        cval=value,
+    )
+    return warp_affine_fn(img)
+
+
 @preserve_channel_dim
 def rotate(
     img: np.ndarray,
@@ -222,8 +515,9 @@ def rotate(
     axes: str,
     crop_to_border: bool = False,
     interpolation: int = INTER_LINEAR,
-    border_mode: int = "constant",
+    border_mode: str = "constant",
     value: Union[float, int] = 0,
+    num_threads: Optional[int] = None,
 ):
     """
     Rotates an image by angle degrees.
@@ -247,39 +541,16 @@ def rotate(
 
             Default: `constant`
         value: The fill value when border_mode = `constant`. Default: 0
+        num_threads: the number of worker threads used to process the channels.
+            If None, `dicaugment.get_num_threads()` is used. Default: None
 
     Returns:
         Image
 
     """
 
-    out_shape = in_shape = img.shape[:3]
-    height, width, depth = out_shape
-    in_center = _get_image_center(in_shape)
-    out_center = _get_image_center(out_shape)
-
-    angle = np.deg2rad(angle)
-
-    rotation_matrix = _get_rotation_matrix(angle, axes, dir=-1)
-
-    if crop_to_border:
-        out_shape = _get_new_image_shape(height, width, depth, rotation_matrix)
-        out_center = _get_image_center(out_shape)
-
-    matrix = np.linalg.inv(rotation_matrix)
-    offset = in_center - np.dot(matrix, out_center)
-
-    warp_affine_fn = _maybe_process_by_channel(
-        ndimage.affine_transform,
-        matrix=matrix,
-        offset=offset,
-        order=interpolation,
-        output_shape=out_shape,
-        mode=border_mode,
-        cval=value,
-    )
-
-    return warp_affine_fn(img)
+    matrix, out_shape = get_rotate_affine(img.shape, angle, axes, crop_to_border)
+    return warp_affine(img, matrix, out_shape, interpolation, border_mode, value, num_threads)
 
 
 def bbox_rotate(
@@ -375,6 +646,89 @@ def bbox_rotate(
     return list(map(lambda x: x + 0.5, normalize_bbox(bbox, rows, cols, slices)))
 
 
+def _bboxes_points(
+    bboxes: np.ndarray, method: str, axes: str, rows: int, cols: int, slices: int
+) -> np.ndarray:
+    """Returns the points `(y, x, z)` of an array of normalized bounding boxes of shape `(N, 6)` that are rotated
+    by `bboxes_rotate` and `bboxes_shift_scale_rotate`, as an array of shape `(N, P, 3)` centered on the image.
+    `axes` is the plane of the ellipses of the "ellipse" method."""
+    x_min, y_min, z_min, x_max, y_max, z_max = denormalize_bboxes_array(
+        bboxes[:, :6] - 0.5, rows, cols, slices
+    ).T
+    if method == "largest_box":
+        return np.stack(
+            [
+                np.stack(p, axis=1)
+                for p in (
+                    (y_min, x_min, z_min),
+                    (y_min, x_min, z_max),
+                    (y_max, x_min, z_min),
+                    (y_max, x_min, z_max),
+                    (y_min, x_max, z_min),
+                    (y_min, x_max, z_max),
+                    (y_max, x_max, z_min),
+                    (y_max, x_max, z_max),
+                )
+            ],
+            axis=1,
+        )
+
+    if method == "ellipse":
+        # same float32 precision as the points of `bbox_rotate`
+        w = ((x_max - x_min) / 2)[:, None]
+        h = ((y_max - y_min) / 2)[:, None]
+        d = ((z_max - z_min) / 2)[:, None]
+        radians = np.radians(np.arange(0, 360, dtype=np.float32))
+        sin, cos = np.sin(radians), np.cos(radians)
+
+        def _arc(r, trig, start):
+            return np.tile(r.astype(np.float32) * trig + (r + start[:, None]).astype(np.float32), 2)
+
+        def _faces(low, high):
+            return np.repeat(np.stack([low, high], axis=1), 360, axis=1)
+
+        if axes == "xy":
+            x, y, z = _arc(w, sin, x_min), _arc(h, cos, y_min), _faces(z_min, z_max)
+        elif axes == "xz":
+            x, y, z = _arc(w, sin, x_min), _faces(y_min, y_max), _arc(d, cos, z_min)
+        elif axes == "yz":
+            x, y, z = _faces(x_min, x_max), _arc(h, cos, y_min), _arc(d, sin, z_min)
+        else:
+            raise ValueError("Parameter axes must be one of {'xy','yz','xz'}")
+        return np.stack([y, x, z], axis=-1)
+
+    raise ValueError(f"Method {method} is not a valid rotation method.")
+
+
+def _bboxes_from_points(points: np.ndarray) -> np.ndarray:
+    """Returns the bounding boxes `(x_min, y_min, z_min, x_max, y_max, z_max)` of an array of points `(y, x, z)`
+    of shape `(N, P, 3)`"""
+    low, high = points.min(axis=1), points.max(axis=1)
+    return np.concatenate([low[:, [1, 0, 2]], high[:, [1, 0, 2]]], axis=1)
+
+
+def bboxes_rotate(
+    bboxes: np.ndarray,
+    angle: float,
+    method: str,
+    axes: str,
+    crop_to_border: bool,
+    rows: int,
+    cols: int,
+    slices: int,
+) -> np.ndarray:
+    """Rotates an array of bounding boxes of shape `(N, 6)` by angle degrees. See `bbox_rotate`."""
+    points = _bboxes_points(bboxes, method, axes, rows, cols, slices)
+
+    rotation_matrix = _get_rotation_matrix(np.deg2rad(angle), axes, dir=-1 if axes == "xy" else 1)
+    points = np.matmul(rotation_matrix, points.reshape(-1, 3).T).T.reshape(points.shape)
+
+    if crop_to_border:
+        rows, cols, slices = _get_new_image_shape(rows, cols, slices, rotation_matrix)
+
+    return normalize_bboxes_array(_bboxes_from_points(points), rows, cols, slices) + 0.5
+
+
 @angle_2pi_range
 def keypoint_rotate(
     keypoint,
@@ -425,6 +779,33 @@ def keypoint_rotate(
     return x, y, z, a + (angle if axes == "xy" else 0), s
 
 
+def keypoints_rotate(
+    keypoints: np.ndarray,
+    angle: float,
+    axes: str,
+    crop_to_border: bool,
+    rows: int,
+    cols: int,
+    slices: int,
+    **params,
+) -> np.ndarray:
+    """Rotate an array of keypoints of shape `(N, 5)` by angle. See `keypoint_rotate`."""
+    angle = np.deg2rad(angle)
+    axes = {"xz": "yz", "yz": "xz"}.get(axes, axes)
+
+    in_center = _get_image_center((rows, cols, slices))
+    out_center = in_center.copy()
+    rotation_matrix = _get_rotation_matrix(angle, axes, dir=-1)
+
+    if crop_to_border:
+        out_shape = _get_new_image_shape(rows, cols, slices, rotation_matrix)
+        out_center = _get_image_center(out_shape)
+
+    return _transform_keypoints(
+        keypoints, rotation_matrix, in_center, out_center, angle if axes == "xy" else 0, 1
+    )
+
+
 def _get_rotation_matrix(theta, axes, dir=1):
     if axes == "xy":
         arr = np.array(
@@ -506,6 +887,7 @@ def shift_scale_rotate(
     interpolation=INTER_LINEAR,
     border_mode="constant",
     value=0,
+    num_threads=None,
 ):
     """
     Applies an affine transform to am image
@@ -533,39 +915,16 @@ def shift_scale_rotate(
 
             Default: `constant`
         value: The fill value when border_mode = `constant`. Default: 0
-    """
-    out_shape = in_shape = img.shape[:3]
-    height, width, depth = out_shape
-    in_center = _get_image_center(in_shape)
-    out_center = _get_image_center(out_shape)
-
-    scale = (scale,) * 3
-    angle = np.deg2rad(angle)
+        num_threads (int): the number of worker threads used to process the channels.
+            If None, `dicaugment.get_num_threads()` is used. Default: None
 
-    rotation_matrix = _get_rotation_matrix(angle, axes, dir=-1)
-    scale_matrix = _get_scale_matrix(*scale)
-
-    if crop_to_border:
-        out_shape = _get_new_image_shape(height, width, depth, rotation_matrix, *scale)
-        out_center = _get_image_center(out_shape)
-
-    matrix = np.linalg.inv(np.matmul(rotation_matrix, scale_matrix))
-    offset = in_center - np.dot(matrix, out_center)
-    shift = np.array([dy, dx, dz]) * np.array(out_shape)
-
-    warp_affine_fn = _maybe_process_by_channel(
-        ndimage.affine_transform,
-        matrix=matrix,
-        offset=offset,
-        order=interpolation,
-        output_shape=out_shape,
-        mode=border_mode,
-        cval=value,
-    )
-    translate_fn = _maybe_process_by_channel(
-        ndimage.shift, shift=shift, order=interpolation, mode=border_mode, cval=value
+    Note:
+        The translation is folded into the offset of the affine transformation, so the image is resampled only once.
+    """
+    matrix, out_shape = get_shift_scale_rotate_affine(
+        img.shape, angle, scale, dx, dy, dz, axes, crop_to_border
     )
-    return translate_fn(warp_affine_fn(img))
+    return warp_affine(img, matrix, out_shape, interpolation, border_mode, value, num_threads)
 
 
 @angle_2pi_range
@@ -629,6 +988,42 @@ def keypoint_shift_scale_rotate(
     return x, y, z, a + (angle if axes == "xy" else 0), s * scale[0]
 
 
+def keypoints_shift_scale_rotate(
+    keypoints: np.ndarray,
+    angle: float,
+    scale: float,
+    dx: float,
+    dy: float,
+    dz: float,
+    axes: str = "xy",
+    crop_to_border: bool = False,
+    rows: int = 0,
+    cols: int = 0,
+    slices: int = 0,
+    **params,
+) -> np.ndarray:
+    """Rotates, shifts and scales an array of keypoints of shape `(N, 5)`. See `keypoint_shift_scale_rotate`."""
+    out_shape = height, width, depth = rows, cols, slices
+    in_center = np.array(out_shape) / 2
+    out_center = in_center.copy()
+    angle = np.deg2rad(angle)
+    axes = {"xz": "yz", "yz": "xz"}.get(axes, axes)
+
+    rotation_matrix = _get_rotation_matrix(angle, axes, dir=-1)
+    scale_matrix = _get_scale_matrix(scale, scale, scale)
+
+    if crop_to_border:
+        out_shape = _get_new_image_shape(height, width, depth, rotation_matrix, scale, scale, scale)
+        out_center = _get_image_center(out_shape)
+
+    matrix = np.matmul(rotation_matrix, scale_matrix)
+    shift = np.array([dy, dx, dz]) * np.array(out_shape)
+
+    return _transform_keypoints(
+        keypoints, matrix, in_center, out_center + shift, angle if axes == "xy" else 0, scale
+    )
+
+
 def bbox_shift_scale_rotate(
     bbox,
     angle,
@@ -746,6 +1141,43 @@ def bbox_shift_scale_rotate(
     ]
 
 
+def bboxes_shift_scale_rotate(
+    bboxes: np.ndarray,
+    angle: float,
+    scale: float,
+    dx: float,
+    dy: float,
+    dz: float,
+    axes: str = "xy",
+    crop_to_border: bool = False,
+    rotate_method: str = "largest_box",
+    rows: int = 0,
+    cols: int = 0,
+    slices: int = 0,
+    **kwargs,
+) -> np.ndarray:  # skipcq: PYL-W0613
+    """Rotates, shifts and scales an array of bounding boxes of shape `(N, 6)`. See `bbox_shift_scale_rotate`."""
+    # the ellipses of `bbox_shift_scale_rotate` lie in the plane `_bboxes_points` names by the other two axes
+    ellipse_axes = {"xy": "xy", "yz": "xz", "xz": "yz"}.get(axes, axes)
+    points = _bboxes_points(bboxes, rotate_method, ellipse_axes, rows, cols, slices)
+
+    rotation_matrix = _get_rotation_matrix(np.deg2rad(angle), axes, dir=-1 if axes == "xy" else 1)
+    scale_matrix = _get_scale_matrix(scale, scale, scale)
+
+    if crop_to_border:
+        rows, cols, slices = _get_new_image_shape(
+            rows, cols, slices, rotation_matrix, scale, scale, scale
+        )
+
+    matrix = np.matmul(rotation_matrix, scale_matrix)
+    points = np.matmul(matrix, points.reshape(-1, 3).T).T.reshape(points.shape)
+
+    # normalize points to assumed [0,1] range then apply translation
+    return (normalize_bboxes_array(_bboxes_from_points(points), rows, cols, slices) + 0.5) + np.array(
+        [dx, dy, dz, dx, dy, dz]
+    )
+
+
 def _resize(img, dsize, interpolation):
     img_height, img_width, img_depth = img.shape[:3]
     dst_height, dst_width, dst_depth = dsize
@@ -758,7 +1190,14 @@ def _resize(img, dsize, interpolation):
 
 
 @preserve_channel_dim
-def resize(img: np.ndarray, height: int, width: int, depth: int , interpolation: int = INTER_LINEAR):
+def resize(
+    img: np.ndarray,
+    height: int,
+    width: int,
+    depth: int,
+    interpolation: int = INTER_LINEAR,
+    num_threads: Optional[int] = None,
+):
     """
     Resizes an image
     
@@ -768,12 +1207,17 @@ def resize(img: np.ndarray, height: int, width: int, depth: int , interpolation:
         width (int): desired width of the output.
         depth (int): desired depth of the output.
         interpolation (int): scipy interpolation method (e.g. dicaugment.INTER_NEAREST). Default: dicaugment.INTER_LINEAR
+        num_threads (int): the number of worker threads used to process the channels.
+            If None, `dicaugment.get_num_threads()` is used. Default: None
     """
     img_height, img_width, img_depth = img.shape[:3]
     if height == img_height and width == img_width and depth == img_depth:
         return img
     resize_fn = _maybe_process_by_channel(
-        _resize, dsize=(height, width, depth), interpolation=interpolation
+        _resize,
+        num_threads=num_threads,
+        dsize=(height, width, depth),
+        interpolation=interpolation,
     )
     return resize_fn(img)
 
@@ -783,6 +1227,7 @@ def scale(
     img: np.ndarray,
     scale: Union[float, Tuple[float]],
     interpolation: int = INTER_LINEAR,
+    num_threads: Optional[int] = None,
 ) -> np.ndarray:
     """
     Scales an image.
@@ -791,8 +1236,14 @@ def scale(
         img (np.ndarray): an image
         scale (float, tuple): Scaling factor. If a tuple, then each dimension of image is scaled by respective element in tuple
         interpolation (int): scipy interpolation method (e.g. dicaugment.INTER_NEAREST). Default: dicaugment.INTER_LINEAR
+        num_threads (int): the number of worker threads used to process the channels.
+            If None, `dicaugment.get_num_threads()` is used. Default: None
     """
-    scale_fn = _maybe_process_by_channel(ndimage.zoom, zoom=scale, order=interpolation)
+    # the shape `ndimage.zoom` gives each channel
+    channel_shape = [int(round(size * factor)) for size, factor in zip(img.shape[:3], np.broadcast_to(scale, (3,)))]
+    scale_fn = _maybe_process_by_channel(
+        ndimage.zoom, num_threads=num_threads, channel_shape=channel_shape, zoom=scale, order=interpolation
+    )
     return scale_fn(img)
 
 
@@ -821,6 +1272,13 @@ def keypoint_scale(
     )
 
 
+def keypoints_scale(
+    keypoints: np.ndarray, scale_x: float, scale_y: float, scale_z: float
+) -> np.ndarray:
+    """Scales an array of keypoints of shape `(N, 5)`. See `keypoint_scale`."""
+    return keypoints[:, :5] * np.array([scale_x, scale_y, scale_z, 1, max((scale_x, scale_y, scale_z))])
+
+
 def py3round(number):
     """Unified rounding in all python versions."""
     if abs(round(number) - number) == 0.5:
@@ -942,6 +1400,12 @@ def bbox_vflip(
     return x_min, 1 - y_max, z_min, x_max, 1 - y_min, z_max
 
 
+def bboxes_vflip(bboxes: np.ndarray, rows: int, cols: int, slices: int) -> np.ndarray:  # skipcq: PYL-W0613
+    """Flip an array of bounding boxes of shape `(N, 6)` vertically around the x-axis. See `bbox_vflip`."""
+    x_min, y_min, z_min, x_max, y_max, z_max = bboxes[:, :6].T
+    return np.stack([x_min, 1 - y_max, z_min, x_max, 1 - y_min, z_max], axis=1)
+
+
 def bbox_hflip(
     bbox: BoxInternalType, rows: int, cols: int, slices: int
 ) -> BoxInternalType:  # skipcq: PYL-W0613
@@ -961,6 +1425,12 @@ def bbox_hflip(
     return 1 - x_max, y_min, z_min, 1 - x_min, y_max, z_max
 
 
+def bboxes_hflip(bboxes: np.ndarray, rows: int, cols: int, slices: int) -> np.ndarray:  # skipcq: PYL-W0613
+    """Flip an array of bounding boxes of shape `(N, 6)` horizontally around the y-axis. See `bbox_hflip`."""
+    x_min, y_min, z_min, x_max, y_max, z_max = bboxes[:, :6].T
+    return np.stack([1 - x_max, y_min, z_min, 1 - x_min, y_max, z_max], axis=1)
+
+
 def bbox_zflip(
     bbox: BoxInternalType, rows: int, cols: int, slices: int
 ) -> BoxInternalType:  # skipcq: PYL-W0613
@@ -980,6 +1450,12 @@ def bbox_zflip(
     return x_min, y_min, 1 - z_max, x_max, y_max, 1 - z_min
 
 
+def bboxes_zflip(bboxes: np.ndarray, rows: int, cols: int, slices: int) -> np.ndarray:  # skipcq: PYL-W0613
+    """Flip an array of bounding boxes of shape `(N, 6)` on the z-axis. See `bbox_zflip`."""
+    x_min, y_min, z_min, x_max, y_max, z_max = bboxes[:, :6].T
+    return np.stack([x_min, y_min, 1 - z_max, x_max, y_max, 1 - z_min], axis=1)
+
+
 def bbox_flip(
     bbox: BoxInternalType, d: int, rows: int, cols: int, slices: int
 ) -> BoxInternalType:
@@ -1016,6 +1492,30 @@ def bbox_flip(
     return bbox
 
 
+def bboxes_flip(bboxes: np.ndarray, d: int, rows: int, cols: int, slices: int) -> np.ndarray:
+    """Flip an array of bounding boxes of shape `(N, 6)` depending on the value of `d`. See `bbox_flip`.
+
+    Raises:
+        ValueError: if value of `d` is not -1, 0, 1, 2.
+
+    """
+    if d == 0:
+        bboxes = bboxes_vflip(bboxes, rows, cols, slices)
+    elif d == 1:
+        bboxes = bboxes_hflip(bboxes, rows, cols, slices)
+    elif d == 2:
+        bboxes = bboxes_zflip(bboxes, rows, cols, slices)
+    elif d == -1:
+        bboxes = bboxes_hflip(bboxes, rows, cols, slices)
+        bboxes = bboxes_vflip(bboxes, rows, cols, slices)
+        bboxes = bboxes_zflip(bboxes, rows, cols, slices)
+    else:
+        raise ValueError(
+            "Invalid d value {}. Valid values are -1, 0, 1, and 2".format(d)
+        )
+    return bboxes
+
+
 def bbox_transpose(
     bbox: KeypointInternalType, axis: int, rows: int, cols: int, slices: int
 ) -> KeypointInternalType:  # skipcq: PYL-W0613
@@ -1065,6 +1565,12 @@ def keypoint_vflip(
     return x, (rows - 1) - y, z, angle, scale
 
 
+def keypoints_vflip(keypoints: np.ndarray, rows: int, cols: int, slices: int) -> np.ndarray:
+    """Flip an array of keypoints of shape `(N, 5)` vertically around the x-axis. See `keypoint_vflip`."""
+    x, y, z, angle, scale = keypoints[:, :5].T
+    return np.stack([x, (rows - 1) - y, z, angles_to_2pi_range(-angle), scale], axis=1)
+
+
 @angle_2pi_range
 def keypoint_hflip(
     keypoint: KeypointInternalType, rows: int, cols: int, slices: int
@@ -1086,6 +1592,12 @@ def keypoint_hflip(
     return (cols - 1) - x, y, z, angle, scale
 
 
+def keypoints_hflip(keypoints: np.ndarray, rows: int, cols: int, slices: int) -> np.ndarray:
+    """Flip an array of keypoints of shape `(N, 5)` horizontally around the y-axis. See `keypoint_hflip`."""
+    x, y, z, angle, scale = keypoints[:, :5].T
+    return np.stack([(cols - 1) - x, y, z, angles_to_2pi_range(math.pi - angle), scale], axis=1)
+
+
 @angle_2pi_range
 def keypoint_zflip(
     keypoint: KeypointInternalType, rows: int, cols: int, slices: int
@@ -1106,6 +1618,12 @@ def keypoint_zflip(
     return x, y, (slices - 1) - z, angle, scale
 
 
+def keypoints_zflip(keypoints: np.ndarray, rows: int, cols: int, slices: int) -> np.ndarray:
+    """Flip an array of keypoints of shape `(N, 5)` along the z-axis. See `keypoint_zflip`."""
+    x, y, z, angle, scale = keypoints[:, :5].T
+    return np.stack([x, y, (slices - 1) - z, angles_to_2pi_range(angle), scale], axis=1)
+
+
 def keypoint_flip(
     keypoint: KeypointInternalType, d: int, rows: int, cols: int, slices: int
 ) -> KeypointInternalType:
@@ -1144,6 +1662,30 @@ def keypoint_flip(
     return keypoint
 
 
+def keypoints_flip(
+    keypoints: np.ndarray, d: int, rows: int, cols: int, slices: int
+) -> np.ndarray:
+    """Flip an array of keypoints of shape `(N, 5)` depending on the value of `d`. See `keypoint_flip`.
+
+    Raises:
+        ValueError: if value of `d` is not -1, 0, 1 or 2.
+
+    """
+    if d == 0:
+        keypoints = keypoints_vflip(keypoints, rows, cols, slices)
+    elif d == 1:
+        keypoints = keypoints_hflip(keypoints, rows, cols, slices)
+    elif d == 2:
+        keypoints = keypoints_zflip(keypoints, rows, cols, slices)
+    elif d == -1:
+        keypoints = keypoints_hflip(keypoints, rows, cols, slices)
+        keypoints = keypoints_vflip(keypoints, rows, cols, slices)
+        keypoints = keypoints_zflip(keypoints, rows, cols, slices)
+    else:
+        raise ValueError(f"Invalid d value {d}. Valid values are -1, 0, 1, and 2")
+    return keypoints
+
+
 def keypoint_transpose(keypoint: KeypointInternalType) -> KeypointInternalType:
     """Rotate a keypoint by angle.
 
@@ -1164,6 +1706,13 @@ def keypoint_transpose(keypoint: KeypointInternalType) -> KeypointInternalType:
     return y, x, z, angle, scale
 
 
+def keypoints_transpose(keypoints: np.ndarray) -> np.ndarray:
+    """Transposes an array of keypoints of shape `(N, 5)`. See `keypoint_transpose`."""
+    x, y, z, angle, scale = keypoints[:, :5].T
+    angle = np.where(angle <= np.pi, np.pi - angle, 3 * np.pi - angle)
+    return np.stack([y, x, z, angle, scale], axis=1)
+
+
 @preserve_channel_dim
 def pad(
     img: np.ndarray,
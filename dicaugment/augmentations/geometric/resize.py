@@ -65,10 +65,25 @@ class RandomScale(DualTransform):
         """Applies the transformation to a keypoint"""
         return F.keypoint_scale(keypoint, scale, scale, scale)
 
+    def apply_to_keypoints_array(self, keypoints, scale=1, **params):
+        """Applies the transformation to an array of keypoints"""
+        return F.keypoints_scale(keypoints, scale, scale, scale)
+
     def apply_to_dicom(self, dicom: DicomType, scale=1, **params) -> DicomType:
         """Applies the augmentation to a dicom type"""
         return Fdicom.dicom_scale(dicom, scale, scale)
 
+    @property
+    def is_affine(self) -> bool:
+        return True
+
+    def get_affine(
+        self, scale: float = 1, rows: int = 0, cols: int = 0, slices: int = 0, **params
+    ) -> Tuple[np.ndarray, Tuple[int, int, int]]:
+        """Returns the homogeneous matrix of the transformation and the output shape"""
+        out_shape = int(round(rows * scale)), int(round(cols * scale)), int(round(slices * scale))
+        return F.get_scale_affine((rows, cols, slices), out_shape), out_shape
+
     def get_transform_init_args(self):
         """Returns initialization arguments (e.g. Transform(arg1 = 1, arg2 = 2) -> ('arg1' : 1, 'arg2': 2))"""
         return {
@@ -130,6 +145,17 @@ class LongestMaxSize(DualTransform):
         scale = max_size / max([height, width, depth])
         return F.keypoint_scale(keypoint, scale, scale, scale)
 
+    def apply_to_keypoints_array(
+        self, keypoints: np.ndarray, max_size: int = 1024, **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        height = params["rows"]
+        width = params["cols"]
+        depth = params["slices"]
+
+        scale = max_size / max([height, width, depth])
+        return F.keypoints_scale(keypoints, scale, scale, scale)
+
     def apply_to_dicom(
         self, dicom: DicomType, max_size: int = 1024, **params
     ) -> DicomType:
@@ -140,6 +166,15 @@ class LongestMaxSize(DualTransform):
         scale = max_size / min([height, width, depth])
         return Fdicom.dicom_scale(dicom, scale, scale)
 
+    def get_output_shape(
+        self, max_size: int = 1024, rows: int = 0, cols: int = 0, slices: int = 0, **params
+    ) -> Tuple[int, int, int]:
+        """Returns the `(rows, cols, slices)` of the image that `apply` would return"""
+        scale = max_size / float(max([rows, cols, slices]))
+        if scale == 1.0:
+            return rows, cols, slices
+        return int(round(rows * scale)), int(round(cols * scale)), int(round(slices * scale))
+
     def get_params(self) -> Dict[str, int]:
         """Returns parameters needed for the `apply` methods"""
         return {
@@ -206,6 +241,17 @@ class SmallestMaxSize(DualTransform):
         scale = max_size / min([height, width, depth])
         return F.keypoint_scale(keypoint, scale, scale, scale)
 
+    def apply_to_keypoints_array(
+        self, keypoints: np.ndarray, max_size: int = 1024, **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        height = params["rows"]
+        width = params["cols"]
+        depth = params["slices"]
+
+        scale = max_size / min([height, width, depth])
+        return F.keypoints_scale(keypoints, scale, scale, scale)
+
     def apply_to_dicom(
         self, dicom: DicomType, max_size: int = 1024, **params
     ) -> DicomType:
@@ -216,6 +262,15 @@ class SmallestMaxSize(DualTransform):
         scale = max_size / min([height, width, depth])
         return Fdicom.dicom_scale(dicom, scale, scale)
 
+    def get_output_shape(
+        self, max_size: int = 1024, rows: int = 0, cols: int = 0, slices: int = 0, **params
+    ) -> Tuple[int, int, int]:
+        """Returns the `(rows, cols, slices)` of the image that `apply` would return"""
+        scale = max_size / float(min([rows, cols, slices]))
+        if scale == 1.0:
+            return rows, cols, slices
+        return int(round(rows * scale)), int(round(cols * scale)), int(round(slices * scale))
+
     def get_params(self) -> Dict[str, Any]:
         """Returns parameters needed for the `apply` methods"""
         return {
@@ -286,6 +341,17 @@ class Resize(DualTransform):
         scale_y = self.height / height
         return Fdicom.dicom_scale(dicom, scale_x, scale_y)
 
+    @property
+    def is_affine(self) -> bool:
+        return True
+
+    def get_affine(
+        self, rows: int = 0, cols: int = 0, slices: int = 0, **params
+    ) -> Tuple[np.ndarray, Tuple[int, int, int]]:
+        """Returns the homogeneous matrix of the transformation and the output shape"""
+        out_shape = (self.height, self.width, self.depth)
+        return F.get_scale_affine((rows, cols, slices), out_shape), out_shape
+
     def apply_to_keypoint(
         self, keypoint: KeypointInternalType, **params
     ) -> KeypointInternalType:
@@ -298,6 +364,18 @@ class Resize(DualTransform):
         scale_z = self.depth / depth
         return F.keypoint_scale(keypoint, scale_x, scale_y, scale_z)
 
+    def apply_to_keypoints_array(
+        self, keypoints: np.ndarray, **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        height = params["rows"]
+        width = params["cols"]
+        depth = params["slices"]
+        scale_x = self.width / width
+        scale_y = self.height / height
+        scale_z = self.depth / depth
+        return F.keypoints_scale(keypoints, scale_x, scale_y, scale_z)
+
     def get_transform_init_args_names(self) -> Tuple[str, ...]:
         """Returns initialization argument names. (e.g. Transform(arg1 = 1, arg2 = 2) -> ('arg1', 'arg2'))"""
         return ("height", "width", "depth", "interpolation")
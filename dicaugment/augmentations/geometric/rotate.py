@@ -96,6 +96,12 @@ class RandomRotate90(DualTransform):
         """Applies the transformation to a bbox"""
         return F.bbox_rot90(bbox, factor, axes, **params)
 
+    def apply_to_bboxes_array(
+        self, bboxes: np.ndarray, factor: int = 0, axes: str = "xy", **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of bboxes"""
+        return F.bboxes_rot90(bboxes, factor, axes, **params)
+
     def apply_to_keypoint(
         self,
         keypoint: KeypointInternalType,
@@ -106,6 +112,26 @@ class RandomRotate90(DualTransform):
         """Applies the transformation to a keypoint"""
         return F.keypoint_rot90(keypoint, factor, axes, **params)
 
+    def apply_to_keypoints_array(
+        self,
+        keypoints: np.ndarray,
+        factor: int = 0,
+        axes: str = "xy",
+        **params,
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        return F.keypoints_rot90(keypoints, factor, axes, **params)
+
+    def get_output_shape(
+        self, factor: int = 0, axes: str = "xy", rows: int = 0, cols: int = 0, slices: int = 0, **params
+    ) -> Tuple[int, int, int]:
+        """Returns the `(rows, cols, slices)` of the image that `apply` would return"""
+        shape = [rows, cols, slices]
+        if factor % 2:
+            i, j = self.__str_axes_to_tuple[axes]
+            shape[i], shape[j] = shape[j], shape[i]
+        return shape[0], shape[1], shape[2]
+
     @property
     def __str_axes_to_tuple(self) -> Dict:
         return {"xy": (0, 1), "yz": (0, 2), "xz": (1, 2)}
@@ -242,6 +268,28 @@ class Rotate(DualTransform):
             slices=slices,
         )
 
+    def apply_to_bboxes_array(
+        self,
+        bboxes: np.ndarray,
+        angle: float = 0,
+        axes: str = "xy",
+        cols: int = 0,
+        rows: int = 0,
+        slices: int = 0,
+        **params,
+    ) -> np.ndarray:
+        """Applies the transformation to an array of bboxes"""
+        return F.bboxes_rotate(
+            bboxes=bboxes,
+            angle=angle,
+            method=self.rotate_method,
+            axes=axes,
+            crop_to_border=self.crop_to_border,
+            rows=rows,
+            cols=cols,
+            slices=slices,
+        )
+
     def apply_to_keypoint(
         self,
         keypoint: KeypointInternalType,
@@ -263,6 +311,43 @@ class Rotate(DualTransform):
             slices=slices,
         )
 
+    def apply_to_keypoints_array(
+        self,
+        keypoints: np.ndarray,
+        angle: float = 0,
+        axes: str = "xy",
+        cols: int = 0,
+        rows: int = 0,
+        slices: int = 0,
+        **params,
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        return F.keypoints_rotate(
+            keypoints=keypoints,
+            angle=angle,
+            axes=axes,
+            crop_to_border=self.crop_to_border,
+            rows=rows,
+            cols=cols,
+            slices=slices,
+        )
+
+    @property
+    def is_affine(self) -> bool:
+        return True
+
+    def get_affine(
+        self,
+        angle: float = 0,
+        axes: str = "xy",
+        rows: int = 0,
+        cols: int = 0,
+        slices: int = 0,
+        **params,
+    ) -> Tuple[np.ndarray, Tuple[int, int, int]]:
+        """Returns the homogeneous matrix of the transformation and the output shape"""
+        return F.get_rotate_affine((rows, cols, slices), angle, axes, self.crop_to_border)
+
     @property
     def targets_as_params(self) -> List[str]:
         return ["image"]
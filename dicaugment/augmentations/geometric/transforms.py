@@ -5,7 +5,12 @@ from typing import Dict, Optional, Sequence, Tuple, Union, Any
 import cv2
 import numpy as np
 
-from ...core.bbox_utils import denormalize_bbox, normalize_bbox
+from ...core.bbox_utils import (
+    denormalize_bbox,
+    denormalize_bboxes_array,
+    normalize_bbox,
+    normalize_bboxes_array,
+)
 from ... import random_utils
 from ...core.transforms_interface import (
     BoxInternalType,
@@ -219,6 +224,35 @@ class ShiftScaleRotate(DualTransform):
             slices,
         )
 
+    def apply_to_keypoints_array(
+        self,
+        keypoints: np.ndarray,
+        angle: float = 0,
+        axes: str = "xy",
+        scale: float = 0,
+        dx: float = 0,
+        dy: float = 0,
+        dz: float = 0,
+        rows: int = 0,
+        cols: int = 0,
+        slices: int = 0,
+        **params,
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        return F.keypoints_shift_scale_rotate(
+            keypoints,
+            angle,
+            scale,
+            dx,
+            dy,
+            dz,
+            axes,
+            self.crop_to_border,
+            rows,
+            cols,
+            slices,
+        )
+
     def apply_to_dicom(self, dicom: DicomType, scale: float = 1, **params) -> DicomType:
         """Applies the augmentation to a dicom type"""
         return Fdicom.dicom_scale(dicom, scale, scale)
@@ -259,6 +293,53 @@ class ShiftScaleRotate(DualTransform):
             **params,
         )
 
+    def apply_to_bboxes_array(
+        self,
+        bboxes: np.ndarray,
+        angle: float = 0,
+        axes: str = "xy",
+        scale: float = 0,
+        dx: float = 0,
+        dy: float = 0,
+        dz: float = 0,
+        **params,
+    ) -> np.ndarray:
+        """Applies the transformation to an array of bboxes"""
+        return F.bboxes_shift_scale_rotate(
+            bboxes,
+            angle,
+            scale,
+            dx,
+            dy,
+            dz,
+            axes,
+            self.crop_to_border,
+            self.rotate_method,
+            **params,
+        )
+
+    @property
+    def is_affine(self) -> bool:
+        return True
+
+    def get_affine(
+        self,
+        angle: float = 0,
+        axes: str = "xy",
+        scale: float = 0,
+        dx: float = 0,
+        dy: float = 0,
+        dz: float = 0,
+        rows: int = 0,
+        cols: int = 0,
+        slices: int = 0,
+        **params,
+    ) -> Tuple[np.ndarray, Tuple[int, int, int]]:
+        """Returns the homogeneous matrix of the transformation and the output shape"""
+        return F.get_shift_scale_rotate_affine(
+            (rows, cols, slices), angle, scale, dx, dy, dz, axes, self.crop_to_border
+        )
+
     def get_transform_init_args(self) -> Dict[str, Any]:
         """Returns initialization arguments (e.g. Transform(arg1 = 1, arg2 = 2) -> ('arg1' : 1, 'arg2': 2))"""
         return {
@@ -514,6 +595,31 @@ class PadIfNeeded(DualTransform):
             slices + pad_front + pad_back,
         )
 
+    def apply_to_bboxes_array(
+        self,
+        bboxes: np.ndarray,
+        pad_top: int = 0,
+        pad_bottom: int = 0,
+        pad_left: int = 0,
+        pad_right: int = 0,
+        pad_front: int = 0,
+        pad_back: int = 0,
+        rows: int = 0,
+        cols: int = 0,
+        slices: int = 0,
+        **params,
+    ) -> np.ndarray:
+        """Applies the transformation to an array of bboxes"""
+        bboxes = denormalize_bboxes_array(bboxes, rows, cols, slices) + np.array(
+            [pad_left, pad_top, pad_front, pad_left, pad_top, pad_front]
+        )
+        return normalize_bboxes_array(
+            bboxes,
+            rows + pad_top + pad_bottom,
+            cols + pad_left + pad_right,
+            slices + pad_front + pad_back,
+        )
+
     def apply_to_keypoint(
         self,
         keypoint: KeypointInternalType,
@@ -529,6 +635,40 @@ class PadIfNeeded(DualTransform):
         x, y, z, angle, scale = keypoint[:5]
         return x + pad_left, y + pad_top, z + pad_front, angle, scale
 
+    def apply_to_keypoints_array(
+        self,
+        keypoints: np.ndarray,
+        pad_top: int = 0,
+        pad_bottom: int = 0,
+        pad_left: int = 0,
+        pad_right: int = 0,
+        pad_front: int = 0,
+        pad_back: int = 0,
+        **params,
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        return keypoints[:, :5] + np.array([pad_left, pad_top, pad_front, 0, 0])
+
+    def get_output_shape(
+        self,
+        pad_top: int = 0,
+        pad_bottom: int = 0,
+        pad_left: int = 0,
+        pad_right: int = 0,
+        pad_front: int = 0,
+        pad_back: int = 0,
+        rows: int = 0,
+        cols: int = 0,
+        slices: int = 0,
+        **params,
+    ) -> Tuple[int, int, int]:
+        """Returns the `(rows, cols, slices)` of the image that `apply` would return"""
+        return (
+            rows + pad_top + pad_bottom,
+            cols + pad_left + pad_right,
+            slices + pad_front + pad_back,
+        )
+
     def get_transform_init_args_names(self):
         """Returns initialization argument names. (e.g. Transform(arg1 = 1, arg2 = 2) -> ('arg1', 'arg2'))"""
         return (
@@ -654,16 +794,45 @@ class VerticalFlip(DualTransform):
         """Applies the transformation to the image"""
         return F.vflip(img)
 
+    @property
+    def is_batchable(self) -> bool:
+        """Returns whether the transform implements `apply_to_batch`"""
+        return True
+
+    def apply_to_batch(self, images: np.ndarray, params: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Applies the transformation to a batch of images"""
+        return np.ascontiguousarray(images[:, ::-1])
+
     def apply_to_bbox(self, bbox: BoxInternalType, **params) -> BoxInternalType:
         """Applies the transformation to a bbox"""
         return F.bbox_vflip(bbox, **params)
 
+    def apply_to_bboxes_array(self, bboxes: np.ndarray, **params) -> np.ndarray:
+        """Applies the transformation to an array of bboxes"""
+        return F.bboxes_vflip(bboxes, **params)
+
     def apply_to_keypoint(
         self, keypoint: KeypointInternalType, **params
     ) -> KeypointInternalType:
         """Applies the transformation to a keypoint"""
         return F.keypoint_vflip(keypoint, **params)
 
+    def apply_to_keypoints_array(
+        self, keypoints: np.ndarray, **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        return F.keypoints_vflip(keypoints, **params)
+
+    @property
+    def is_affine(self) -> bool:
+        return True
+
+    def get_affine(
+        self, rows: int = 0, cols: int = 0, slices: int = 0, **params
+    ) -> Tuple[np.ndarray, Tuple[int, int, int]]:
+        """Returns the homogeneous matrix of the transformation and the output shape"""
+        return F.get_flip_affine((rows, cols, slices), 0), (rows, cols, slices)
+
     def get_transform_init_args_names(self):
         """Returns initialization argument names. (e.g. Transform(arg1 = 1, arg2 = 2) -> ('arg1', 'arg2'))"""
         return ()
@@ -686,16 +855,45 @@ class HorizontalFlip(DualTransform):
         """Applies the transformation to the image"""
         return F.hflip(img)
 
+    @property
+    def is_batchable(self) -> bool:
+        """Returns whether the transform implements `apply_to_batch`"""
+        return True
+
+    def apply_to_batch(self, images: np.ndarray, params: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Applies the transformation to a batch of images"""
+        return np.ascontiguousarray(images[:, :, ::-1])
+
     def apply_to_bbox(self, bbox: BoxInternalType, **params) -> BoxInternalType:
         """Applies the transformation to a bbox"""
         return F.bbox_hflip(bbox, **params)
 
+    def apply_to_bboxes_array(self, bboxes: np.ndarray, **params) -> np.ndarray:
+        """Applies the transformation to an array of bboxes"""
+        return F.bboxes_hflip(bboxes, **params)
+
     def apply_to_keypoint(
         self, keypoint: KeypointInternalType, **params
     ) -> KeypointInternalType:
         """Applies the transformation to a keypoint"""
         return F.keypoint_hflip(keypoint, **params)
 
+    def apply_to_keypoints_array(
+        self, keypoints: np.ndarray, **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        return F.keypoints_hflip(keypoints, **params)
+
+    @property
+    def is_affine(self) -> bool:
+        return True
+
+    def get_affine(
+        self, rows: int = 0, cols: int = 0, slices: int = 0, **params
+    ) -> Tuple[np.ndarray, Tuple[int, int, int]]:
+        """Returns the homogeneous matrix of the transformation and the output shape"""
+        return F.get_flip_affine((rows, cols, slices), 1), (rows, cols, slices)
+
     def get_transform_init_args_names(self):
         """Returns initialization argument names. (e.g. Transform(arg1 = 1, arg2 = 2) -> ('arg1', 'arg2'))"""
         return ()
@@ -718,16 +916,45 @@ class SliceFlip(DualTransform):
         """Applies the transformation to the image"""
         return F.zflip(img)
 
+    @property
+    def is_batchable(self) -> bool:
+        """Returns whether the transform implements `apply_to_batch`"""
+        return True
+
+    def apply_to_batch(self, images: np.ndarray, params: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Applies the transformation to a batch of images"""
+        return np.ascontiguousarray(images[:, :, :, ::-1])
+
     def apply_to_bbox(self, bbox: BoxInternalType, **params) -> BoxInternalType:
         """Applies the transformation to a bbox"""
         return F.bbox_zflip(bbox, **params)
 
+    def apply_to_bboxes_array(self, bboxes: np.ndarray, **params) -> np.ndarray:
+        """Applies the transformation to an array of bboxes"""
+        return F.bboxes_zflip(bboxes, **params)
+
     def apply_to_keypoint(
         self, keypoint: KeypointInternalType, **params
     ) -> KeypointInternalType:
         """Applies the transformation to a keypoint"""
         return F.keypoint_zflip(keypoint, **params)
 
+    def apply_to_keypoints_array(
+        self, keypoints: np.ndarray, **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        return F.keypoints_zflip(keypoints, **params)
+
+    @property
+    def is_affine(self) -> bool:
+        return True
+
+    def get_affine(
+        self, rows: int = 0, cols: int = 0, slices: int = 0, **params
+    ) -> Tuple[np.ndarray, Tuple[int, int, int]]:
+        """Returns the homogeneous matrix of the transformation and the output shape"""
+        return F.get_flip_affine((rows, cols, slices), 2), (rows, cols, slices)
+
     def get_transform_init_args_names(self):
         """Returns initialization argument names. (e.g. Transform(arg1 = 1, arg2 = 2) -> ('arg1', 'arg2'))"""
         return ()
@@ -762,16 +989,50 @@ class Flip(DualTransform):
         # Random int in the range [-1, 1]
         return {"d": random.randint(-1, 2)}
 
+    @property
+    def is_batchable(self) -> bool:
+        """Returns whether the transform implements `apply_to_batch`"""
+        return True
+
+    def apply_to_batch(self, images: np.ndarray, params: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Applies the transformation to a batch of images"""
+        d = np.array([p["d"] for p in params])
+        result = np.empty_like(images)
+        for value in np.unique(d):
+            axis = (1, 2, 3) if value == -1 else value + 1
+            result[d == value] = np.flip(images[d == value], axis=axis)
+        return result
+
     def apply_to_bbox(self, bbox: BoxInternalType, **params) -> BoxInternalType:
         """Applies the transformation to a bbox"""
         return F.bbox_flip(bbox, **params)
 
+    def apply_to_bboxes_array(self, bboxes: np.ndarray, **params) -> np.ndarray:
+        """Applies the transformation to an array of bboxes"""
+        return F.bboxes_flip(bboxes, **params)
+
     def apply_to_keypoint(
         self, keypoint: KeypointInternalType, **params
     ) -> KeypointInternalType:
         """Applies the transformation to a keypoint"""
         return F.keypoint_flip(keypoint, **params)
 
+    def apply_to_keypoints_array(
+        self, keypoints: np.ndarray, **params
+    ) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        return F.keypoints_flip(keypoints, **params)
+
+    @property
+    def is_affine(self) -> bool:
+        return True
+
+    def get_affine(
+        self, d: int = 0, rows: int = 0, cols: int = 0, slices: int = 0, **params
+    ) -> Tuple[np.ndarray, Tuple[int, int, int]]:
+        """Returns the homogeneous matrix of the transformation and the output shape"""
+        return F.get_flip_affine((rows, cols, slices), d), (rows, cols, slices)
+
     def get_transform_init_args_names(self):
         """Returns initialization argument names. (e.g. Transform(arg1 = 1, arg2 = 2) -> ('arg1', 'arg2'))"""
         return ()
@@ -804,10 +1065,20 @@ class Transpose(DualTransform):
         """Applies the transformation to a keypoint"""
         return F.keypoint_transpose(keypoint)
 
+    def apply_to_keypoints_array(self, keypoints: np.ndarray, **params) -> np.ndarray:
+        """Applies the transformation to an array of keypoints"""
+        return F.keypoints_transpose(keypoints)
+
     def apply_to_dicom(self, dicom: DicomType, **params) -> DicomType:
         """Applies the augmentation to a dicom type"""
         return Fdicom.transpose_dicom(dicom)
 
+    def get_output_shape(
+        self, rows: int = 0, cols: int = 0, slices: int = 0, **params
+    ) -> Tuple[int, int, int]:
+        """Returns the `(rows, cols, slices)` of the image that `apply` would return"""
+        return cols, rows, slices
+
     def get_transform_init_args_names(self):
         """Returns initialization argument names. (e.g. Transform(arg1 = 1, arg2 = 2) -> ('arg1', 'arg2'))"""
         return ()
@@ -16,11 +16,13 @@ from scipy.ndimage import gaussian_filter
 from dicaugment import random_utils
 from dicaugment.augmentations.blur.functional import blur
 from dicaugment.augmentations.utils import (
+    _stack_batch_param,
     get_num_channels,
     is_grayscale_image,
     is_rgb_image,
 )
 
+from ..core.lazy import ShapeOnlyVolume
 from ..core.transforms_interface import (
     DualTransform,
     ImageOnlyTransform,
@@ -87,6 +89,18 @@ class Normalize(ImageOnlyTransform):
         """Applies the transformation to the image"""
         return F.normalize(image, self.mean, self.std)
 
+    @property
+    def is_batchable(self) -> bool:
+        """Returns whether the transform implements `apply_to_batch`"""
+        return True
+
+    def apply_to_batch(self, images: np.ndarray, params: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Applies the transformation to a batch of images"""
+        axis = (1, 2, 3)
+        mean = np.mean(images, axis=axis, keepdims=True) if self.mean is None else self.mean
+        std = np.std(images, axis=axis, keepdims=True) if self.std is None else self.std
+        return F.normalize(images, mean, std)
+
     def get_transform_init_args_names(self) -> Tuple[str, ...]:
         """Returns initialization argument names. (e.g. Transform(arg1 = 1, arg2 = 2) -> ('arg1', 'arg2'))"""
         return ("mean", "std")
@@ -123,6 +137,17 @@ class Posterize(ImageOnlyTransform):
         """Applies the transformation to the image"""
         return F.posterize(image, num_bits)
 
+    @property
+    def is_pointwise(self) -> bool:
+        """Returns whether the transform can be described as a lookup table by `get_lut`"""
+        return True
+
+    def get_lut(self, dtype: np.dtype, num_bits=1, **params) -> Optional[np.ndarray]:
+        """Returns the lookup table of the transformation, if `num_bits` is the same for all channels"""
+        if np.size(num_bits) != 1:
+            return None
+        return F.make_lut(dtype, F.posterize, num_bits)
+
     def get_params(self):
         """Returns parameters needed for the `apply` methods"""
         if len(self.num_bits) > 2:
@@ -234,6 +259,31 @@ class RandomBrightnessContrast(ImageOnlyTransform):
         """Applies the transformation to the image"""
         return F.brightness_contrast_adjust(img, alpha, beta, self.max_brightness)
 
+    @property
+    def is_pointwise(self) -> bool:
+        """Returns whether the transform can be described as a lookup table, i.e. whether `max_brightness` is set"""
+        return self.max_brightness is not None
+
+    def get_lut(self, dtype: np.dtype, alpha: float = 1.0, beta: float = 0.0, **params) -> Optional[np.ndarray]:
+        """Returns the lookup table of the transformation"""
+        if not self.is_pointwise:
+            return None
+        return F.make_lut(dtype, F._brightness_contrast_adjust, alpha, beta, self.max_brightness)
+
+    @property
+    def is_batchable(self) -> bool:
+        """Returns whether the transform implements `apply_to_batch`"""
+        return True
+
+    def apply_to_batch(self, images: np.ndarray, params: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Applies the transformation to a batch of images"""
+        return F._brightness_contrast_adjust_batch(
+            images,
+            _stack_batch_param(params, "alpha", images.ndim),
+            _stack_batch_param(params, "beta", images.ndim),
+            self.max_brightness,
+        )
+
     def get_params(self) -> Dict[str, Any]:
         """Returns parameters needed for the `apply` methods"""
         return {
@@ -258,6 +308,10 @@ class GaussNoise(ImageOnlyTransform):
         apply_to_channel_idx (int, None): If not None, then only only noise is applied on the specified channel index. Default: None
         per_channel (bool): if set to True, noise will be sampled for each channel independently.
             Otherwise, the noise will be sampled once for all channels. Ignored if apply_to_channel_idx is not None. Default: True
+        noise_bank_shape ((int, int, int), None): if not None, a float32 standard normal noise volume of at least this
+            shape (H, W, D) is sampled once, on the first call, and the noise of every image is a randomly offset and
+            flipped window of it. The bank grows to the shape of larger images. Much faster than sampling the noise
+            of every image, at the cost of less variety between samples. Default: None
         always_apply (bool): whether to always apply the transformation. Default: False
         p (float): probability of applying the transform. Default: 0.5.
 
@@ -266,6 +320,10 @@ class GaussNoise(ImageOnlyTransform):
 
     Image types:
         uint8, uint16, int16, float32
+
+    Note:
+        The noise is sampled as float32 values, with the Ziggurat method when `random_utils.set_backend("generator")`
+        is used.
     """
 
     def __init__(
@@ -274,6 +332,7 @@ class GaussNoise(ImageOnlyTransform):
         mean: float = 0,
         apply_to_channel_idx: Union[None, int] = None,
         per_channel: bool = True,
+        noise_bank_shape: Optional[Tuple[int, int, int]] = None,
         always_apply: bool = False,
         p: float = 0.5,
     ):
@@ -297,7 +356,7 @@ class GaussNoise(ImageOnlyTransform):
             )
 
         if apply_to_channel_idx is not None:
-            if isinstance(apply_to_channel_idx, int):
+            if not isinstance(apply_to_channel_idx, int):
                 raise TypeError(
                     "Expected apply_to_channel_idx to be one of (None, int), got {}".format(
                         type(apply_to_channel_idx)
@@ -306,19 +365,118 @@ class GaussNoise(ImageOnlyTransform):
             if apply_to_channel_idx < 0:
                 raise ValueError("apply_to_channel_idx should be non negative")
 
+        if noise_bank_shape is not None and (
+            len(noise_bank_shape) != 3 or any(i <= 0 for i in noise_bank_shape)
+        ):
+            raise ValueError(
+                "Expected noise_bank_shape to be None or 3 positive integers, got {}".format(
+                    noise_bank_shape
+                )
+            )
+
         self.mean = mean
         self.per_channel = per_channel
         self.apply_to_channel_idx = apply_to_channel_idx
+        self.noise_bank_shape = None if noise_bank_shape is None else tuple(noise_bank_shape)
+        self._noise_bank: Optional[np.ndarray] = None
+        # the seed and random_utils backend the noise bank is generated with
+        self._noise_bank_key: Optional[Tuple[int, str]] = None
 
     def apply(
-        self, img: np.ndarray, gauss: Union[None, np.ndarray] = None, **params
+        self,
+        img: np.ndarray,
+        gauss: Union[None, np.ndarray] = None,
+        sigma: float = 1.0,
+        mean: float = 0.0,
+        **params
     ) -> np.ndarray:
         """Applies the transformation to the image"""
-        return F.gauss_noise(img, gauss=gauss)
+        if self.apply_to_channel_idx is None:
+            return F.gauss_noise(img, gauss=gauss, scale=sigma, loc=mean)
+        return self._apply_to_channel(img, gauss, sigma, mean)
+
+    def _apply_to_channel(
+        self, img: np.ndarray, gauss: Optional[np.ndarray], sigma: Any, mean: Any
+    ) -> np.ndarray:
+        channel = F.gauss_noise(img[..., self.apply_to_channel_idx], gauss=gauss, scale=sigma, loc=mean)
+        # in inplace mode the noisy channel is already written into `img`
+        if not np.may_share_memory(channel, img):
+            img = img.copy()
+            img[..., self.apply_to_channel_idx] = channel
+        return img
+
+    @property
+    def is_batchable(self) -> bool:
+        """Returns whether the transform implements `apply_to_batch`"""
+        return True
+
+    def apply_to_batch(self, images: np.ndarray, params: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Applies the transformation to a batch of images"""
+        gauss = np.stack([p["gauss"] for p in params])
+        sigma = _stack_batch_param(params, "sigma", gauss.ndim)
+        mean = _stack_batch_param(params, "mean", gauss.ndim)
+        if self.apply_to_channel_idx is None:
+            return F.gauss_noise(images, gauss=gauss, scale=sigma, loc=mean)
+        return self._apply_to_channel(images, gauss, sigma, mean)
+
+    def _get_noise_bank(self, seed: int, shape: Sequence[int]) -> np.ndarray:
+        """Returns the noise bank of `seed` and `shape`, sampling it if it is not the current one"""
+        shape = tuple(shape)
+        key = (seed, random_utils.get_backend())
+        if self._noise_bank is None or self._noise_bank_key != key or self._noise_bank.shape != shape:
+            bank = random_utils.standard_normal(shape, np.float32, random_utils.get_random_state(seed))
+            bank.flags.writeable = False
+            self._noise_bank, self._noise_bank_key = bank, key
+        return self._noise_bank
+
+    def _sample_noise_bank(self, shape: Sequence[int], min_bank_shape: Sequence[int]) -> Tuple[int, Tuple[int, ...]]:
+        """
+        Returns the seed and shape of the noise bank for images of shape (H, W, D). The current bank is replaced by a
+        larger one if it is smaller than the images, and a new bank is at least `min_bank_shape`
+        """
+        bank, key = self._noise_bank, self._noise_bank_key
+        if bank is None or key is None or any(b < n for b, n in zip(bank.shape, shape)):
+            bank_shape = min_bank_shape if bank is None else bank.shape
+            seed = random_utils.get_seed()
+            bank = self._get_noise_bank(seed, tuple(max(b, n) for b, n in zip(bank_shape, shape)))
+            return seed, bank.shape
+        return key[0], bank.shape
+
+    @staticmethod
+    def _sample_window(shape: Sequence[int], bank_shape: Sequence[int]) -> Tuple[Tuple[int, int], ...]:
+        """Returns the start and step of a randomly offset and flipped window of shape (H, W, D) along each axis"""
+        return tuple((random.randint(0, b - n), 1 if random.random() < 0.5 else -1) for n, b in zip(shape, bank_shape))
+
+    def _make_noise(
+        self,
+        noise_seed: int,
+        noise_shape: Sequence[int],
+        bank_shape: Optional[Sequence[int]] = None,
+        noise_windows: Sequence[Tuple[Tuple[int, int], ...]] = (),
+        **params
+    ) -> np.ndarray:
+        """Regenerates the standard normal noise from the parameters sampled by `get_params_dependent_on_targets`"""
+        if bank_shape is None:
+            return random_utils.standard_normal(noise_shape, np.float32, random_utils.get_random_state(noise_seed))
+
+        bank = self._get_noise_bank(noise_seed, bank_shape)
+        windows = []
+        for window in noise_windows:
+            key = tuple(
+                slice(start, start + n) if step == 1 else slice(start + n - 1, start - 1 if start else None, -1)
+                for (start, step), n in zip(window, noise_shape)
+            )
+            windows.append(bank[key])
+        # a single window is a view of the bank, not a copy
+        gauss = windows[0] if len(windows) == 1 else np.stack(windows, axis=-1)
+        return gauss.reshape(noise_shape)
 
     def get_params_dependent_on_targets(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Returns additional parameters needed for the `apply` methods that depend on a target
-        (e.g. `apply_to_bboxes` method expects image size)
+        (e.g. `apply_to_bboxes` method expects image size).
+
+        The noise is not sampled here, only the seed it is generated from by `update_params`, so that `ReplayCompose`
+        saves a few numbers instead of a volume.
         """
         image = params["image"]
         var = random.uniform(self.var_limit[0], self.var_limit[1])
@@ -337,20 +495,31 @@ class GaussNoise(ImageOnlyTransform):
                         self.apply_to_channel_idx, image.shape
                     )
                 )
+            noise_shape = tuple(image.shape[:3])
+        elif self.per_channel or image.ndim == 3:
+            noise_shape = tuple(image.shape)
+        else:
+            noise_shape = tuple(image.shape[:3]) + (1,)
 
-            gauss = np.zeros_like(image, dtype=np.float32)
-            gauss[..., self.apply_to_channel_idx] = random_utils.normal(
-                self.mean, sigma, image.shape[:3]
-            )
-
-        elif self.per_channel:
-            gauss = random_utils.normal(self.mean, sigma, image.shape)
+        result = {"sigma": sigma, "mean": self.mean, "noise_shape": noise_shape}
+        if self.noise_bank_shape is None:
+            result["noise_seed"] = random_utils.get_seed()
         else:
-            gauss = random_utils.normal(self.mean, sigma, image.shape[:3])
-            if len(image.shape) == 4:
-                gauss = np.expand_dims(gauss, -1)
+            seed, bank_shape = self._sample_noise_bank(image.shape[:3], self.noise_bank_shape)
+            channels = noise_shape[3] if len(noise_shape) == 4 else 1
+            result.update(
+                noise_seed=seed,
+                bank_shape=bank_shape,
+                noise_windows=tuple(self._sample_window(image.shape[:3], bank_shape) for _ in range(channels)),
+            )
+        return result
 
-        return {"gauss": gauss}
+    def update_params(self, params: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        """Generates the noise from its seed, unless it is given (by a replay saved before the seeds were)"""
+        params = super(GaussNoise, self).update_params(params, **kwargs)
+        if "gauss" not in params and not isinstance(kwargs["image"], ShapeOnlyVolume):
+            params["gauss"] = self._make_noise(**params)
+        return params
 
     @property
     def targets_as_params(self) -> List[str]:
@@ -361,7 +530,7 @@ class GaussNoise(ImageOnlyTransform):
 
     def get_transform_init_args_names(self) -> Tuple[str, ...]:
         """Returns initialization argument names. (e.g. Transform(arg1 = 1, arg2 = 2) -> ('arg1', 'arg2'))"""
-        return ("var_limit", "apply_to_channel_idx", "per_channel", "mean")
+        return ("var_limit", "apply_to_channel_idx", "per_channel", "mean", "noise_bank_shape")
 
 
 class InvertImg(ImageOnlyTransform):
@@ -381,6 +550,24 @@ class InvertImg(ImageOnlyTransform):
         """Applies the transformation to the image"""
         return F.invert(img)
 
+    @property
+    def is_pointwise(self) -> bool:
+        """Returns whether the transform can be described as a lookup table by `get_lut`"""
+        return True
+
+    def get_lut(self, dtype: np.dtype, **params) -> Optional[np.ndarray]:
+        """Returns the lookup table of the transformation"""
+        return F.make_lut(dtype, F._invert)
+
+    @property
+    def is_batchable(self) -> bool:
+        """Returns whether the transform implements `apply_to_batch`"""
+        return True
+
+    def apply_to_batch(self, images: np.ndarray, params: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Applies the transformation to a batch of images"""
+        return F.invert(images)
+
     def get_transform_init_args_names(self) -> Tuple[str, ...]:
         """Returns initialization argument names. (e.g. Transform(arg1 = 1, arg2 = 2) -> ('arg1', 'arg2'))"""
         return ()
@@ -409,6 +596,24 @@ class RandomGamma(ImageOnlyTransform):
         """Applies the transformation to the image"""
         return F.gamma_transform(img, gamma=gamma)
 
+    @property
+    def is_pointwise(self) -> bool:
+        """Returns whether the transform can be described as a lookup table by `get_lut`"""
+        return True
+
+    def get_lut(self, dtype: np.dtype, gamma: float = 1, **params) -> Optional[np.ndarray]:
+        """Returns the lookup table of the transformation"""
+        return F.make_lut(dtype, F._gamma_transform, gamma)
+
+    @property
+    def is_batchable(self) -> bool:
+        """Returns whether the transform implements `apply_to_batch`"""
+        return True
+
+    def apply_to_batch(self, images: np.ndarray, params: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Applies the transformation to a batch of images"""
+        return F.gamma_transform(images, gamma=_stack_batch_param(params, "gamma", images.ndim))
+
     def get_params(self) -> Dict[str, Any]:
         """Returns parameters needed for the `apply` methods"""
         return {
@@ -913,37 +1118,50 @@ class PixelDropout(DualTransform):
         (e.g. `apply_to_bboxes` method expects image size)
         """
         img = params["image"]
-        shape = img.shape if self.per_channel and img.ndim == 4 else img.shape[:3]
-
-        rnd = np.random.RandomState(random.randint(0, 1 << 31))
-        # Use choice to create boolean matrix, if we will use binomial after that we will need type conversion
-        drop_mask = rnd.choice(
-            [True, False], shape, p=[self.dropout_prob, 1 - self.dropout_prob]
-        )
+        shape = img.shape if self.per_channel and img.ndim == 4 else img.shape[:3] + (1,) * (img.ndim - 3)
 
-        if drop_mask.ndim != img.ndim:
-            drop_mask = np.expand_dims(drop_mask, -1)
+        # the mask is generated from the seed by `update_params`, so that `ReplayCompose` saves a few numbers.
+        # With the legacy backend the seed is drawn as the mask was, so that `random.seed` gives the same mask.
+        if random_utils.get_backend() == "generator":
+            drop_mask_seed = random_utils.get_seed()
+        else:
+            drop_mask_seed = random.randint(0, 1 << 31)
 
         drop_value: Union[float, Sequence[float], np.ndarray]
 
         if self.drop_value is None:
             drop_shape = 1 if is_grayscale_image(img) else int(img.shape[-1])
 
+            sampled_value: np.ndarray
             if img.dtype in (np.uint8, np.uint16, np.uint32, np.int16, np.int32):
-                drop_value = rnd.randint(
-                    F.MIN_VALUES_BY_DTYPE[img.dtype],
+                sampled_value = random_utils.randint(
+                    int(F.MIN_VALUES_BY_DTYPE[img.dtype]),
                     int(F.MAX_VALUES_BY_DTYPE[img.dtype]),
                     drop_shape,
                     img.dtype,
                 )
             elif img.dtype in [np.float32, np.double]:
-                drop_value = rnd.uniform(0, 1, drop_shape).astype(img.dtype)
+                sampled_value = random_utils.uniform(0, 1, drop_shape).astype(img.dtype)
             else:
                 raise ValueError(f"Unsupported dtype: {img.dtype}")
+            # read-only, so that ReplayCompose saves it without a copy
+            sampled_value.flags.writeable = False
+            drop_value = sampled_value
         else:
             drop_value = self.drop_value
 
-        return {"drop_mask": drop_mask, "drop_value": drop_value}
+        return {"drop_mask_seed": drop_mask_seed, "drop_mask_shape": tuple(shape), "drop_value": drop_value}
+
+    def update_params(self, params: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        """Generates the drop mask from its seed, unless it is given (by a replay saved before the seeds were)"""
+        params = super().update_params(params, **kwargs)
+        if "drop_mask" not in params and not isinstance(kwargs["image"], ShapeOnlyVolume):
+            rnd = random_utils.get_random_state(params["drop_mask_seed"])
+            # Use choice to create boolean matrix, if we will use binomial after that we will need type conversion
+            params["drop_mask"] = rnd.choice(
+                [True, False], params["drop_mask_shape"], p=[self.dropout_prob, 1 - self.dropout_prob]
+            )
+        return params
 
     @property
     def targets_as_params(self) -> List[str]:
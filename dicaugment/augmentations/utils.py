@@ -1,17 +1,25 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from functools import wraps
-from typing import Callable, Union
+import hashlib
+import json
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple, Union, cast
 
 import cv2
 import numpy as np
 import os
 import pydicom as pdm
-from typing_extensions import Concatenate, ParamSpec
+from typing_extensions import Concatenate, Literal, ParamSpec
 
 from dicaugment.core.keypoints_utils import angle_to_2pi_range
 from dicaugment.core.transforms_interface import KeypointInternalType
 
 __all__ = [
     "read_dcm_image",
+    "cache_dcm_image",
+    "read_cached_dcm_image",
     "MAX_VALUES_BY_DTYPE",
     "MIN_VALUES_BY_DTYPE",
     "NPDTYPE_TO_OPENCV_DTYPE",
@@ -29,10 +37,22 @@ __all__ = [
     "non_rgb_warning",
     "_maybe_process_in_chunks",
     "_maybe_process_by_channel",
+    "_maybe_process_in_slabs",
+    "_stack_batch_param",
+    "set_num_threads",
+    "get_num_threads",
+    "inplace_mode",
+    "is_inplace",
+    "set_precision",
+    "get_precision",
 ]
 
 P = ParamSpec("P")
 
+_NUM_THREADS = 1
+_INPLACE = threading.local()
+_PRECISION = np.dtype("float64")
+
 MAX_VALUES_BY_DTYPE = {
     np.dtype("uint8"): 255,
     np.dtype("uint16"): 65535,
@@ -76,9 +96,32 @@ SCIPY_MODE_TO_NUMPY_MODE = {
 }
 
 
-def read_dcm_image(path: str, include_header: bool = True, ends_with: str = ""):
+def _dcm_slice_positions(headers: list) -> Optional[list]:
+    """
+    Returns a sort key for each slice header: the projection of `ImagePositionPatient` on the slice normal,
+    else `InstanceNumber`, else None if the tags are not present on every slice.
     """
-    Reads in an alphabetically sorted series of dcm file types stored in a directory as a `np.ndarray` and optionally a dicom header in a `dict` format.
+    if all("ImagePositionPatient" in h and "ImageOrientationPatient" in h for h in headers):
+        orientation = np.array(headers[0].ImageOrientationPatient, dtype=np.float64)
+        normal = np.cross(orientation[:3], orientation[3:])
+        return [float(np.dot(normal, np.array(h.ImagePositionPatient, dtype=np.float64))) for h in headers]
+
+    if all("InstanceNumber" in h for h in headers):
+        return [int(h.InstanceNumber) for h in headers]
+
+    return None
+
+
+def read_dcm_image(
+    path: str, include_header: bool = True, ends_with: str = "", num_threads: Optional[int] = None
+):
+    """
+    Reads in a series of dcm file types stored in a directory as a `np.ndarray` and optionally a dicom header in a
+    `dict` format.
+
+    Slices are ordered by their `ImagePositionPatient` along the slice normal, falling back to `InstanceNumber`
+    and then to the alphabetical order of the filenames when these tags are missing. The headers are read first
+    to allocate the `HWD` volume once, then the pixel data of each slice is decoded directly into it.
 
     Args:
         path (str): The filepath to the directory that stores the dcm files.
@@ -86,6 +129,8 @@ def read_dcm_image(path: str, include_header: bool = True, ends_with: str = ""):
             Default: True
         ends_with (str): If empty string, then all files in directory will be processed. If multiple file types are within the directory, you may filter the results by setting `ends_with=".dcm"`
             Default: ""
+        num_threads (int, None): The number of worker threads used to decode the slices.
+            If None, `get_num_threads()` is used. Default: None
 
     Note:
         `DICOM` object types are dictionaries with the following keys:
@@ -117,29 +162,184 @@ def read_dcm_image(path: str, include_header: bool = True, ends_with: str = ""):
     if not os.path.isdir(path):
         raise OSError("{} is not a valid directory".format(path))
 
-    img = None
+    files = [
+        os.path.join(path, file)
+        for file in sorted(os.listdir(path))
+        if file.endswith(ends_with)
+    ]
+    if not files:
+        raise ValueError("{} does not contain any dcm files".format(path))
+
+    headers = [pdm.dcmread(fp, stop_before_pixels=True) for fp in files]
+    positions = _dcm_slice_positions(headers)
+    if positions is not None:
+        order = sorted(range(len(files)), key=lambda i: positions[i])
+        files = [files[i] for i in order]
+        headers = [headers[i] for i in order]
+
+    obj = headers[0]
+    shape = (int(obj.Rows), int(obj.Columns))
+    img = np.empty(shape + (len(files),), dtype=np.int16)
+
+    def decode(i: int) -> None:
+        pixels = pdm.dcmread(files[i]).pixel_array
+        if pixels.shape != shape:
+            raise ValueError(
+                "Slice {} has shape {}, expected {}".format(files[i], pixels.shape, shape)
+            )
+        img[..., i] = pixels
+
+    for _ in _imap_in_threads(decode, range(len(files)), num_threads):
+        pass
+
+    if include_header:
+        dicom = {
+            "PixelSpacing": tuple(map(float, obj.PixelSpacing)),
+            "RescaleIntercept": float(obj.RescaleIntercept),
+            "RescaleSlope": float(obj.RescaleSlope),
+            "ConvolutionKernel": obj.ConvolutionKernel,
+            "XRayTubeCurrent": int(obj.XRayTubeCurrent),
+        }
+        return img, dicom
+
+    return img
 
+
+def _dcm_fingerprint(path: str, ends_with: str = "") -> str:
+    """Returns a hash of the name, size and modification time of every dcm file in `path`"""
+    digest = hashlib.sha1(ends_with.encode())
     for file in sorted(os.listdir(path)):
-        if not file.endswith(ends_with):
+        fp = os.path.join(path, file)
+        if not file.endswith(ends_with) or not os.path.isfile(fp):
             continue
+        stat = os.stat(fp)
+        digest.update("{}:{}:{}\n".format(file, stat.st_size, stat.st_mtime_ns).encode())
+    return digest.hexdigest()
+
+
+def _dcm_cache_paths(path: str, cache_dir: str) -> Tuple[str, str]:
+    """Returns the `.npy` and `.json` cache file paths of a dcm directory"""
+    name = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+    return os.path.join(cache_dir, name + ".npy"), os.path.join(cache_dir, name + ".json")
+
+
+def _read_dcm_cache_header(json_path: str) -> Optional[dict]:
+    """Returns the sidecar contents of a cached volume, or None if it is missing or unreadable"""
+    try:
+        with open(json_path, "r") as f:
+            header = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return header if isinstance(header, dict) else None
+
+
+def _atomic_write(dst: str, write_fn: Callable[[Any], None], mode: str = "wb") -> None:
+    """Writes a file through `write_fn` into a temporary file that is then renamed to `dst`"""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dst), suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            write_fn(f)
+        os.replace(tmp, dst)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def cache_dcm_image(
+    path: str, cache_dir: str, ends_with: str = "", num_threads: Optional[int] = None
+) -> str:
+    """
+    Converts a series of dcm files into a `.npy` volume with a `.json` sidecar holding its dicom header,
+    unless an up-to-date conversion already exists in `cache_dir`.
 
-        fp = os.path.join(path, file)
-        obj = pdm.dcmread(fp)
-        dcm = np.expand_dims(obj.pixel_array, axis=2).astype(np.int16)
-
-        if img is None:
-            img = dcm
-            dicom = {
-                "PixelSpacing": tuple(map(float, obj.PixelSpacing)),
-                "RescaleIntercept": float(obj.RescaleIntercept),
-                "RescaleSlope": float(obj.RescaleSlope),
-                "ConvolutionKernel": obj.ConvolutionKernel,
-                "XRayTubeCurrent": int(obj.XRayTubeCurrent),
-            }
-        else:
-            img = np.concatenate([img, dcm], axis=2)
+    The cache is invalidated whenever a dcm file in `path` is added, removed, resized or modified.
+    Files are written to a temporary name and renamed, so several processes may share a `cache_dir`.
+
+    Args:
+        path (str): The filepath to the directory that stores the dcm files.
+        cache_dir (str): The directory that stores the cached volumes.
+        ends_with (str): If empty string, then all files in directory will be processed. If multiple file types are
+            within the directory, you may filter the results by setting `ends_with=".dcm"`. Default: ""
+        num_threads (int, None): The number of worker threads used to decode the slices.
+            If None, `get_num_threads()` is used. Default: None
+
+    Returns:
+        str: the path of the cached `.npy` volume
+    """
+    return _cache_dcm_image(path, cache_dir, ends_with, num_threads)[0]
+
+
+def _cache_dcm_image(
+    path: str, cache_dir: str, ends_with: str = "", num_threads: Optional[int] = None
+) -> Tuple[str, dict]:
+    """
+    Returns the path of the cached `.npy` volume of a dcm directory and the sidecar header that was validated or
+    written, so that it is not read again after another process may have replaced it. See `cache_dcm_image`.
+    """
+    if not os.path.isdir(path):
+        raise OSError("{} is not a valid directory".format(path))
+
+    npy_path, json_path = _dcm_cache_paths(path, cache_dir)
+    fingerprint = _dcm_fingerprint(path, ends_with)
+
+    cached = _read_dcm_cache_header(json_path)
+    if (
+        cached is not None
+        and cached.get("fingerprint") == fingerprint
+        and isinstance(cached.get("dicom"), dict)
+        and os.path.isfile(npy_path)
+    ):
+        return npy_path, cached
+
+    os.makedirs(cache_dir, exist_ok=True)
+    img, dicom = read_dcm_image(path, include_header=True, ends_with=ends_with, num_threads=num_threads)
+
+    header = {
+        "source": os.path.abspath(path),
+        "fingerprint": fingerprint,
+        "shape": list(img.shape),
+        "dtype": img.dtype.str,
+        "dicom": dicom,
+    }
+
+    # The sidecar is written last, so a volume is only considered valid once it is complete
+    _atomic_write(npy_path, lambda f: np.save(f, img))
+    _atomic_write(json_path, lambda f: json.dump(header, f, default=list), mode="w")
+    return npy_path, header
+
+
+def read_cached_dcm_image(
+    path: str,
+    cache_dir: str,
+    include_header: bool = True,
+    ends_with: str = "",
+    num_threads: Optional[int] = None,
+    mmap_mode: Optional[Literal["r+", "r", "w+", "c"]] = "r",
+):
+    """
+    Reads a series of dcm files through the volume cache of `cache_dir`, see `cache_dcm_image`.
+
+    The volume is returned as a read-only memory map by default, so only the pages that are touched (e.g. by a crop)
+    are read from disk and the page cache is shared between processes, such as `DataLoader` workers.
+
+    Args:
+        path (str): The filepath to the directory that stores the dcm files.
+        cache_dir (str): The directory that stores the cached volumes.
+        include_header (bool): Whether to return the dicom header metadata associated with the scan.
+            Default: True
+        ends_with (str): If empty string, then all files in directory will be processed. If multiple file types are
+            within the directory, you may filter the results by setting `ends_with=".dcm"`. Default: ""
+        num_threads (int, None): The number of worker threads used to decode the slices on a cache miss.
+            If None, `get_num_threads()` is used. Default: None
+        mmap_mode (str, None): The `mmap_mode` passed to `np.load`. If None, the volume is read into memory.
+            Default: "r"
+    """
+    npy_path, header = _cache_dcm_image(path, cache_dir, ends_with=ends_with, num_threads=num_threads)
+    img = np.load(npy_path, mmap_mode=mmap_mode)
 
     if include_header:
+        dicom = dict(header["dicom"])
+        dicom["PixelSpacing"] = tuple(dicom["PixelSpacing"])
         return img, dicom
 
     return img
@@ -148,15 +348,39 @@ def read_dcm_image(path: str, include_header: bool = True, ends_with: str = ""):
 def clipped(
     func: Callable[Concatenate[np.ndarray, P], np.ndarray]
 ) -> Callable[Concatenate[np.ndarray, P], np.ndarray]:
-    """Decorator method that clips an image to it's specified dtype minimums and maximums"""
+    """
+    Decorator method that clips an image to it's specified dtype minimums and maximums.
+
+    A new float array returned by `func` is clipped in place. In inplace mode (see `inplace_mode`) the result is
+    written back into the image when it has the same shape.
+    """
     @wraps(func)
     def wrapped_function(
         img: np.ndarray, *args: P.args, **kwargs: P.kwargs
     ) -> np.ndarray:
         dtype = img.dtype
-        maxval = MAX_VALUES_BY_DTYPE.get(dtype, 1.0)
-        minval = MIN_VALUES_BY_DTYPE.get(dtype, 0.0)
-        return clip(func(img, *args, **kwargs), dtype, minval, maxval)
+        # the tables mix ints and floats, which mypy joins to `object`
+        maxval = cast(float, MAX_VALUES_BY_DTYPE.get(dtype, 1.0))
+        minval = cast(float, MIN_VALUES_BY_DTYPE.get(dtype, 0.0))
+        result = func(img, *args, **kwargs)
+        inplace = is_inplace() and img.flags.writeable
+
+        if not result.flags.writeable or (not inplace and np.may_share_memory(result, img)):
+            return clip(result, dtype, minval, maxval)
+
+        if result.dtype.kind == "f":
+            np.clip(result, minval, maxval, out=result)
+        elif (
+            result.dtype != dtype
+            or dtype.kind not in "iu"
+            or (minval, maxval) != (np.iinfo(dtype).min, np.iinfo(dtype).max)
+        ):
+            result = np.clip(result, minval, maxval)
+
+        if inplace and result is not img and result.shape == img.shape:
+            np.copyto(img, result, casting="unsafe")
+            return img
+        return result.astype(dtype, copy=False)
 
     return wrapped_function
 
@@ -316,35 +540,285 @@ def _maybe_process_in_chunks(
     return __process_fn
 
 
+def set_num_threads(num_threads: int) -> None:
+    """
+    Sets the default number of worker threads used by functions that process independent parts of an image in
+    parallel (e.g. the channels of a multi-channel volume). scipy.ndimage releases the GIL, so the parts are
+    processed concurrently. Default: 1, which processes everything in the calling thread.
+
+    Args:
+        num_threads (int): the number of worker threads. Must be at least 1.
+
+    Raises:
+        ValueError: if num_threads is less than 1
+    """
+    global _NUM_THREADS
+    if num_threads < 1:
+        raise ValueError("num_threads must be at least 1, got {}".format(num_threads))
+    _NUM_THREADS = int(num_threads)
+
+
+def get_num_threads() -> int:
+    """Returns the default number of worker threads. See `set_num_threads`"""
+    return _NUM_THREADS
+
+
+@contextmanager
+def inplace_mode(enabled: bool = True) -> Iterator[None]:
+    """
+    Context manager in which intensity functions write their result into the image they are given, or into
+    their `out` argument, instead of allocating a new volume: `normalize`, `gauss_noise`, `to_float`, `from_float`,
+    `add_weighted`, `unsharp_mask` and the functions decorated with `clipped`. This lowers the peak memory of a
+    pipeline, at the cost of overwriting its input images. Float images are overwritten by the functions that
+    return float images, and images of any dtype by the `clipped` functions. The mode is set per thread.
+
+    Args:
+        enabled (bool): whether to enable or disable inplace mode within the context. Default: True
+
+    Example:
+
+    .. code-block:: python
+
+        import dicaugment as dca
+
+        with dca.inplace_mode():
+            image = dca.gauss_noise(image, gauss)  # image is overwritten
+    """
+    previous = is_inplace()
+    _INPLACE.enabled = enabled
+    try:
+        yield
+    finally:
+        _INPLACE.enabled = previous
+
+
+def is_inplace() -> bool:
+    """Returns whether inplace mode is enabled in the current thread. See `inplace_mode`"""
+    return getattr(_INPLACE, "enabled", False)
+
+
+def set_precision(precision: str) -> None:
+    """
+    Sets the precision of the floating point buffers that transforms compute with.
+
+    With "float64", the default, the buffers follow NumPy's type promotion, in which random noise fields and
+    Python floats promote images to float64. With "float32", random arrays (see `random_utils`), noise fields,
+    batch parameters and the intermediate results of integer and float32 images are float32, and FFTs are
+    complex64, which halves their memory and bandwidth. float64 images are still processed in float64.
+
+    Args:
+        precision (str): one of "float32", "float64"
+
+    Raises:
+        ValueError: if precision is not one of "float32", "float64"
+    """
+    global _PRECISION
+    if precision not in {"float32", "float64"}:
+        raise ValueError("precision must be one of ('float32', 'float64'), got {}".format(precision))
+    _PRECISION = np.dtype(precision)
+
+
+def get_precision() -> np.dtype:
+    """Returns the precision of floating point buffers, np.float32 or np.float64. See `set_precision`"""
+    return _PRECISION
+
+
+def _get_float_dtype(img: np.ndarray) -> Optional[np.dtype]:
+    """
+    Returns the dtype to compute a float result from `img` in: float32 if the precision is "float32" and `img` is
+    not float64, else None for NumPy's type promotion. See `set_precision`
+    """
+    if _PRECISION == np.float32 and img.dtype != np.float64:
+        return _PRECISION
+    return None
+
+
+def _get_out(
+    img: np.ndarray, out: Optional[np.ndarray] = None, dtype: Optional[Union[np.dtype, type]] = None
+) -> Optional[np.ndarray]:
+    """
+    Returns the array that a function computing a float image from `img` writes into: `out` if given, else `img`
+    itself in inplace mode if it is a writeable float image (of `dtype`, if given), else None.
+    """
+    if out is not None:
+        return out
+    if is_inplace() and img.flags.writeable and img.dtype.kind == "f" and (dtype is None or img.dtype == dtype):
+        return img
+    return None
+
+
+def _stack_batch_param(
+    params: Sequence[Dict[str, Any]], key: str, ndim: int, dtype: Any = None
+) -> np.ndarray:
+    """
+    Stacks the scalar parameter `key` of each sample into an array of shape (N, 1, ...) that broadcasts against
+    a batch of images with `ndim` dimensions. The array is of `dtype`, by default the precision (see `set_precision`)
+    """
+    if dtype is None:
+        dtype = _PRECISION
+    return np.array([p[key] for p in params], dtype=dtype).reshape((-1,) + (1,) * (ndim - 1))
+
+
+def _imap_in_threads(
+    fn: Callable[[int], Any], indices: Iterable[int], num_threads: Optional[int] = None
+) -> Iterator[Tuple[int, Any]]:
+    """
+    Calls `fn` for each index, spreading the calls over `num_threads` worker threads, and yields
+    `(index, result)` pairs as soon as they are available. With a single thread the indices are processed in order.
+
+    Args:
+        fn: a function that takes an index
+        indices: the indices to process
+        num_threads: the number of worker threads. If None, `get_num_threads()` is used.
+    """
+    indices = list(indices)
+    num_threads = get_num_threads() if num_threads is None else num_threads
+    if num_threads <= 1 or len(indices) <= 1:
+        for i in indices:
+            yield i, fn(i)
+        return
+
+    with ThreadPoolExecutor(max_workers=min(num_threads, len(indices))) as executor:
+        futures = {executor.submit(fn, i): i for i in indices}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
 def _maybe_process_by_channel(
-    process_fn: Callable[Concatenate[np.ndarray, P], np.ndarray], **kwargs
+    process_fn: Callable[Concatenate[np.ndarray, P], np.ndarray],
+    num_threads: Optional[int] = None,
+    channel_shape: Optional[Sequence[int]] = None,
+    **kwargs
 ) -> Callable[[np.ndarray], np.ndarray]:
     """
     Wrap OpenCV or Scipy function to enable processing channeled images of any length.
 
     Limitations:
         This wrapper requires image to be the first argument and rest must be sent via named arguments.
+        If `channel_shape` is given, the function must take an `output` argument as the Scipy filters do.
 
     Args:
         process_fn: Transform function (e.g scipy.ndimage.zoom).
+        num_threads: the number of worker threads used to process the channels. If None, `get_num_threads()` is used.
+        channel_shape: the shape of each processed channel. If given, the output is allocated up front and each
+            channel is written into it through the `output` argument of `process_fn`.
         kwargs: Additional parameters.
 
     Returns:
         numpy.ndarray: Transformed image.
 
     """
+    # an `output` given in kwargs is the dtype of the output
+    output_dtype = kwargs.get("output")
+    channel_kwargs = {k: v for k, v in kwargs.items() if k != "output"}
+    # `output` is not part of the signature `process_fn` is typed with
+    process_into = cast(Callable[..., np.ndarray], process_fn)
 
     @wraps(process_fn)
     def __process_fn(img: np.ndarray) -> np.ndarray:
         num_channels = get_num_channels(img)
         if num_channels > 1 or len(img.shape) > 3:
-            chunks = []
-            for i in range(num_channels):
-                chunks.append(process_fn(img[..., i], **kwargs))
-
-            img = np.stack(chunks, axis=3)
+            if channel_shape is not None:
+                result = np.empty(
+                    tuple(channel_shape) + (num_channels,), dtype=img.dtype if output_dtype is None else output_dtype
+                )
+                for _ in _imap_in_threads(
+                    lambda i: process_into(img[..., i], output=result[..., i], **channel_kwargs),
+                    range(num_channels),
+                    num_threads,
+                ):
+                    pass
+                return result
+
+            # the output is allocated once the first channel reveals its shape and dtype, then each channel
+            # is copied into it as soon as it is computed
+            channels: Optional[np.ndarray] = None
+            for i, channel in _imap_in_threads(
+                lambda i: process_fn(img[..., i], **kwargs), range(num_channels), num_threads
+            ):
+                if channels is None:
+                    channels = np.empty(channel.shape + (num_channels,), dtype=channel.dtype)
+                channels[..., i] = channel
+            # there is at least one channel, so the output has been allocated
+            img = cast(np.ndarray, channels)
         else:
             img = process_fn(img, **kwargs)
         return img
 
     return __process_fn
+
+
+def _get_num_slabs(depth: int, halo: int, num_threads: int) -> int:
+    """Returns the number of z-slabs to split a volume into, keeping each slab at least twice as thick as its halo"""
+    return max(1, min(num_threads, depth // max(1, 2 * halo)))
+
+
+def _maybe_process_in_slabs(
+    process_fn: Callable[..., np.ndarray],
+    halo: int,
+    num_threads: Optional[int] = None,
+    **kwargs
+) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Wrap a shape preserving Scipy filter to process the volume as overlapping z-slabs in worker threads.
+
+    Each slab is extended by `halo` slices on both sides, so every output voxel sees exactly the same
+    neighbourhood as in a single call over the whole volume, and the stitched result is bit-identical to it.
+    The slabs of all channels are processed by a single pool of `num_threads` worker threads.
+
+    Limitations:
+        This wrapper requires image to be the first argument and rest must be sent via named arguments.
+        The filter must preserve the shape of its input, and must not read further than `halo` slices away.
+        Each output voxel must not depend on where the slab starts, which rules out running sums such as
+        `uniform_filter1d`, whose rounding errors carry along the axis.
+        The `wrap` modes read across the whole volume, so they are processed in a single call.
+
+    Args:
+        process_fn: Filter function (e.g scipy.ndimage.median_filter).
+        halo: the number of slices the filter reads on each side of an output voxel.
+        num_threads: the number of worker threads. If None, `get_num_threads()` is used.
+        kwargs: Additional parameters.
+
+    Returns:
+        numpy.ndarray: Transformed image.
+
+    """
+
+    @wraps(process_fn)
+    def __process_fn(img: np.ndarray) -> np.ndarray:
+        threads = get_num_threads() if num_threads is None else num_threads
+        depth = img.shape[2]
+        num_slabs = _get_num_slabs(depth, halo, threads)
+        if num_slabs <= 1 or kwargs.get("mode") in {"wrap", "grid-wrap"}:
+            return _maybe_process_by_channel(
+                process_fn, num_threads=threads, channel_shape=img.shape[:3], **kwargs
+            )(img)
+
+        num_channels = get_num_channels(img)
+        has_channel_dim = len(img.shape) > 3
+        bounds = np.linspace(0, depth, num_slabs + 1).astype(int)
+        tasks = [
+            (channel, start, stop)
+            for channel in range(num_channels)
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+
+        def process_slab(i: int) -> np.ndarray:
+            channel, start, stop = tasks[i]
+            low, high = max(0, start - halo), min(depth, stop + halo)
+            slab = img[:, :, low:high, channel] if has_channel_dim else img[:, :, low:high]
+            return process_fn(slab, **kwargs)[:, :, start - low : stop - low]
+
+        result: Optional[np.ndarray] = None
+        for i, slab in _imap_in_threads(process_slab, range(len(tasks)), threads):
+            if result is None:
+                result = np.empty(img.shape, dtype=slab.dtype)
+            channel, start, stop = tasks[i]
+            if has_channel_dim:
+                result[:, :, start:stop, channel] = slab
+            else:
+                result[:, :, start:stop] = slab
+        # there is at least one slab, so the output has been allocated
+        return cast(np.ndarray, result)
+
+    return __process_fn
@@ -0,0 +1,28 @@
+import importlib
+from typing import Any, List
+
+# the submodules of the package, imported on first access as in `dicaugment/__init__.py`, so that
+# `dicaugment.core.composition` resolves after a bare `import dicaugment`
+_SUBMODULES = (
+    "bbox_utils",
+    "composition",
+    "dicom_utils",
+    "keypoints_utils",
+    "lazy",
+    "replay_log",
+    "serialization",
+    "transforms_interface",
+    "utils",
+)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _SUBMODULES:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = importlib.import_module("." + name, __name__)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_SUBMODULES))
@@ -22,6 +22,14 @@ __all__ = [
     "check_bboxes",
     "filter_bboxes",
     "union_of_bboxes",
+    "bboxes_to_array",
+    "bboxes_from_array",
+    "normalize_bboxes_array",
+    "denormalize_bboxes_array",
+    "convert_bboxes_array_to_dicaugment",
+    "convert_bboxes_array_from_dicaugment",
+    "check_bboxes_array",
+    "filter_bboxes_array",
     "BboxProcessor",
     "BboxParams",
     "BB_COCO_3D",
@@ -326,7 +334,10 @@ def normalize_bboxes(
         Normalized bounding boxes `[(x_min, y_min, z_min, x_max, y_max, z_max)]`.
 
     """
-    return [normalize_bbox(bbox, rows, cols, slices) for bbox in bboxes]
+    if not len(bboxes):
+        return []
+    array, tails = bboxes_to_array(bboxes)
+    return bboxes_from_array(normalize_bboxes_array(array, rows, cols, slices), tails)
 
 
 def denormalize_bboxes(
@@ -344,7 +355,10 @@ def denormalize_bboxes(
         List: Denormalized bounding boxes `[(x_min, y_min, z_min, x_max, y_max, z_max)]`.
 
     """
-    return [denormalize_bbox(bbox, rows, cols, slices) for bbox in bboxes]
+    if not len(bboxes):
+        return []
+    array, tails = bboxes_to_array(bboxes)
+    return bboxes_from_array(denormalize_bboxes_array(array, rows, cols, slices), tails)
 
 
 def calculate_bbox_area_volume(
@@ -396,37 +410,26 @@ def filter_bboxes_by_visibility(
         Filtered bounding boxes `[(x_min, y_min, z_min, x_max, y_max, z_max)]`.
 
     """
-    img_height, img_width, img_depth = original_shape[:3]
-    (
-        transformed_img_height,
-        transformed_img_width,
-        transformed_img_depth,
-    ) = transformed_shape[:3]
-
-    visible_bboxes = []
-    for bbox, transformed_bbox in zip(bboxes, transformed_bboxes):
-        if not all(0.0 <= value <= 1.0 for value in transformed_bbox[:6]):
-            continue
-        bbox_area, bbox_volume = calculate_bbox_area_volume(
-            bbox, img_height, img_width, img_depth
+    n = min(len(bboxes), len(transformed_bboxes))
+    if not n:
+        return []
+    array = bboxes_to_array(bboxes[:n])[0]
+    transformed_array = bboxes_to_array(transformed_bboxes[:n])[0]
+
+    bbox_area, bbox_volume = _bboxes_area_volume(array, *original_shape[:3])
+    transformed_bbox_area, transformed_bbox_volume = _bboxes_area_volume(
+        transformed_array, *transformed_shape[:3]
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        visible = (
+            np.all((transformed_array >= 0.0) & (transformed_array <= 1.0), axis=1)
+            & (transformed_bbox_area >= min_area)
+            & (transformed_bbox_volume >= min_volume)
+            & (transformed_bbox_area / bbox_area >= area_threshold)
+            & (transformed_bbox_volume / bbox_volume >= volume_threshold)
         )
-        transformed_bbox_area, transformed_bbox_volume = calculate_bbox_area_volume(
-            transformed_bbox,
-            transformed_img_height,
-            transformed_img_width,
-            transformed_img_depth,
-        )
-
-        if transformed_bbox_area < min_area:
-            continue
-        if transformed_bbox_volume < min_volume:
-            continue
-        area_visibility = transformed_bbox_area / bbox_area
-        volume_visibility = transformed_bbox_volume / bbox_volume
-
-        if area_visibility >= area_threshold and volume_visibility >= volume_threshold:
-            visible_bboxes.append(transformed_bbox)
-    return visible_bboxes
+    return [transformed_bboxes[int(i)] for i in np.flatnonzero(visible)]
 
 
 def convert_bbox_to_dicaugment(
@@ -562,12 +565,21 @@ def convert_bboxes_to_dicaugment(
     check_validity=False,
 ) -> List[BoxType]:
     """Convert a list bounding boxes from a format specified in `source_format` to the format used by dicaugment"""
-    return [
-        convert_bbox_to_dicaugment(
-            bbox, source_format, rows, cols, slices, check_validity
+    if not len(bboxes):
+        return []
+    array, tails = bboxes_to_array(bboxes)
+    try:
+        array = convert_bboxes_array_to_dicaugment(
+            array, source_format, rows, cols, slices, check_validity
         )
-        for bbox in bboxes
-    ]
+    except ValueError:
+        # report the first invalid bounding box together with its labels
+        for bbox in bboxes:
+            convert_bbox_to_dicaugment(
+                bbox, source_format, rows, cols, slices, check_validity
+            )
+        raise
+    return bboxes_from_array(array, tails)
 
 
 def convert_bboxes_from_dicaugment(
@@ -593,12 +605,21 @@ def convert_bboxes_from_dicaugment(
         List of bounding boxes.
 
     """
-    return [
-        convert_bbox_from_dicaugment(
-            bbox, target_format, rows, cols, slices, check_validity
+    if not len(bboxes):
+        return []
+    array, tails = bboxes_to_array(bboxes)
+    try:
+        array = convert_bboxes_array_from_dicaugment(
+            array, target_format, rows, cols, slices, check_validity
         )
-        for bbox in bboxes
-    ]
+    except ValueError:
+        # report the first invalid bounding box together with its labels
+        for bbox in bboxes:
+            convert_bbox_from_dicaugment(
+                bbox, target_format, rows, cols, slices, check_validity
+            )
+        raise
+    return bboxes_from_array(array, tails)
 
 
 def check_bbox(bbox: BoxType) -> None:
@@ -625,8 +646,9 @@ def check_bbox(bbox: BoxType) -> None:
 
 def check_bboxes(bboxes: Sequence[BoxType]) -> None:
     """Check if bboxes boundaries are in range 0, 1 and minimums are lesser then maximums"""
-    for bbox in bboxes:
-        check_bbox(bbox)
+    if len(bboxes) and not np.all(_bboxes_validity(bboxes_to_array(bboxes)[0])):
+        for bbox in bboxes:
+            check_bbox(bbox)
 
 
 def filter_bboxes(
@@ -668,40 +690,23 @@ def filter_bboxes(
         List of bounding boxes.
 
     """
-    resulting_boxes: List[BoxType] = []
-    for bbox in bboxes:
-        # Calculate areas of bounding box before and after clipping.
-        transformed_box_area, transformed_box_volume = calculate_bbox_area_volume(
-            bbox, rows, cols, slices
-        )
-        bbox, tail = cast(BoxType, tuple(np.clip(bbox[:6], 0, 1.0))), tuple(bbox[6:])
-        clipped_box_area, clipped_box_volume = calculate_bbox_area_volume(
-            bbox, rows, cols, slices
-        )
-
-        # Calculate width and height of the clipped bounding box.
-        x_min, y_min, z_min, x_max, y_max, z_max = denormalize_bbox(
-            bbox, rows, cols, slices
-        )[:6]
-        clipped_width, clipped_height, clipped_depth = (
-            x_max - x_min,
-            y_max - y_min,
-            z_max - z_min,
-        )
-
-        if (
-            clipped_box_area
-            != 0  # to ensure transformed_box_area!=0 and to handle min_area=0 or min_visibility=0
-            and clipped_box_area >= min_planar_area
-            and clipped_box_volume >= min_volume
-            and clipped_box_area / transformed_box_area >= min_area_visibility
-            and clipped_box_volume / transformed_box_volume >= min_volume_visibility
-            and clipped_width >= min_width
-            and clipped_height >= min_height
-            and clipped_depth >= min_depth
-        ):
-            resulting_boxes.append(cast(BoxType, bbox + tail))
-    return resulting_boxes
+    if not len(bboxes):
+        return []
+    array, tails = bboxes_to_array(bboxes)
+    array, indices = filter_bboxes_array(
+        array,
+        rows,
+        cols,
+        slices,
+        min_area_visibility=min_area_visibility,
+        min_volume_visibility=min_volume_visibility,
+        min_planar_area=min_planar_area,
+        min_volume=min_volume,
+        min_width=min_width,
+        min_height=min_height,
+        min_depth=min_depth,
+    )
+    return bboxes_from_array(array, [tails[i] for i in indices])
 
 
 def union_of_bboxes(
@@ -744,3 +749,248 @@ def union_of_bboxes(
         x1, y1, z1 = np.min([x1, lim_x1]), np.min([y1, lim_y1]), np.min([z1, lim_z1])
         x2, y2, z2 = np.max([x2, lim_x2]), np.max([y2, lim_y2]), np.max([z2, lim_z2])
     return x1, y1, z1, x2, y2, z2
+
+
+def bboxes_to_array(bboxes: Sequence[BoxType]) -> Tuple[np.ndarray, List[Tuple[Any, ...]]]:
+    """Split a sequence of bounding boxes into an array of their coordinates and the list of their tails.
+
+    Args:
+        bboxes: A sequence of bounding boxes `(x_min, y_min, z_min, x_max, y_max, z_max, ...)`.
+
+    Returns:
+        An array of shape `(N, 6)` holding the coordinates and a list of the `N` tails (e.g. labels), in the same order.
+
+    """
+    array = np.array([bbox[:6] for bbox in bboxes], dtype=np.float64).reshape(-1, 6)
+    return array, [tuple(bbox[6:]) for bbox in bboxes]
+
+
+def bboxes_from_array(array: np.ndarray, tails: Sequence[Tuple[Any, ...]]) -> List[BoxType]:
+    """Join an array of bounding box coordinates of shape `(N, 6)` with their tails. Inverse of `bboxes_to_array`."""
+    return [tuple(coords) + tuple(tail) for coords, tail in zip(array.tolist(), tails)]  # type: ignore
+
+
+def _check_shape(rows: int, cols: int, slices: int) -> None:
+    if rows <= 0:
+        raise ValueError("Argument rows must be positive integer")
+    if cols <= 0:
+        raise ValueError("Argument cols must be positive integer")
+    if slices <= 0:
+        raise ValueError("Argument slices must be positive integer")
+
+
+def normalize_bboxes_array(bboxes: np.ndarray, rows: int, cols: int, slices: int) -> np.ndarray:
+    """Normalize an array of bounding boxes. See `normalize_bbox`.
+
+    Args:
+        bboxes: Denormalized bounding boxes, an array of shape `(N, 6)`.
+        rows: Image height.
+        cols: Image width.
+        slices: Image depth.
+
+    Returns:
+        Normalized bounding boxes, an array of shape `(N, 6)`.
+
+    Raises:
+        ValueError: If rows, cols, or slices is less or equal zero
+
+    """
+    _check_shape(rows, cols, slices)
+    return bboxes[:, :6] / np.array([cols, rows, slices, cols, rows, slices])
+
+
+def denormalize_bboxes_array(bboxes: np.ndarray, rows: int, cols: int, slices: int) -> np.ndarray:
+    """Denormalize an array of bounding boxes. See `denormalize_bbox`.
+
+    Args:
+        bboxes: Normalized bounding boxes, an array of shape `(N, 6)`.
+        rows: Image height.
+        cols: Image width.
+        slices: Image depth.
+
+    Returns:
+        Denormalized bounding boxes, an array of shape `(N, 6)`.
+
+    Raises:
+        ValueError: If rows, cols, or slices is less or equal zero
+
+    """
+    _check_shape(rows, cols, slices)
+    return bboxes[:, :6] * np.array([cols, rows, slices, cols, rows, slices])
+
+
+def _bboxes_area_volume(
+    bboxes: np.ndarray, rows: int, cols: int, slices: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    x_min, y_min, z_min, x_max, y_max, z_max = denormalize_bboxes_array(bboxes, rows, cols, slices).T
+    area = (x_max - x_min) * (y_max - y_min)
+    return area, area * (z_max - z_min)
+
+
+def _bboxes_validity(bboxes: np.ndarray) -> np.ndarray:
+    """Returns a boolean mask of the bounding boxes that pass `check_bbox`"""
+    coords = bboxes[:, :6]
+    in_range = ((coords >= 0) & (coords <= 1)) | np.isclose(coords, 0) | np.isclose(coords, 1)
+    return np.all(in_range, axis=1) & np.all(coords[:, 3:] > coords[:, :3], axis=1)
+
+
+def check_bboxes_array(bboxes: np.ndarray) -> None:
+    """Check if the boundaries of an array of bounding boxes of shape `(N, 6)` are in range 0, 1 and minimums are
+    lesser then maximums. See `check_bbox`.
+
+    Raises:
+        ValueError: for the first bounding box that is not valid.
+
+    """
+    invalid = np.flatnonzero(~_bboxes_validity(bboxes))
+    if len(invalid):
+        check_bbox(tuple(bboxes[invalid[0], :6].tolist()))
+
+
+def convert_bboxes_array_to_dicaugment(
+    bboxes: np.ndarray,
+    source_format: str,
+    rows: int,
+    cols: int,
+    slices: int,
+    check_validity: bool = False,
+) -> np.ndarray:
+    """Convert an array of bounding boxes of shape `(N, 6)` from a format specified in `source_format` to the format
+    used by dicaugment. See `convert_bbox_to_dicaugment`.
+
+    Args:
+        bboxes: An array of bounding boxes of shape `(N, 6)`.
+        source_format: format of the bounding boxes. Should be 'coco_3d', 'pascal_voc_3d', or 'yolo_3d'.
+        rows: Image height.
+        cols: Image width.
+        slices: Image depth
+        check_validity: Check if all boxes are valid boxes.
+
+    Returns:
+        An array of bounding boxes `(x_min, y_min, z_min, x_max, y_max, z_max)` of shape `(N, 6)`.
+
+    Raises:
+        ValueError: if `source_format` is not equal to `coco_3d` or `pascal_voc_3d`, or `yolo_3d`.
+        ValueError: If in YOLO format all labels not in range (0, 1).
+
+    """
+    if source_format not in {"coco_3d", "pascal_voc_3d", "yolo_3d"}:
+        raise ValueError(
+            f"Unknown source_format {source_format}. Supported formats are: 'coco_3d', 'pascal_voc_3d' and 'yolo_3d'"
+        )
+
+    bboxes = bboxes[:, :6]
+    if source_format == "coco_3d":
+        x_min, y_min, z_min, width, height, depth = bboxes.T
+        bboxes = np.stack([x_min, y_min, z_min, x_min + width, y_min + height, z_min + depth], axis=1)
+    elif source_format == "yolo_3d":
+        if check_validity and np.any((bboxes <= 0) | (bboxes > 1)):
+            raise ValueError(
+                "In YOLO format all coordinates must be float and in range (0, 1]"
+            )
+        x, y, z, w, h, d = bboxes.T
+        x_min = x - w / 2
+        y_min = y - h / 2
+        z_min = z - d / 2
+        bboxes = np.stack([x_min, y_min, z_min, x_min + w, y_min + h, z_min + d], axis=1)
+
+    if source_format != "yolo_3d":
+        bboxes = normalize_bboxes_array(bboxes, rows, cols, slices)
+    if check_validity:
+        check_bboxes_array(bboxes)
+    return bboxes
+
+
+def convert_bboxes_array_from_dicaugment(
+    bboxes: np.ndarray,
+    target_format: str,
+    rows: int,
+    cols: int,
+    slices: int,
+    check_validity: bool = False,
+) -> np.ndarray:
+    """Convert an array of bounding boxes of shape `(N, 6)` from the format used by dicaugment to a format, specified
+    in `target_format`. See `convert_bbox_from_dicaugment`.
+
+    Args:
+        bboxes: An array of dicaugment bounding boxes of shape `(N, 6)`.
+        target_format: required format of the output bounding boxes. Should be 'coco_3d', 'pascal_voc_3d' or 'yolo_3d'.
+        rows: Image height.
+        cols: Image width.
+        slices: Image depth.
+        check_validity: Check if all boxes are valid boxes.
+
+    Returns:
+        An array of bounding boxes of shape `(N, 6)`.
+
+    Raises:
+        ValueError: if `target_format` is not equal to `coco_3d`, `pascal_voc_3d` or `yolo_3d`.
+
+    """
+    if target_format not in {"coco_3d", "pascal_voc_3d", "yolo_3d"}:
+        raise ValueError(
+            f"Unknown target_format {target_format}. Supported formats are: 'coco_3d', 'pascal_voc_3d' and 'yolo_3d'"
+        )
+    if check_validity:
+        check_bboxes_array(bboxes)
+
+    bboxes = bboxes[:, :6]
+    if target_format != "yolo_3d":
+        bboxes = denormalize_bboxes_array(bboxes, rows, cols, slices)
+    x_min, y_min, z_min, x_max, y_max, z_max = bboxes.T
+    if target_format == "coco_3d":
+        bboxes = np.stack([x_min, y_min, z_min, x_max - x_min, y_max - y_min, z_max - z_min], axis=1)
+    elif target_format == "yolo_3d":
+        bboxes = np.stack(
+            [
+                (x_min + x_max) / 2.0,
+                (y_min + y_max) / 2.0,
+                (z_min + z_max) / 2.0,
+                x_max - x_min,
+                y_max - y_min,
+                z_max - z_min,
+            ],
+            axis=1,
+        )
+    return bboxes
+
+
+def filter_bboxes_array(
+    bboxes: np.ndarray,
+    rows: int,
+    cols: int,
+    slices: int,
+    min_area_visibility: float = 0.0,
+    min_volume_visibility: float = 0.0,
+    min_planar_area: float = 0.0,
+    min_volume: float = 0.0,
+    min_width: float = 0.0,
+    min_height: float = 0.0,
+    min_depth: float = 0.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Filter an array of bounding boxes of shape `(N, 6)` and crop them to the image. See `filter_bboxes`.
+
+    Returns:
+        The kept bounding boxes clipped to [0, 1], an array of shape `(M, 6)`, and the indices of the kept
+        bounding boxes in `bboxes`, to select their labels with.
+
+    """
+    transformed_box_area, transformed_box_volume = _bboxes_area_volume(bboxes, rows, cols, slices)
+    clipped = np.clip(bboxes[:, :6], 0, 1.0)
+    clipped_box_area, clipped_box_volume = _bboxes_area_volume(clipped, rows, cols, slices)
+
+    x_min, y_min, z_min, x_max, y_max, z_max = denormalize_bboxes_array(clipped, rows, cols, slices).T
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        keep = (
+            (clipped_box_area != 0)  # to ensure transformed_box_area!=0 and to handle min_area=0 or min_visibility=0
+            & (clipped_box_area >= min_planar_area)
+            & (clipped_box_volume >= min_volume)
+            & (clipped_box_area / transformed_box_area >= min_area_visibility)
+            & (clipped_box_volume / transformed_box_volume >= min_volume_visibility)
+            & (x_max - x_min >= min_width)
+            & (y_max - y_min >= min_height)
+            & (z_max - z_min >= min_depth)
+        )
+    indices = np.flatnonzero(keep)
+    return clipped[indices], indices
@@ -4,19 +4,22 @@ import random
 import typing
 import warnings
 from collections import defaultdict
+from collections.abc import MutableMapping
+from copy import deepcopy
 
 import numpy as np
 
 from .. import random_utils
 from .bbox_utils import BboxParams, BboxProcessor
 from .keypoints_utils import KeypointParams, KeypointsProcessor
+from .lazy import LazyVolume, ShapeOnlyVolume
 from .serialization import (
     SERIALIZABLE_REGISTRY,
     Serializable,
     get_shortest_class_fullname,
     instantiate_nonserializable,
 )
-from .transforms_interface import BasicTransform
+from .transforms_interface import INTER_NEAREST, BasicTransform, DualTransform
 from .utils import format_args, get_shape
 
 __all__ = [
@@ -26,6 +29,8 @@ __all__ = [
     "OneOf",
     "OneOrOther",
     "ReplayCompose",
+    "ReplayRecord",
+    "CompiledReplay",
     "Sequential",
 ]
 
@@ -47,6 +52,58 @@ def get_always_apply(
     return new_transforms
 
 
+def _compile_dispatch_tables(transforms: TransformsSeqType, targets: typing.Tuple[str, ...]) -> None:
+    """Builds the dispatch tables of `targets` for the transforms, including those of nested compositions"""
+    for transform in transforms:
+        if isinstance(transform, Compose):
+            transform.compile(*targets)
+        elif isinstance(transform, BaseCompose):
+            _compile_dispatch_tables(transform.transforms, targets)
+        else:
+            transform._get_dispatch_table(targets)  # skipcq: PYL-W0212
+
+
+def _is_fusable_with(first: TransformType, other: TransformType) -> bool:
+    """Returns whether two affine transforms extend the input the same way and can be resampled together"""
+    return all(
+        getattr(first, attr, None) is None
+        or getattr(other, attr, None) is None
+        or getattr(first, attr) == getattr(other, attr)
+        for attr in ("border_mode", "value", "mask_value")
+    )
+
+
+def _is_lazy(arg: typing.Any) -> bool:
+    """Returns whether an image, mask or list of masks is read on demand"""
+    if isinstance(arg, (list, tuple)):
+        return any(_is_lazy(a) for a in arg)
+    return isinstance(arg, (LazyVolume, np.memmap))
+
+
+def _read(arg: typing.Any) -> typing.Any:
+    """Reads a `LazyVolume` (or each one in a list of masks) into memory"""
+    if isinstance(arg, (list, tuple)):
+        return [_read(a) for a in arg]
+    if isinstance(arg, ShapeOnlyVolume):
+        return arg
+    return np.asarray(arg)
+
+
+def _stack_or_list(arrays: typing.List[typing.Any]) -> typing.Any:
+    """Stacks arrays that share a shape and dtype, otherwise returns them as a list"""
+    if len({(a.shape, a.dtype) for a in arrays}) == 1:
+        return np.stack(arrays)
+    return arrays
+
+
+def _get_run_attr(run: typing.Sequence[DualTransform], attr: str, default: typing.Any) -> typing.Any:
+    """Returns the first value of `attr` set by a transform of the run"""
+    return next(
+        (getattr(t, attr) for t in run if getattr(t, attr, None) is not None),
+        default,
+    )
+
+
 class BaseCompose(Serializable):
     """
     Abtract Base Class for the Compose Class. Not intended to be instantiated.
@@ -179,6 +236,31 @@ class Compose(BaseCompose):
         p (float): probability of applying all list of transforms. Default: 1.0.
         is_check_shapes (bool): If True shapes consistency of images/mask/masks would be checked on each call. If you
             would like to disable this check - pass False (do it only if you are sure in your data consistency).
+        fuse_affine (bool): If True, runs of adjacent affine transforms (e.g. `ShiftScaleRotate`, `Rotate`,
+            `RandomScale`, `Resize` and the flips) are composed into a single matrix, and images and masks are
+            resampled once per run instead of once per transform. Bboxes and keypoints still go through each
+            transform. Transforms with differing `border_mode`, `value` or `mask_value` are not fused. Default: False
+        fuse_lut (bool): If True, runs of adjacent point-wise intensity transforms (`RandomGamma`, `InvertImg`,
+            `Posterize` and `RandomBrightnessContrast` with `max_brightness`) on uint8, uint16 or int16 images are
+            composed into a single lookup table, and images are mapped through it once per run. Default: False
+        inplace (bool): If True, the transforms run in inplace mode (see `inplace_mode`): intensity transforms write
+            their result into the image they are given instead of allocating a new volume, which lowers the peak
+            memory of the pipeline. The images passed to the pipeline may be overwritten, including memory maps
+            opened for writing. Default: False
+
+    Note:
+        With `fuse_affine=True` intermediate volumes are no longer resampled, and the run is resampled once
+        with the highest interpolation order among its transforms. Where every intermediate volume covers
+        the input, the result differs from the unfused pipeline by interpolation error only. Elsewhere it can
+        differ by much more, since the unfused pipeline clips each intermediate volume to its shape and fills
+        or extends it according to `border_mode`, while the fused run samples the input directly. This
+        affects voxels near the border for every `border_mode`, and voxels along the edges of the input
+        wherever they end up, e.g. in the interior of the output of chained `Rotate(crop_to_border=True)`.
+        With `fuse_lut=True` the result is the same as that of the unfused pipeline.
+
+        Images and masks may also be given as a `LazyVolume` or `np.memmap`. If the first transform is
+        `RandomCrop`, `CenterCrop`, `Crop` or `RandomSizedCrop`, its coordinates are computed from the
+        shape alone and only the cropped region is read from the source before the remaining transforms run.
     """
 
     def __init__(
@@ -189,6 +271,9 @@ class Compose(BaseCompose):
         additional_targets: typing.Optional[typing.Dict[str, str]] = None,
         p: float = 1.0,
         is_check_shapes: bool = True,
+        fuse_affine: bool = False,
+        fuse_lut: bool = False,
+        inplace: bool = False,
     ):
         super(Compose, self).__init__(transforms, p)
 
@@ -233,6 +318,38 @@ class Compose(BaseCompose):
         self._disable_check_args_for_transforms(self.transforms)
 
         self.is_check_shapes = is_check_shapes
+        self.fuse_affine = fuse_affine
+        self.fuse_lut = fuse_lut
+        self.inplace = inplace
+
+        # set by `compile`
+        self._compiled_version = -1
+        self._checked_processors: typing.List[typing.Union[BboxProcessor, KeypointsProcessor]] = []
+
+    def compile(self, *targets: str) -> "Compose":
+        """
+        Precomputes what each call looks up: the processors that filter bboxes and keypoints after each transform
+        and, if `targets` are given, the dispatch tables of the transforms of the pipeline, which map each target to
+        its `apply` method (see `BasicTransform._get_dispatch_table`).
+
+        The pipeline is compiled on its first call and recompiled when a public attribute of it is set, and the
+        dispatch tables of other targets are built when they are first seen, so calling this method only moves that
+        work out of the first call. Changes made inside an attribute (e.g. to `processors`) need a new call.
+
+        Args:
+            *targets (str): the names of the targets in the order they are passed, for example
+                `aug.compile("image", "mask")` for calls `aug(image=image, mask=mask)`
+
+        Returns:
+            self
+        """
+        self._checked_processors = [
+            p for p in self.processors.values() if getattr(p.params, "check_each_transform", False)
+        ]
+        self._compiled_version = self.serialized_version
+        if targets:
+            _compile_dispatch_tables(self.transforms, tuple(targets))
+        return self
 
     @staticmethod
     def _disable_check_args_for_transforms(transforms: TransformsSeqType) -> None:
@@ -270,6 +387,8 @@ class Compose(BaseCompose):
         assert isinstance(
             force_apply, (bool, int)
         ), "force_apply must have bool or int type"
+        if self._compiled_version != self.serialized_version:
+            self.compile()
         need_to_run = force_apply or random.random() < self.p
         for p in self.processors.values():
             p.ensure_data_valid(data)
@@ -277,19 +396,24 @@ class Compose(BaseCompose):
             self.transforms if need_to_run else get_always_apply(self.transforms)
         )
 
-        check_each_transform = any(
-            getattr(item.params, "check_each_transform", False)
-            for item in self.processors.values()
-        )
+        check_each_transform = bool(self._checked_processors)
 
         for p in self.processors.values():
             p.preprocess(data)
 
-        for idx, t in enumerate(transforms):
-            data = t(**data)
+        from ..augmentations.utils import inplace_mode, is_inplace
 
-            if check_each_transform:
-                data = self._check_data_post_transform(data)
+        with inplace_mode(self.inplace or is_inplace()):
+            transforms, data = self._read_lazy_targets(transforms, data, check_each_transform)
+
+            if self.fuse_affine or self.fuse_lut:
+                data = self._apply_fused(transforms, data, check_each_transform)
+            else:
+                for idx, t in enumerate(transforms):
+                    data = t(**data)
+
+                    if check_each_transform:
+                        data = self._check_data_post_transform(data)
         data = Compose._make_targets_contiguous(
             data
         )  # ensure output targets are contiguous
@@ -299,15 +423,357 @@ class Compose(BaseCompose):
 
         return data
 
-    def _check_data_post_transform(
-        self, data: typing.Dict[str, typing.Any]
+    def batch(
+        self,
+        images: typing.Union[np.ndarray, typing.Sequence[np.ndarray]],
+        masks: typing.Optional[typing.Union[np.ndarray, typing.Sequence[np.ndarray]]] = None,
+        force_apply: bool = False,
+        **targets
     ) -> typing.Dict[str, typing.Any]:
-        rows, cols, slices = get_shape(data["image"])
+        """Applies the transformations to each sample of a batch.
 
-        for p in self.processors.values():
-            if not getattr(p.params, "check_each_transform", False):
+        Parameters are drawn for each sample, as with one call per sample. Transforms that support it
+        (`is_batchable`, e.g. `Normalize`, `RandomBrightnessContrast`, `RandomGamma`, `GaussNoise`, `InvertImg`
+        and the flips) are then applied to the images and masks of all samples in one call. Other transforms
+        are applied one sample at a time.
+
+        Args:
+            images (np.ndarray, list of np.ndarray): a batch of images of shape (N,H,W,D) or (N,H,W,D,C)
+            masks (np.ndarray, list of np.ndarray, None): a batch of masks, one for each image. Default: None
+            force_apply(bool): whether to always apply the transformations. Default: False
+            **targets: other targets with one entry for each image, for example `bboxes=[bboxes_0, bboxes_1]`
+
+        Returns:
+            Dictionary with the augmented `images`, `masks` and other targets. Images and masks are returned as
+            arrays if they share the same shape and dtype, otherwise as lists.
+
+        Raises:
+            ValueError: If the targets do not have the same number of samples as `images`
+        """
+        inputs = dict(targets, image=images)
+        if masks is not None:
+            inputs["mask"] = masks
+        n = len(images)
+        for key, values in inputs.items():
+            if len(values) != n:
+                raise ValueError(
+                    "Expected {} samples for '{}' to match images. Got: {}".format(n, key, len(values))
+                )
+
+        samples = [{key: values[i] for key, values in inputs.items()} for i in range(n)]
+        active = []
+        for data in samples:
+            if self.is_check_args:
+                self._check_args(**data)
+            for p in self.processors.values():
+                p.ensure_data_valid(data)
+            need_to_run = force_apply or random.random() < self.p
+            transforms = self.transforms if need_to_run else get_always_apply(self.transforms)
+            active.append({id(t) for t in transforms})
+
+        if self._compiled_version != self.serialized_version:
+            self.compile()
+        check_each_transform = bool(self._checked_processors)
+
+        for data in samples:
+            for p in self.processors.values():
+                p.preprocess(data)
+
+        # the stacked images and masks, while samples[i][key] is a view of stacked[key][i]
+        stacked: typing.Dict[str, typing.Optional[np.ndarray]] = {
+            key: inputs[key] if isinstance(inputs[key], np.ndarray) else None
+            for key in ("image", "mask")
+            if key in inputs
+        }
+        # the stacked arrays that were allocated here (rather than passed in) and may be written in place
+        owned: typing.Set[str] = set()
+        for t in self.transforms:
+            idx = [i for i in range(n) if id(t) in active[i]]
+            if not idx:
+                continue
+
+            if isinstance(t, BasicTransform) and t.is_batchable:
+                self._apply_batched(t, samples, idx, stacked, owned)
+            else:
+                for i in idx:
+                    samples[i] = t(**samples[i])
+                stacked = dict.fromkeys(stacked)
+                owned.clear()
+
+            if check_each_transform:
+                for i in idx:
+                    samples[i] = self._check_data_post_transform(samples[i])
+
+        for i, data in enumerate(samples):
+            samples[i] = Compose._make_targets_contiguous(data)
+            for p in self.processors.values():
+                p.postprocess(samples[i])
+
+        result: typing.Dict[str, typing.Any] = {key: [data[key] for data in samples] for key in targets}
+        for key, name in (("image", "images"), ("mask", "masks")):
+            if key not in stacked:
+                continue
+            if stacked[key] is not None:
+                result[name] = np.ascontiguousarray(stacked[key])
+            else:
+                result[name] = _stack_or_list([data[key] for data in samples])
+        return result
+
+    def _apply_batched(
+        self,
+        t: BasicTransform,
+        samples: typing.List[typing.Dict[str, typing.Any]],
+        idx: typing.List[int],
+        stacked: typing.Dict[str, typing.Optional[np.ndarray]],
+        owned: typing.Set[str],
+    ) -> None:
+        """Applies a batchable transform to the samples `idx`, in place, processing their images and masks at once"""
+        sampled = [(i, t.sample_params(**samples[i])) for i in idx]
+        applied = [i for i, p in sampled if p is not None]
+        params = [t.update_params(p, **samples[i]) for i, p in sampled if p is not None]
+        if not applied:
+            return
+
+        for i, p in zip(applied, params):
+            data = samples[i]
+            for key, target_function, dependencies in t._get_dispatch_table(tuple(data)):  # skipcq: PYL-W0212
+                arg = data[key]
+                if key in stacked or arg is None:
+                    continue
+                data[key] = target_function(arg, **dict(p, **{k: data[k] for k in dependencies}))
+
+        batch_functions: typing.Dict[
+            str, typing.Callable[[np.ndarray, typing.Sequence[typing.Dict[str, typing.Any]]], np.ndarray]
+        ] = {"image": t.apply_to_batch}
+        if isinstance(t, DualTransform):
+            batch_functions["mask"] = t.apply_to_mask_batch
+
+        for key in stacked:
+            if key not in batch_functions:
+                continue
+
+            source = stacked[key]
+            if source is None:
+                arrays = [samples[i][key] for i in applied]
+                if len({(a.shape, a.dtype) for a in arrays}) != 1:
+                    for i, p in zip(applied, params):
+                        samples[i][key] = t._get_target_function(key)(samples[i][key], **p)  # skipcq: PYL-W0212
+                    continue
+                batch = np.stack(arrays)
+            else:
+                batch = source if len(applied) == len(samples) else source[applied]
+
+            out = batch_functions[key](batch, params)
+
+            if len(applied) == len(samples):
+                if out is not batch:
+                    owned.add(key)
+                merged = out
+            elif source is not None and out.dtype == source.dtype and out.shape[1:] == source.shape[1:]:
+                merged = source if key in owned else source.copy()
+                owned.add(key)
+                merged[applied] = out
+            else:
+                stacked[key] = None
+                owned.discard(key)
+                for j, i in enumerate(applied):
+                    samples[i][key] = out[j]
+                continue
+
+            stacked[key] = merged
+            for i, data in enumerate(samples):
+                data[key] = merged[i]
+
+    def _read_lazy_targets(
+        self,
+        transforms: TransformsSeqType,
+        data: typing.Dict[str, typing.Any],
+        check_each_transform: bool,
+    ) -> typing.Tuple[TransformsSeqType, typing.Dict[str, typing.Any]]:
+        """
+        Reads `LazyVolume` and `np.memmap` images and masks into memory. If the first transform is a crop, it is
+        applied first so that only the cropped region is read. Returns the remaining transforms and the data.
+        """
+        lazy_keys = [
+            key
+            for key, arg in data.items()
+            if self.additional_targets.get(key, key) in {"image", "mask", "masks"} and _is_lazy(arg)
+        ]
+        if not lazy_keys:
+            return transforms, data
+
+        if transforms and isinstance(transforms[0], DualTransform) and transforms[0].is_crop:
+            t, transforms = transforms[0], transforms[1:]
+            # the crop coordinates only depend on the shape, so only the cropped region is read
+            params = t.sample_params(**data)
+            if params is not None:
+                data = t.apply_with_params(params, **data)
+            if check_each_transform:
+                data = self._check_data_post_transform(data)
+
+        for key in lazy_keys:
+            data[key] = _read(data[key])
+        return transforms, data
+
+    def _apply_fused(
+        self,
+        transforms: TransformsSeqType,
+        data: typing.Dict[str, typing.Any],
+        check_each_transform: bool,
+    ) -> typing.Dict[str, typing.Any]:
+        """Applies the transforms, fusing runs of adjacent compatible affine or point-wise transforms"""
+        apply_run: typing.Dict[str, typing.Callable[..., typing.Dict[str, typing.Any]]] = {
+            "affine": self._apply_affine_run,
+            "lut": self._apply_lut_run,
+        }
+        run: typing.List[BasicTransform] = []
+        run_kind = ""
+        for t in transforms:
+            # the kind of run a transform can be fused into, or "" for compositions and other transforms
+            kind = ""
+            if isinstance(t, BasicTransform):
+                if self.fuse_affine and isinstance(t, DualTransform) and t.is_affine:
+                    kind = "affine"
+                elif self.fuse_lut and t.is_pointwise:
+                    kind = "lut"
+
+            if run and (kind != run_kind or (kind == "affine" and not all(_is_fusable_with(r, t) for r in run))):
+                data = apply_run[run_kind](run, data, check_each_transform)
+                run = []
+            if kind and isinstance(t, BasicTransform):
+                run.append(t)
+                run_kind = kind
+                continue
+
+            data = t(**data)
+            if check_each_transform:
+                data = self._check_data_post_transform(data)
+        if run:
+            data = apply_run[run_kind](run, data, check_each_transform)
+        return data
+
+    def _apply_affine_run(
+        self,
+        run: typing.List[DualTransform],
+        data: typing.Dict[str, typing.Any],
+        check_each_transform: bool,
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Samples the parameters of each transform of the run, composes their matrices and resamples images and masks
+        once. Bboxes, keypoints and other targets go through each transform in turn.
+        """
+        # parameters are sampled in the same order as in the unfused pipeline, so both draw the same values
+        steps = []
+        for t in run:
+            params = t.sample_params(**data)
+            if params is not None:
+                steps.append((t, params))
+
+        if len(steps) < 2:
+            for t, params in steps:
+                data = t.apply_with_params(params, **data)
+                if check_each_transform:
+                    data = self._check_data_post_transform(data)
+            return data
+
+        from ..augmentations.geometric import functional as FGeometric
+
+        shape = get_shape(data["image"])
+        matrix = np.eye(4)
+        spatial_targets = {"image", "mask", "masks"}
+        for t, params in steps:
+            params = t.update_params(params, image=np.empty(shape + (0,)))
+            step_matrix, (rows, cols, slices) = t.get_affine(**params)
+            shape = (rows, cols, slices)
+            matrix = np.matmul(matrix, step_matrix)
+            for key, arg in data.items():
+                if arg is None or self.additional_targets.get(key, key) in spatial_targets:
+                    continue
+                data[key] = t._get_target_function(key)(arg, **params)  # skipcq: PYL-W0212
+            if check_each_transform:
+                data = self._check_data_post_transform(data, shape)
+
+        interpolation = max(getattr(t, "interpolation", INTER_NEAREST) for t, _ in steps)
+        border_mode = _get_run_attr(run, "border_mode", "constant")
+        value = _get_run_attr(run, "value", 0)
+        mask_value = _get_run_attr(run, "mask_value", 0)
+
+        def warp(img: np.ndarray, order: int, fill: typing.Any) -> np.ndarray:
+            return FGeometric.warp_affine(img, matrix, shape, order, border_mode, fill)
+
+        for key, arg in data.items():
+            target = self.additional_targets.get(key, key)
+            if arg is None or target not in spatial_targets:
                 continue
+            if target == "image":
+                data[key] = warp(arg, interpolation, value)
+            elif target == "mask":
+                data[key] = warp(arg, INTER_NEAREST, mask_value)
+            else:
+                data[key] = [warp(mask, INTER_NEAREST, mask_value) for mask in arg]
+        return data
 
+    def _apply_lut_run(
+        self,
+        run: typing.List[BasicTransform],
+        data: typing.Dict[str, typing.Any],
+        check_each_transform: bool,
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Samples the parameters of each transform of the run, composes their lookup tables and maps the images
+        through the result once. Runs whose images cannot be described by lookup tables are applied in turn.
+        """
+        from ..augmentations import functional as FMain
+
+        steps = []
+        for t in run:
+            params = t.sample_params(**data)
+            if params is not None:
+                steps.append((t, params))
+
+        image_keys = [
+            key
+            for key, arg in data.items()
+            if arg is not None and self.additional_targets.get(key, key) == "image"
+        ]
+        dtypes = {data[key].dtype for key in image_keys}
+        luts: typing.List[np.ndarray] = []
+        if (
+            len(steps) > 1
+            and len(dtypes) == 1
+            and FMain.supports_lut(next(iter(dtypes)))
+            and not any(isinstance(data[key], ShapeOnlyVolume) for key in image_keys)
+        ):
+            dtype = next(iter(dtypes))
+            for t, params in steps:
+                step_lut = t.get_lut(dtype, **t.update_params(params, **data))
+                if step_lut is None:
+                    luts = []
+                    break
+                luts.append(step_lut)
+
+        if not luts:
+            for t, params in steps:
+                data = t.apply_with_params(params, **data)
+                if check_each_transform:
+                    data = self._check_data_post_transform(data)
+            return data
+
+        lut = luts[0]
+        for step_lut in luts[1:]:
+            lut = FMain.compose_luts(lut, step_lut)
+        for key in image_keys:
+            data[key] = FMain.apply_lut(data[key], lut)
+        return data
+
+    def _check_data_post_transform(
+        self,
+        data: typing.Dict[str, typing.Any],
+        shape: typing.Optional[typing.Tuple[int, int, int]] = None,
+    ) -> typing.Dict[str, typing.Any]:
+        rows, cols, slices = get_shape(data["image"]) if shape is None else shape
+
+        for p in self._checked_processors:
             for data_name in p.data_fields:
                 data[data_name] = p.filter(data[data_name], rows, cols, slices)
         return data
@@ -327,6 +793,9 @@ class Compose(BaseCompose):
                 else None,
                 "additional_targets": self.additional_targets,
                 "is_check_shapes": self.is_check_shapes,
+                "fuse_affine": self.fuse_affine,
+                "fuse_lut": self.fuse_lut,
+                "inplace": self.inplace,
             }
         )
         return dictionary
@@ -347,6 +816,9 @@ class Compose(BaseCompose):
                 "additional_targets": self.additional_targets,
                 "params": None,
                 "is_check_shapes": self.is_check_shapes,
+                "fuse_affine": self.fuse_affine,
+                "fuse_lut": self.fuse_lut,
+                "inplace": self.inplace,
             }
         )
         return dictionary
@@ -361,9 +833,10 @@ class Compose(BaseCompose):
         for data_name, data in kwargs.items():
             internal_data_name = self.additional_targets.get(data_name, data_name)
             if internal_data_name in checked_single:
-                if not isinstance(data, np.ndarray):
+                if not isinstance(data, (np.ndarray, LazyVolume)):
                     raise TypeError("{} must be numpy array type".format(data_name))
-                if data.dtype.name == "float32" and (
+                # checking the range of a lazy volume would read all of it
+                if not _is_lazy(data) and data.dtype == np.float32 and (
                     np.max(data) > 1.0 or np.min(data) < 0.0
                 ):
                     raise ValueError(
@@ -373,7 +846,7 @@ class Compose(BaseCompose):
                 shapes.append(data.shape[:3])
             if internal_data_name in checked_multi:
                 if data is not None:
-                    if not isinstance(data[0], np.ndarray):
+                    if not isinstance(data[0], (np.ndarray, LazyVolume)):
                         raise TypeError(
                             "{} must be list of numpy arrays".format(data_name)
                         )
@@ -568,6 +1041,13 @@ class ReplayCompose(Compose):
         is_check_shapes (bool): If True shapes consistency of images/mask/masks would be checked on each call. If you
             would like to disable this check - pass False (do it only if you are sure in your data consistency).
         save_key(str): The dict key where the saved parameters will be found in output. Default: "replay"
+        lazy_records(bool): If True the parameters are saved as a `ReplayRecord`, which builds the nested dict only
+            when it is first read, e.g. to pass them to `ReplayLog.append` without building it. Default: False
+        fuse_affine (bool): If True, runs of adjacent affine transforms are fused, see `Compose`. Default: False
+        fuse_lut (bool): If True, runs of adjacent point-wise intensity transforms are fused, see `Compose`.
+            Default: False
+        inplace (bool): If True, the transforms run in inplace mode and may overwrite the images passed to the
+            pipeline, see `Compose`. Default: False
     """
     def __init__(
         self,
@@ -578,6 +1058,10 @@ class ReplayCompose(Compose):
         p: float = 1.0,
         is_check_shapes: bool = True,
         save_key: str = "replay",
+        lazy_records: bool = False,
+        fuse_affine: bool = False,
+        fuse_lut: bool = False,
+        inplace: bool = False,
     ):
         super(ReplayCompose, self).__init__(
             transforms,
@@ -586,9 +1070,14 @@ class ReplayCompose(Compose):
             additional_targets,
             p,
             is_check_shapes,
+            fuse_affine=fuse_affine,
+            fuse_lut=fuse_lut,
+            inplace=inplace,
         )
         self.set_deterministic(True, save_key=save_key)
         self.save_key = save_key
+        self.lazy_records = lazy_records
+        self._template: typing.Optional[typing.Tuple[tuple, typing.Dict[str, typing.Any]]] = None
 
     def __call__(
         self, *args, force_apply: bool = False, **kwargs
@@ -596,6 +1085,9 @@ class ReplayCompose(Compose):
         """
         Applies each transformation and saves the parameters used.
 
+        The parameters are saved as a dict filled in from the serialized pipeline (`get_template`), or as a
+        `ReplayRecord` that is only filled in when it is first read if `lazy_records` is set.
+
         Args:
             force_apply(bool): whether to always apply the transformations. Default: False
             **data: keyword arguments for augmentations (e.g, image=image, bboxes=bboxes)
@@ -605,21 +1097,83 @@ class ReplayCompose(Compose):
         """
         kwargs[self.save_key] = defaultdict(dict)
         result = super(ReplayCompose, self).__call__(force_apply=force_apply, **kwargs)
-        serialized = self.get_dict_with_id()
-        self.fill_with_params(serialized, result[self.save_key])
-        self.fill_applied(serialized)
-        result[self.save_key] = serialized
+        if self.lazy_records:
+            result[self.save_key] = ReplayRecord(self.get_template(), result[self.save_key])
+        else:
+            result[self.save_key] = ReplayRecord._fill(self.get_template(), result[self.save_key])
         return result
 
+    def get_template(self) -> typing.Dict[str, typing.Any]:
+        """
+        Returns the serialized representation of the pipeline with the identifier of each transform, as returned by
+        `get_dict_with_id`. It is built once and rebuilt when a public attribute of a transform of the pipeline is set
+        or a transform is added, removed or replaced. Do not modify it.
+        """
+        versions = tuple(self._iter_versions(self))
+        if self._template is None or self._template[0] != versions:
+            self._template = (versions, self.get_dict_with_id())
+        return self._template[1]
+
+    @staticmethod
+    def _iter_versions(transform: TransformType) -> typing.Iterator[typing.Tuple[int, int]]:
+        yield id(transform), transform.serialized_version
+        if isinstance(transform, BaseCompose):
+            yield id(transform.transforms), len(transform.transforms)
+            for t in transform.transforms:
+                yield from ReplayCompose._iter_versions(t)
+
+    def dry_run(
+        self,
+        shape: typing.Sequence[int],
+        dtype: typing.Union[np.dtype, str, type] = np.float64,
+        force_apply: bool = False,
+        **targets
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Samples and saves the augmentation parameters from the shape of the image alone, without its pixel data.
+        The saved parameters can be passed to `replay` later, together with the actual image.
+
+        The image is replaced by a `ShapeOnlyVolume` that each transform passes on with the shape of its output
+        (see `BasicTransform.get_output_shape`). Other targets, such as `dicom`, `bboxes` and `keypoints`, are
+        transformed as usual since the parameters of later transforms may depend on them.
+
+        Args:
+            shape (tuple of int): the shape of the image, (H, W, D) or (H, W, D, C)
+            dtype (np.dtype): the data type of the image. Default: np.float64
+            force_apply(bool): whether to always apply the transformations. Default: False
+            **targets: targets other than images and masks (e.g, dicom=dicom, bboxes=bboxes)
+
+        Returns:
+            the saved augmentation parameters, as found in the output of `__call__` under `save_key`
+
+        Raises:
+            ValueError: If images or masks are passed in `targets`
+            PixelDataUnavailableError: If a transform reads the voxels of a target in `targets_as_params` to
+                sample its parameters
+        """
+        for key in targets:
+            if self.additional_targets.get(key, key) in {"image", "mask", "masks"}:
+                raise ValueError(
+                    "dry_run only takes the shape of the image, but '{}' was passed".format(key)
+                )
+        result = self(force_apply=force_apply, image=ShapeOnlyVolume(shape, dtype), **targets)
+        return result[self.save_key]
+
+    def batch(self, *args, **kwargs) -> typing.Dict[str, typing.Any]:
+        """Not supported, since the parameters of a ReplayCompose are recorded for one sample at a time"""
+        raise NotImplementedError("ReplayCompose does not support batch, call it once per sample instead")
+
     @staticmethod
     def replay(
         saved_augmentations: typing.Dict[str, typing.Any], **kwargs
     ) -> typing.Dict[str, typing.Any]:
         """
         Applies augmentations to new targets using the previously saved augmentation parameters.
+        To apply the same parameters to several targets, `CompiledReplay` restores the pipeline only once.
         
         Args:
-            saved_augmentations (dict): previously saved augmentation parameters found from invoking `__call__`
+            saved_augmentations (dict): previously saved augmentation parameters found from invoking `__call__`,
+                or a row of a `ReplayLog`
             kwargs (dict): keyword arguments for augmentations (e.g, image=image, bboxes=bboxes)
         
         """
@@ -701,10 +1255,127 @@ class ReplayCompose(Compose):
     def _to_dict(self) -> typing.Dict[str, typing.Any]:
         """Returns a serializable representation of object"""
         dictionary = super(ReplayCompose, self)._to_dict()
-        dictionary.update({"save_key": self.save_key})
+        dictionary.update({"save_key": self.save_key, "lazy_records": self.lazy_records})
         return dictionary
 
 
+class ReplayRecord(MutableMapping):
+    """
+    The parameters saved by `ReplayCompose` with `lazy_records` set: a mapping like the dict of
+    `ReplayCompose.get_dict_with_id`, with the parameters of each transform under "params" and whether it was
+    applied under "applied" in place of its "id".
+
+    Until it is first read, the record only keeps the parameters of each transform and the template of the pipeline
+    shared by all records (`ReplayCompose.get_template`). The nested dict is built on the first access, so records
+    that are never read, or only passed on, cost no more than their parameters. Pickling or copying a record, or
+    `dict(record)`, gives a plain dict, e.g. to save it with `json.dump`.
+
+    Args:
+        template (dict): the serialized pipeline with the identifier of each transform, see `ReplayCompose.get_template`
+        params (dict): the parameters of each applied transform by identifier
+    """
+
+    def __init__(self, template: typing.Dict[str, typing.Any], params: typing.Dict[int, typing.Any]):
+        self._template: typing.Optional[typing.Dict[str, typing.Any]] = template
+        self._params: typing.Optional[typing.Dict[int, typing.Any]] = params
+        self._data: typing.Dict[str, typing.Any] = {}
+
+    @property
+    def data(self) -> typing.Dict[str, typing.Any]:
+        """The record as a plain dict, built on first access"""
+        if self._template is not None:
+            self._data = self._fill(self._template, typing.cast(typing.Dict[int, typing.Any], self._params))
+            self._template = self._params = None
+        return self._data
+
+    @staticmethod
+    def _fill(
+        node: typing.Dict[str, typing.Any], all_params: typing.Dict[int, typing.Any]
+    ) -> typing.Dict[str, typing.Any]:
+        """Returns a copy of a `node` of the template with its "id" replaced by its "params" and "applied" values"""
+        result: typing.Dict[str, typing.Any] = {}
+        for key, value in node.items():
+            if key == "transforms":
+                result[key] = [ReplayRecord._fill(t, all_params) for t in value]
+            elif key != "id":
+                # values such as `bbox_params` are copied, so that changing a record does not change the template
+                result[key] = value if isinstance(value, (str, int, float, type(None))) else deepcopy(value)
+        result["params"] = all_params.get(node["id"])
+        if "transforms" in result:
+            result["applied"] = any(t["applied"] for t in result["transforms"])
+        else:
+            result["applied"] = result["params"] is not None
+        return result
+
+    def __getitem__(self, key: str) -> typing.Any:
+        return self.data[key]
+
+    def __setitem__(self, key: str, value: typing.Any) -> None:
+        self.data[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self.data[key]
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return repr(self.data)
+
+    def __reduce__(self) -> typing.Tuple[type, typing.Tuple[typing.Dict[str, typing.Any]]]:
+        return dict, (self.data,)
+
+    def copy(self) -> typing.Dict[str, typing.Any]:
+        """Returns a shallow copy of the record as a plain dict"""
+        return self.data.copy()
+
+
+class CompiledReplay:
+    """
+    Applies previously saved augmentation parameters to new targets, any number of times.
+
+    `ReplayCompose.replay` restores the pipeline from the saved parameters on every call. A `CompiledReplay` restores
+    it once, so the same augmentation can be applied to an image, its mask and several derived maps without
+    rebuilding the transforms each time.
+
+    Args:
+        saved_augmentations (dict): previously saved augmentation parameters found from invoking `ReplayCompose`
+        lambda_transforms (dict): A dictionary that contains lambda transforms, see `ReplayCompose._restore_for_replay`
+
+    Example:
+        >>> import dicaugment as dca
+        >>> aug = dca.ReplayCompose([dca.Rotate(), dca.RandomCrop(64, 64, 64)])
+        >>> data = aug(image=image)
+        >>> replay = dca.CompiledReplay(data["replay"])
+        >>> maps = [replay(image=volume)["image"] for volume in derived_maps]
+    """
+
+    def __init__(
+        self,
+        saved_augmentations: typing.Dict[str, typing.Any],
+        lambda_transforms: typing.Optional[dict] = None,
+    ):
+        self.transform = ReplayCompose._restore_for_replay(saved_augmentations, lambda_transforms)
+
+    def __call__(self, **kwargs) -> typing.Dict[str, typing.Any]:
+        """
+        Applies the saved augmentations.
+
+        Args:
+            kwargs (dict): keyword arguments for augmentations (e.g, image=image, bboxes=bboxes)
+
+        Returns:
+            Dictionary of augmented data
+        """
+        if isinstance(self.transform, ReplayCompose):
+            # the parameters are already known, so they are not recorded again
+            return Compose.__call__(self.transform, force_apply=True, **kwargs)
+        return self.transform(force_apply=True, **kwargs)
+
+
 class Sequential(BaseCompose):
     """Sequentially applies all transforms to targets.
     
@@ -5,6 +5,8 @@ import typing
 import warnings
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
+
 from .utils import DataProcessor, Params
 
 __all__ = [
@@ -15,6 +17,13 @@ __all__ = [
     "filter_keypoints",
     "KeypointsProcessor",
     "KeypointParams",
+    "angles_to_2pi_range",
+    "keypoints_to_array",
+    "keypoints_from_array",
+    "check_keypoints_array",
+    "filter_keypoints_array",
+    "convert_keypoints_array_to_dicaugment",
+    "convert_keypoints_array_from_dicaugment",
 ]
 
 keypoint_formats = {"xyz", "zyx", "xyza", "xyzs", "xyzas", "xyzsa"}
@@ -25,6 +34,11 @@ def angle_to_2pi_range(angle: float) -> float:
     return angle % two_pi
 
 
+def angles_to_2pi_range(angles: np.ndarray) -> np.ndarray:
+    """Vectorized `angle_to_2pi_range`"""
+    return np.mod(angles, 2 * math.pi)
+
+
 class KeypointParams(Params):
     """
     Parameters of keypoints
@@ -236,8 +250,11 @@ def check_keypoints(
     keypoints: Sequence[Sequence], rows: int, cols: int, slices: int
 ) -> None:
     """Check if keypoints boundaries are less than image shapes"""
-    for kp in keypoints:
-        check_keypoint(kp, rows, cols, slices)
+    if len(keypoints) and not np.all(
+        _keypoints_validity(keypoints_to_array(keypoints, 4)[0], rows, cols, slices)
+    ):
+        for kp in keypoints:
+            check_keypoint(kp, rows, cols, slices)
 
 
 def filter_keypoints(
@@ -263,18 +280,11 @@ def filter_keypoints(
     """
     if not remove_invisible:
         return keypoints
+    if not len(keypoints):
+        return []
 
-    resulting_keypoints = []
-    for kp in keypoints:
-        x, y, z = kp[:3]
-        if x < 0 or x >= cols:
-            continue
-        if y < 0 or y >= rows:
-            continue
-        if z < 0 or z >= slices:
-            continue
-        resulting_keypoints.append(kp)
-    return resulting_keypoints
+    indices = filter_keypoints_array(keypoints_to_array(keypoints, 3)[0], rows, cols, slices)[1]
+    return [keypoints[i] for i in indices]
 
 
 def convert_keypoint_to_dicaugment(
@@ -417,12 +427,27 @@ def convert_keypoints_to_dicaugment(
     Returns:
         A sequence of keypoints converted to the `dicaugment_3d` format
     """
-    return [
-        convert_keypoint_to_dicaugment(
-            kp, source_format, rows, cols, slices, check_validity, angle_in_degrees
+    if not len(keypoints):
+        return []
+    if source_format not in keypoint_formats:
+        raise ValueError(
+            "Unknown target_format {}. Supported formats are: {}".format(
+                source_format, keypoint_formats
+            )
+        )
+    array, tails = keypoints_to_array(keypoints, len(source_format))
+    try:
+        array = convert_keypoints_array_to_dicaugment(
+            array, source_format, rows, cols, slices, check_validity, angle_in_degrees
         )
-        for kp in keypoints
-    ]
+    except ValueError:
+        # report the first invalid keypoint together with its labels
+        for kp in keypoints:
+            convert_keypoint_to_dicaugment(
+                kp, source_format, rows, cols, slices, check_validity, angle_in_degrees
+            )
+        raise
+    return keypoints_from_array(array, tails)
 
 
 def convert_keypoints_from_dicaugment(
@@ -449,9 +474,173 @@ def convert_keypoints_from_dicaugment(
     Returns:
         A sequence of keypoints converted from the `dicaugment_3d` format
     """
-    return [
-        convert_keypoint_from_dicaugment(
-            kp, target_format, rows, cols, slices, check_validity, angle_in_degrees
+    if not len(keypoints):
+        return []
+    array, tails = keypoints_to_array(keypoints)
+    try:
+        array = convert_keypoints_array_from_dicaugment(
+            array, target_format, rows, cols, slices, check_validity, angle_in_degrees
         )
-        for kp in keypoints
-    ]
+    except ValueError:
+        # report the first invalid keypoint
+        for kp in keypoints:
+            convert_keypoint_from_dicaugment(
+                kp, target_format, rows, cols, slices, check_validity, angle_in_degrees
+            )
+        raise
+    return keypoints_from_array(array, tails)
+
+
+def keypoints_to_array(
+    keypoints: Sequence[Sequence], num_coords: int = 5
+) -> Tuple[np.ndarray, List[Tuple]]:
+    """
+    Splits a sequence of keypoints into an array of their coordinates and the list of their tails
+
+    Args:
+        keypoints (Sequence): A sequence of keypoint objects
+        num_coords (int): The number of leading values of each keypoint that are coordinates, e.g. 5 for
+            `(x, y, z, angle, scale)` or 3 for a keypoint in the `xyz` format. Default: 5
+
+    Returns:
+        An array of shape (N, num_coords) and a list of the N tails (e.g. labels), in the same order
+    """
+    array = np.array([kp[:num_coords] for kp in keypoints], dtype=np.float64).reshape(-1, num_coords)
+    return array, [tuple(kp[num_coords:]) for kp in keypoints]
+
+
+def keypoints_from_array(array: np.ndarray, tails: Sequence[Tuple]) -> List[Tuple]:
+    """Joins an array of keypoint coordinates with their tails. Inverse of `keypoints_to_array`"""
+    return [tuple(coords) + tuple(tail) for coords, tail in zip(array.tolist(), tails)]
+
+
+def _keypoints_validity(keypoints: np.ndarray, rows: int, cols: int, slices: int) -> np.ndarray:
+    """Returns a boolean mask of the keypoints of shape (N, 4+) that pass `check_keypoint`"""
+    angles = keypoints[:, 3]
+    return (
+        np.all((keypoints[:, :3] >= 0) & (keypoints[:, :3] < np.array([cols, rows, slices])), axis=1)
+        & (angles >= 0)
+        & (angles < 2 * math.pi)
+    )
+
+
+def check_keypoints_array(keypoints: np.ndarray, rows: int, cols: int, slices: int) -> None:
+    """
+    Checks if the coordinates of an array of keypoints of shape (N, 5) are less than image shapes and their angles
+    are in the correct range. See `check_keypoint`.
+
+    Raises:
+        ValueError: for the first keypoint that is not valid
+    """
+    invalid = np.flatnonzero(~_keypoints_validity(keypoints, rows, cols, slices))
+    if len(invalid):
+        check_keypoint(tuple(keypoints[invalid[0]].tolist()), rows, cols, slices)
+
+
+def filter_keypoints_array(
+    keypoints: np.ndarray, rows: int, cols: int, slices: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Filters out the keypoints of an array of shape (N, 5) that are no longer within the bounds of the image
+
+    Args:
+        keypoints (np.ndarray): An array of keypoints of shape (N, 5)
+        rows (int): The number of rows in the target image
+        cols (int): The number of columns in the target image
+        slices (int): The number of slices in the target image
+
+    Returns:
+        The kept keypoints and their indices in `keypoints`, to select their labels with
+    """
+    visible = np.all(
+        (keypoints[:, :3] >= 0) & (keypoints[:, :3] < np.array([cols, rows, slices])), axis=1
+    )
+    indices = np.flatnonzero(visible)
+    return keypoints[indices], indices
+
+
+def convert_keypoints_array_to_dicaugment(
+    keypoints: np.ndarray,
+    source_format: str,
+    rows: int,
+    cols: int,
+    slices: int,
+    check_validity: bool = False,
+    angle_in_degrees: bool = True,
+) -> np.ndarray:
+    """
+    Converts an array of keypoints to the `dicaugment_3d` format. See `convert_keypoint_to_dicaugment`.
+
+    Args:
+        keypoints (np.ndarray): an array of keypoints of shape (N, len(source_format))
+        source_format (str): format of keypoints. Should be 'xyz', 'zyx', 'xyza', 'xyzs', 'xyzas', 'xyzsa'.
+        rows (int): The number of rows in the target image
+        cols (int): The number of columns in the target image
+        slices (int): The number of slices in the target image
+        check_validity (bool): Whether to check if keypoint coordinates are less than image shapes. Default: False
+        angle_in_degrees (bool): Whether the angle of the keypoint is in degrees rather than radians. Default: True
+
+    Returns:
+        An array of keypoints `(x, y, z, angle, scale)` of shape (N, 5)
+    """
+    if source_format not in keypoint_formats:
+        raise ValueError(
+            "Unknown target_format {}. Supported formats are: {}".format(
+                source_format, keypoint_formats
+            )
+        )
+
+    columns = dict(zip(source_format, keypoints.T))
+    zeros = np.zeros(len(keypoints))
+    a = columns.get("a", zeros)
+    if angle_in_degrees:
+        a = np.radians(a)
+
+    keypoints = np.stack(
+        [columns["x"], columns["y"], columns["z"], angles_to_2pi_range(a), columns.get("s", zeros)], axis=1
+    )
+    if check_validity:
+        check_keypoints_array(keypoints, rows, cols, slices)
+    return keypoints
+
+
+def convert_keypoints_array_from_dicaugment(
+    keypoints: np.ndarray,
+    target_format: str,
+    rows: int,
+    cols: int,
+    slices: int,
+    check_validity: bool = False,
+    angle_in_degrees: bool = True,
+) -> np.ndarray:
+    """
+    Converts an array of keypoints from the `dicaugment_3d` format. See `convert_keypoint_from_dicaugment`.
+
+    Args:
+        keypoints (np.ndarray): an array of keypoints `(x, y, z, angle, scale)` of shape (N, 5)
+        target_format (str): format of keypoints. Should be 'xyz', 'zyx', 'xyza', 'xyzs', 'xyzas', 'xyzsa'.
+        rows (int): The number of rows in the target image
+        cols (int): The number of columns in the target image
+        slices (int): The number of slices in the target image
+        check_validity (bool): Whether to check if keypoint coordinates are less than image shapes. Default: False
+        angle_in_degrees (bool): Whether the angle of the keypoint is in degrees rather than radians. Default: True
+
+    Returns:
+        An array of keypoints of shape (N, len(target_format))
+    """
+    if target_format not in keypoint_formats:
+        raise ValueError(
+            "Unknown target_format {}. Supported formats are: {}".format(
+                target_format, keypoint_formats
+            )
+        )
+
+    x, y, z, angle, scale = keypoints[:, :5].T
+    angle = angles_to_2pi_range(angle)
+    if check_validity:
+        check_keypoints_array(np.stack([x, y, z, angle, scale], axis=1), rows, cols, slices)
+    if angle_in_degrees:
+        angle = np.degrees(angle)
+
+    columns = {"x": x, "y": y, "z": z, "a": angle, "s": scale}
+    return np.stack([columns[c] for c in target_format], axis=1)
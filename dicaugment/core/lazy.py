@@ -0,0 +1,129 @@
+from typing import Any, Callable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+__all__ = ["LazyVolume", "ShapeOnlyVolume", "PixelDataUnavailableError"]
+
+
+class LazyVolume:
+    """A volume that is read on demand, one sub-block at a time.
+
+    `Compose` accepts a `LazyVolume` (or a `np.memmap`) in place of an image, mask or masks. When the first transform
+    of the pipeline is a crop (`RandomCrop`, `CenterCrop`, `Crop` or `RandomSizedCrop`), the crop coordinates are
+    computed from the shape alone and only the cropped sub-block is read. Otherwise the whole volume is read before
+    the first transform.
+
+    Args:
+        reader (callable): a function `reader(rows, cols, slices)` that takes three `slice` objects with a step
+            of 1 and returns the corresponding `np.ndarray` of shape (H', W', D') or (H', W', D', C).
+        shape (tuple of int): the shape of the full volume, (H, W, D) or (H, W, D, C).
+        dtype (np.dtype): the data type of the volume.
+
+    Example:
+
+    .. code-block:: python
+
+        import dicaugment as dca
+        import h5py
+
+        dataset = h5py.File("scan.h5")["image"]
+        volume = dca.LazyVolume(lambda rows, cols, slices: dataset[rows, cols, slices], dataset.shape, dataset.dtype)
+
+        aug = dca.Compose([dca.RandomCrop(96, 96, 96), dca.Rotate()])
+        patch = aug(image=volume)["image"]
+    """
+
+    def __init__(
+        self,
+        reader: Callable[[slice, slice, slice], np.ndarray],
+        shape: Sequence[int],
+        dtype: Union[np.dtype, str, type],
+    ):
+        if len(shape) not in {3, 4}:
+            raise ValueError(
+                "Expected a shape of (H,W,D) or (H,W,D,C). Got: {}".format(tuple(shape))
+            )
+        self.reader = reader
+        self.shape = tuple(int(i) for i in shape)
+        self.dtype = np.dtype(dtype)
+
+    @classmethod
+    def from_array(cls, array: Any) -> "LazyVolume":
+        """Wraps an array-like object that supports slicing, such as a `np.memmap`, an `h5py` or a `zarr` dataset"""
+        return cls(lambda rows, cols, slices: array[rows, cols, slices], array.shape, array.dtype)
+
+    @property
+    def ndim(self) -> int:
+        """The number of dimensions of the volume"""
+        return len(self.shape)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __repr__(self) -> str:
+        return "LazyVolume(shape={}, dtype={})".format(self.shape, self.dtype)
+
+    def _normalize_key(self, key: Any) -> Tuple[slice, ...]:
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is Ellipsis for k in key):
+            i = key.index(Ellipsis)
+            key = key[:i] + (slice(None),) * (self.ndim - len(key) + 1) + key[i + 1 :]
+        key = key + (slice(None),) * (self.ndim - len(key))
+
+        if len(key) != self.ndim or not all(isinstance(k, slice) for k in key):
+            raise TypeError("LazyVolume only supports slicing with slices, got {}".format(key))
+
+        result = []
+        for k, n in zip(key, self.shape):
+            start, stop, step = k.indices(n)
+            if step != 1:
+                raise TypeError("LazyVolume only supports slicing with a step of 1, got {}".format(k))
+            result.append(slice(start, max(start, stop)))
+        return tuple(result)
+
+    def __getitem__(self, key: Any) -> np.ndarray:
+        """Reads the sub-block selected by `key`, a tuple of slices over (H, W, D[, C])"""
+        key = self._normalize_key(key)
+        block = np.asarray(self.reader(*key[:3]))
+        if self.ndim == 4:
+            block = block[..., key[3]]
+        return block.astype(self.dtype, copy=False)
+
+    def __array__(self, dtype: Optional[np.dtype] = None, copy: Optional[bool] = None) -> np.ndarray:
+        block = self[...]
+        return block if dtype is None else block.astype(dtype, copy=False)
+
+    def read(self) -> np.ndarray:
+        """Reads the whole volume"""
+        return self[...]
+
+
+class PixelDataUnavailableError(ValueError):
+    """Raised when the voxels of a `ShapeOnlyVolume` are read"""
+
+
+class ShapeOnlyVolume(LazyVolume):
+    """A volume of which only the shape and dtype are known, used by `ReplayCompose.dry_run`.
+
+    Transforms do not apply themselves to a `ShapeOnlyVolume`, they pass on a new one with the shape of their output
+    (see `BasicTransform.get_output_shape`). Reading its voxels raises a `PixelDataUnavailableError`.
+
+    Args:
+        shape (tuple of int): the shape of the volume, (H, W, D) or (H, W, D, C).
+        dtype (np.dtype): the data type of the volume. Default: np.float64
+    """
+
+    def __init__(self, shape: Sequence[int], dtype: Union[np.dtype, str, type] = np.float64):
+        super(ShapeOnlyVolume, self).__init__(self._read_voxels, shape, dtype)
+
+    @staticmethod
+    def _read_voxels(*args) -> np.ndarray:
+        raise PixelDataUnavailableError("The voxels of a ShapeOnlyVolume are not available")
+
+    def __repr__(self) -> str:
+        return "ShapeOnlyVolume(shape={}, dtype={})".format(self.shape, self.dtype)
+
+    def with_shape(self, shape: Sequence[int]) -> "ShapeOnlyVolume":
+        """Returns a `ShapeOnlyVolume` of spatial shape (H, W, D) with the same channels and dtype"""
+        return ShapeOnlyVolume(tuple(shape[:3]) + self.shape[3:], self.dtype)
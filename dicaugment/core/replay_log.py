@@ -0,0 +1,402 @@
+import json
+import threading
+import typing
+from copy import deepcopy
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+__all__ = ["ReplayLog"]
+
+# the types that the values of a column of each kind are converted back to
+_SCALAR_KINDS = {"bool": bool, "int": int, "float": float, "str": str}
+
+
+def _kind(value: Any) -> str:
+    """Returns the kind of a parameter value: "bool", "int", "float", "str", "tuple", "list", "ndarray" or "object" """
+    if isinstance(value, (bool, np.bool_)):
+        return "bool"
+    if isinstance(value, (int, np.integer)):
+        return "int"
+    if isinstance(value, (float, np.floating)):
+        return "float"
+    if isinstance(value, str):
+        return "str"
+    if isinstance(value, tuple):
+        return "tuple"
+    if isinstance(value, list):
+        return "list"
+    if isinstance(value, np.ndarray):
+        return "ndarray"
+    return "object"
+
+
+def _encode_column(values: Sequence[Any]) -> Tuple[str, np.ndarray]:
+    """
+    Returns the kind of the values of a parameter and the values as an array of shape (N, ...). Values that are not
+    all scalars, or all sequences of the same shape, of one kind are stored in an object array.
+    """
+    kinds = {_kind(v) for v in values}
+    if len(kinds) == 1:
+        kind = kinds.pop()
+        if kind != "object":
+            try:
+                array = np.asarray(values)
+            except ValueError:
+                # sequences of different lengths
+                array = np.empty(0, dtype=object)
+            if array.dtype.kind in "biufU" and (array.ndim == 1) == (kind in _SCALAR_KINDS):
+                return kind, array
+
+    array = np.empty(len(values), dtype=object)
+    array[:] = list(values)
+    return "object", array
+
+
+def _decode_value(value: Any, kind: str) -> Any:
+    """Converts an entry of a column back to the value `ReplayCompose` saved"""
+    if kind in _SCALAR_KINDS:
+        return _SCALAR_KINDS[kind](value)
+    if kind == "tuple":
+        return tuple(value.tolist())
+    if kind == "list":
+        return value.tolist()
+    if kind == "ndarray":
+        value = np.array(value)
+        value.flags.writeable = False
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError("Object of type {} is not JSON serializable".format(type(value).__name__))
+
+
+def _strip(node: typing.Mapping[str, Any]) -> Dict[str, Any]:
+    """Returns a serialized transform without the "id", "params" and "applied" of a replay, as saved by `json`"""
+
+    def strip(node: typing.Mapping[str, Any]) -> Dict[str, Any]:
+        result = {k: v for k, v in node.items() if k not in ("id", "params", "applied", "transforms")}
+        if "transforms" in node:
+            result["transforms"] = [strip(t) for t in node["transforms"]]
+        return result
+
+    return json.loads(json.dumps(strip(node), default=_json_default))
+
+
+def _preorder(node: typing.Mapping[str, Any]) -> Iterator[typing.Mapping[str, Any]]:
+    yield node
+    for t in node.get("transforms", []):
+        yield from _preorder(t)
+
+
+def _applied(node: typing.Mapping[str, Any], all_params: typing.Mapping[int, Any], result: List[bool]) -> bool:
+    """Appends whether each transform of the pipeline `node`, in pre-order, was applied to `result`"""
+    position = len(result)
+    result.append(False)
+    if "transforms" in node:
+        applied = [_applied(t, all_params, result) for t in node["transforms"]]
+        result[position] = any(applied)
+    else:
+        result[position] = all_params.get(node["id"]) is not None
+    return result[position]
+
+
+def _merged_dtype(
+    dtype: np.dtype, kinds: Dict[str, str], other: np.dtype, other_kinds: Dict[str, str]
+) -> Optional[Tuple[np.dtype, Dict[str, str]]]:
+    """
+    Returns the dtype and kinds of a table that holds the rows of tables of `dtype` and `other`, widening the fields
+    of a parameter with `np.result_type`, e.g. to the longest string. Returns None if a parameter is of another kind or
+    shape in each table, or if the tables store differently named parameters.
+    """
+    if kinds and other_kinds and list(kinds) != list(other_kinds):
+        return None
+    merged = dict(kinds or other_kinds)
+    fields: List[Tuple[Any, ...]] = [("applied", bool)]
+    for key, kind in merged.items():
+        if other_kinds.get(key, kind) != kind:
+            return None
+        dtypes = [d[key] for d in (dtype, other) if d.names is not None and key in d.names]
+        if len({d.shape for d in dtypes}) != 1:
+            return None
+        base = np.result_type(*[d.base for d in dtypes])
+        if base.kind not in {d.base.kind for d in dtypes}:
+            return None
+        fields.append((key, base, dtypes[0].shape))
+    return np.dtype(fields), merged
+
+
+def _copy_rows(table: np.ndarray, start: int, rows: np.ndarray) -> None:
+    """Copies the fields of the structured array `rows` into `table` from row `start` on"""
+    for name in rows.dtype.names or ():
+        table[name][start : start + len(rows)] = rows[name]
+
+
+class ReplayLog:
+    """
+    A columnar log of the parameters that `ReplayCompose` saves, to record the augmentations of many samples.
+
+    Instead of one nested dict per sample, the log keeps the serialized pipeline once and, for each transform of the
+    pipeline, a NumPy structured array with one row per sample: an "applied" field and one field per parameter.
+    `save` writes the arrays to an `.npz` file and `load` reads them back. `log[i]` returns the parameters of the i-th
+    row in the format of `ReplayCompose`, which `ReplayCompose.replay` and `CompiledReplay` accept directly.
+
+    Parameters that are scalars, strings, or tuples, lists or arrays of one shape for every sample are stored in
+    typed fields. Other parameters are stored as objects, which need `allow_pickle=True` to be loaded.
+
+    To record from several workers, each worker appends to its own log and saves it to its own file, and the logs
+    are joined with `concatenate`. Each row stores an integer `index`, by default its position in the log it was
+    appended to, and `find` returns the row of an index. `append` may be called from several threads.
+
+    Example:
+
+    .. code-block:: python
+
+        import dicaugment as dca
+
+        aug = dca.ReplayCompose([dca.RandomCrop(64, 64, 64), dca.GaussNoise()])
+        log = dca.ReplayLog()
+        for i, image in enumerate(dataset):
+            log.append(aug(image=image)["replay"], index=i)
+        log.save("replay.npz")
+
+        log = dca.ReplayLog.load("replay.npz")
+        replayed = dca.ReplayCompose.replay(log[log.find(42)], image=dataset[42])
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._template: Optional[Dict[str, Any]] = None
+        # the template of the last appended `ReplayRecord`, to check later records without comparing dicts
+        self._record_template: Any = None
+        self._pending: List[Tuple[int, List[bool], List[Any]]] = []
+        # the tables and indices are allocated with room for more rows, of which the first `_size` are in use
+        self._tables: List[np.ndarray] = []
+        self._kinds: List[Dict[str, str]] = []
+        self._indices = np.zeros(0, dtype=np.int64)
+        self._size = 0
+        self._positions: Optional[Dict[int, int]] = None
+
+    def __len__(self) -> int:
+        return self._size + len(self._pending)
+
+    @property
+    def template(self) -> Optional[Dict[str, Any]]:
+        """The serialized pipeline, without "params" and "applied" """
+        return self._template
+
+    @property
+    def indices(self) -> np.ndarray:
+        """The index of each row"""
+        self._flush()
+        return self._indices[: self._size]
+
+    @property
+    def tables(self) -> List[np.ndarray]:
+        """The structured array of each transform of the pipeline, in pre-order"""
+        self._flush()
+        return [table[: self._size] for table in self._tables]
+
+    def append(self, record: typing.Mapping[str, Any], index: Optional[int] = None) -> None:
+        """
+        Appends the parameters saved by `ReplayCompose` for a sample.
+
+        Args:
+            record (dict): the parameters found under `save_key` in the output of `ReplayCompose`
+            index (int, None): an integer identifying the sample, e.g. its index in the dataset. Default: the number
+                of rows of the log
+
+        Raises:
+            ValueError: if the record is of another pipeline than the records appended before
+        """
+        # a `ReplayRecord` that was not read yet is logged without building its nested dict
+        template = getattr(record, "_template", None)
+        if template is not None:
+            all_params = record._params  # type: ignore  # skipcq: PYL-W0212
+            params = [None if "transforms" in node else all_params.get(node["id"]) for node in _preorder(template)]
+            applied: List[bool] = []
+            _applied(template, all_params, applied)
+        else:
+            params = [node["params"] for node in _preorder(record)]
+            applied = [bool(node["applied"]) for node in _preorder(record)]
+
+        with self._lock:
+            if template is None or template is not self._record_template:
+                stripped = _strip(record if template is None else template)
+                if self._template is None:
+                    self._template = stripped
+                elif stripped != self._template:
+                    raise ValueError("The record is of another pipeline than the records of the log")
+                self._record_template = template
+            self._pending.append((len(self) if index is None else int(index), applied, params))
+
+    def _flush(self) -> None:
+        """Moves the appended records to the tables"""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            indices = np.array([p[0] for p in pending], dtype=np.int64)
+            tables = []
+            for k in range(len(pending[0][1])):
+                applied = np.array([p[1][k] for p in pending], dtype=bool)
+                tables.append(self._encode_table(applied, [p[2][k] for p in pending]))
+            self._extend(indices, tables)
+
+    @staticmethod
+    def _encode_table(applied: np.ndarray, params: Sequence[Any]) -> Tuple[np.ndarray, Dict[str, str]]:
+        """Returns the structured array of a transform and the kinds of its fields"""
+        has_params = np.array([p is not None for p in params], dtype=bool)
+        rows = [p for p in params if p is not None]
+        columns: Dict[str, Tuple[str, np.ndarray]] = {}
+        if len({tuple(p) for p in rows}) == 1:
+            for key in rows[0]:
+                columns[key] = _encode_column([p[key] for p in rows])
+        elif rows:
+            # the parameters are named differently between samples, the dicts are stored as they are
+            array = np.empty(len(rows), dtype=object)
+            array[:] = rows
+            columns["__params__"] = ("object", array)
+
+        fields = [("applied", bool)] + [(key, array.dtype, array.shape[1:]) for key, (_, array) in columns.items()]
+        table = np.zeros(len(params), dtype=fields)
+        table["applied"] = applied
+        for key, (_, array) in columns.items():
+            table[key][has_params] = array
+        return table, {key: kind for key, (kind, _) in columns.items()}
+
+    @staticmethod
+    def _decode_params(table: np.ndarray, kinds: Dict[str, str], i: int, leaf: bool) -> Optional[Dict[str, Any]]:
+        """Returns the parameters in row `i` of the structured array of a transform, None if it was not applied"""
+        row = table[i]
+        if not leaf or not row["applied"]:
+            return None
+        if "__params__" in kinds:
+            return dict(row["__params__"])
+        return {key: _decode_value(row[key], kind) for key, kind in kinds.items()}
+
+    def _extend(self, indices: np.ndarray, tables: List[Tuple[np.ndarray, Dict[str, str]]]) -> None:
+        """
+        Appends rows to the tables. The tables grow geometrically and their fields are widened in place, so appending
+        N rows costs O(N) amortized. Only the parameters of a transform that changed kind or shape are stored anew.
+        """
+        size = self._size
+        capacity = max(len(self._indices), 1)
+        while capacity < size + len(indices):
+            capacity *= 2
+        if not self._tables:
+            self._tables = [np.zeros(0, dtype=[("applied", bool)]) for _ in tables]
+            self._kinds = [{} for _ in tables]
+
+        leaves = ["transforms" not in node for node in _preorder(typing.cast(Dict[str, Any], self._template))]
+        for k, (table, kinds) in enumerate(tables):
+            old_table, old_kinds = self._tables[k], self._kinds[k]
+            merged = _merged_dtype(old_table.dtype, old_kinds, table.dtype, kinds)
+            if merged is None:
+                params = [self._decode_params(old_table, old_kinds, i, leaves[k]) for i in range(size)]
+                params += [self._decode_params(table, kinds, i, leaves[k]) for i in range(len(table))]
+                applied = np.concatenate([old_table["applied"][:size], table["applied"]])
+                table, kinds = self._encode_table(applied, params)
+                self._tables[k] = np.zeros(capacity, dtype=table.dtype)
+                _copy_rows(self._tables[k], 0, table)
+                self._kinds[k] = kinds
+                continue
+
+            dtype, self._kinds[k] = merged
+            if dtype != old_table.dtype or len(old_table) < capacity:
+                self._tables[k] = np.zeros(capacity, dtype=dtype)
+                _copy_rows(self._tables[k], 0, old_table[:size])
+            _copy_rows(self._tables[k], size, table)
+
+        if len(self._indices) < capacity:
+            self._indices = np.concatenate([self._indices[:size], np.zeros(capacity - size, dtype=np.int64)])
+        self._indices[size : size + len(indices)] = indices
+        self._size += len(indices)
+        self._positions = None
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        """Returns the parameters of row `i` in the format of `ReplayCompose`"""
+        self._flush()
+        if not -len(self) <= i < len(self):
+            raise IndexError("Row {} out of range for a ReplayLog of {} rows".format(i, len(self)))
+        i %= len(self)
+        nodes = iter(range(len(self._tables)))
+
+        def build(node: Dict[str, Any]) -> Dict[str, Any]:
+            k = next(nodes)
+            # the values are copied, so that changing a row does not change the template of the log
+            result = {key: deepcopy(value) for key, value in node.items() if key != "transforms"}
+            if "transforms" in node:
+                result["transforms"] = [build(t) for t in node["transforms"]]
+            result["params"] = self._decode_params(self._tables[k], self._kinds[k], i, "transforms" not in node)
+            result["applied"] = bool(self._tables[k]["applied"][i])
+            return result
+
+        return build(typing.cast(Dict[str, Any], self._template))
+
+    def find(self, index: int) -> int:
+        """Returns the row of the sample with the `index` given to `append`"""
+        self._flush()
+        if self._positions is None:
+            self._positions = {int(j): i for i, j in enumerate(self._indices[: self._size])}
+        if index not in self._positions:
+            raise KeyError("No row with index {}".format(index))
+        return self._positions[index]
+
+    @classmethod
+    def concatenate(cls, logs: Sequence["ReplayLog"]) -> "ReplayLog":
+        """
+        Joins the logs of several workers, in order.
+
+        Raises:
+            ValueError: if the logs are of different pipelines
+        """
+        result = cls()
+        for log in logs:
+            log._flush()  # skipcq: PYL-W0212
+            if not len(log):
+                continue
+            if result._template is None:
+                result._template = log._template  # skipcq: PYL-W0212
+            elif log._template != result._template:  # skipcq: PYL-W0212
+                raise ValueError("The logs are of different pipelines")
+            result._extend(log.indices, list(zip(log.tables, log._kinds)))  # skipcq: PYL-W0212
+        return result
+
+    def save(self, filepath: str, compressed: bool = True) -> None:
+        """
+        Saves the log to an `.npz` file.
+
+        Args:
+            filepath (str): the path of the file
+            compressed (bool): whether to compress the arrays. Default: True
+        """
+        self._flush()
+        arrays: Dict[str, Any] = {
+            "template": np.array(json.dumps(self._template)),
+            "kinds": np.array(json.dumps(self._kinds)),
+            "indices": self.indices,
+        }
+        arrays.update({"transform_{}".format(k): table for k, table in enumerate(self.tables)})
+        (np.savez_compressed if compressed else np.savez)(filepath, **arrays)
+
+    @classmethod
+    def load(cls, filepath: str, allow_pickle: bool = False) -> "ReplayLog":
+        """
+        Loads a log saved with `save`.
+
+        Args:
+            filepath (str): the path of the file
+            allow_pickle (bool): whether to load parameters stored as objects, which are unpickled. Only load the
+                object parameters of trusted files. Default: False
+        """
+        log = cls()
+        with np.load(filepath, allow_pickle=allow_pickle) as data:
+            log._template = json.loads(str(data["template"]))  # skipcq: PYL-W0212
+            log._kinds = json.loads(str(data["kinds"]))  # skipcq: PYL-W0212
+            log._indices = data["indices"]  # skipcq: PYL-W0212
+            log._size = len(log._indices)  # skipcq: PYL-W0212
+            log._tables = [data["transform_{}".format(k)] for k in range(len(log._kinds))]  # skipcq: PYL-W0212
+        return log
@@ -1,5 +1,6 @@
 from __future__ import absolute_import
 
+import itertools
 import json
 import typing
 import warnings
@@ -76,7 +77,25 @@ class SerializableMeta(ABCMeta):
         return {}
 
 
+# stamps the changes of the public attributes of serializable objects, see `Serializable.serialized_version`
+_VERSIONS = itertools.count(1)
+
+
 class Serializable(metaclass=SerializableMeta):
+    def __setattr__(self, name: str, value: Any) -> None:
+        if not name.startswith("_"):
+            super().__setattr__("_serialized_version", next(_VERSIONS))
+        super().__setattr__(name, value)
+
+    @property
+    def serialized_version(self) -> int:
+        """
+        A number that changes whenever a public attribute of the object is set, unique among all objects, used to
+        invalidate cached serialized representations. Changes made inside an attribute (e.g. appending to a list)
+        are not tracked.
+        """
+        return getattr(self, "_serialized_version", 0)
+
     @classmethod
     @abstractmethod
     def is_serializable(cls) -> bool:
@@ -273,8 +292,12 @@ def load(
 
 def register_additional_transforms() -> None:
     """
-    Register transforms that are not imported directly into the `dicaugment` module.
+    Register transforms that are not imported directly into the `dicaugment` module, and those of the submodules
+    that `dicaugment` has not imported yet.
     """
+    import dicaugment
+
+    dicaugment._import_all()  # skipcq: PYL-W0212
     try:
         # This import will result in ImportError if `torch` is not installed
         import dicaugment.pytorch
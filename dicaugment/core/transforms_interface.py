@@ -8,6 +8,7 @@ from warnings import warn
 import cv2
 import numpy as np
 
+from .lazy import PixelDataUnavailableError, ShapeOnlyVolume
 from .serialization import Serializable, get_shortest_class_fullname
 from .utils import format_args
 
@@ -87,6 +88,30 @@ def to_tuple(param, low=None, bias=None):
     return tuple(param)
 
 
+def _is_immutable(value: Any) -> bool:
+    """Returns whether a parameter can be saved without a copy: a scalar, a tuple of those or a read-only array"""
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+        return True
+    if isinstance(value, tuple):
+        return all(_is_immutable(v) for v in value)
+    if isinstance(value, np.ndarray):
+        return not value.flags.writeable
+    return False
+
+
+def _copy_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns a copy of the parameters of a transform that does not share mutable values with `params`.
+    Scalars, tuples of scalars and read-only arrays are shared, other values are deep copied.
+    """
+    return {k: v if _is_immutable(v) else deepcopy(v) for k, v in params.items()}
+
+
+def _apply_identity(img: Any, **params) -> Any:
+    """The `apply` method of targets that a transform does not change"""
+    return img
+
+
 class BasicTransform(Serializable):
     """
     Abstract Base Class for Transforms. Not intended to be instantiated.
@@ -97,6 +122,9 @@ class BasicTransform(Serializable):
 
     """
     call_backup = None
+    _dispatch_tables: Optional[
+        Tuple[int, Dict[Tuple[str, ...], Tuple[Tuple[str, Callable, Tuple[str, ...]], ...]]]
+    ] = None
     interpolation: Any
     fill_value: Any
     mask_fill_value: Any
@@ -131,11 +159,32 @@ class BasicTransform(Serializable):
             raise KeyError(
                 "You have to pass data to augmentations as named arguments, for example: aug(image=image)"
             )
+        params = self.sample_params(force_apply=force_apply, **kwargs)
+        if params is None:
+            return kwargs
+        return self.apply_with_params(params, **kwargs)
+
+    def sample_params(
+        self, force_apply: bool = False, **kwargs
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Decides whether the transform is applied and samples the parameters for its `apply` methods.
+        In replay mode the saved parameters are returned instead, and in deterministic mode the sampled
+        parameters are saved to `kwargs[save_key]`.
+
+        Args:
+            force_apply(bool): whether to always apply the transformation. Default: False
+            **kwargs: keyword arguments for augmentations (e.g, image=image, bboxes=bboxes)
+
+        Returns:
+            the parameters, or None if the transform is not applied
+        """
         if self.replay_mode:
             if self.applied_in_replay:
-                return self.apply_with_params(self.params, **kwargs)
+                # `update_params` adds to the dict, which must not change the saved parameters
+                return dict(self.params)
 
-            return kwargs
+            return None
 
         if (random.random() < self.p) or self.always_apply or force_apply:
             params = self.get_params()
@@ -147,9 +196,16 @@ class BasicTransform(Serializable):
                     self.__class__.__name__, self.targets_as_params
                 )
                 targets_as_params = {k: kwargs[k] for k in self.targets_as_params}
-                params_dependent_on_targets = self.get_params_dependent_on_targets(
-                    targets_as_params
-                )
+                try:
+                    params_dependent_on_targets = self.get_params_dependent_on_targets(
+                        targets_as_params
+                    )
+                except PixelDataUnavailableError as e:
+                    raise PixelDataUnavailableError(
+                        "{} reads the voxels of {} to sample its parameters, so it needs the pixel data".format(
+                            self.get_class_fullname(), self.targets_as_params
+                        )
+                    ) from e
                 params.update(params_dependent_on_targets)
             if self.deterministic:
                 if self.targets_as_params:
@@ -158,10 +214,10 @@ class BasicTransform(Serializable):
                         + " could work incorrectly in ReplayMode for other input data"
                         " because its' params depend on targets."
                     )
-                kwargs[self.save_key][id(self)] = deepcopy(params)
-            return self.apply_with_params(params, **kwargs)
+                kwargs[self.save_key][id(self)] = _copy_params(params)
+            return params
 
-        return kwargs
+        return None
 
     def apply_with_params(
         self, params: Dict[str, Any], **kwargs
@@ -179,16 +235,17 @@ class BasicTransform(Serializable):
         if params is None:
             return kwargs
         params = self.update_params(params, **kwargs)
-        res = {}
-        for key, arg in kwargs.items():
-            if arg is not None:
-                target_function = self._get_target_function(key)
-                target_dependencies = {
-                    k: kwargs[k] for k in self.target_dependence.get(key, [])
-                }
-                res[key] = target_function(arg, **dict(params, **target_dependencies))
-            else:
+        res: Dict[str, Any] = {}
+        for key, target_function, dependencies in self._get_dispatch_table(tuple(kwargs)):
+            arg = kwargs[key]
+            if arg is None:
                 res[key] = None
+            elif isinstance(arg, ShapeOnlyVolume):
+                res[key] = arg.with_shape(self.get_output_shape(**params))
+            elif dependencies:
+                res[key] = target_function(arg, **dict(params, **{k: kwargs[k] for k in dependencies}))
+            else:
+                res[key] = target_function(arg, **params)
         return res
 
     def set_deterministic(
@@ -227,12 +284,41 @@ class BasicTransform(Serializable):
         Returns:
             the respective `apply` method for the key
         """
-        transform_key = key
-        if key in self._additional_targets:
-            transform_key = self._additional_targets.get(key, key)
+        return self._get_dispatch_table((key,))[0][1]
 
-        target_function = self.targets.get(transform_key, lambda x, **p: x)
-        return target_function
+    def _get_dispatch_table(self, keys: Tuple[str, ...]) -> Tuple[Tuple[str, Callable, Tuple[str, ...]], ...]:
+        """
+        Returns, for each target name of `keys`, the name, the applicable `apply` method and the names of the targets
+        it depends on (see `target_dependence`). The table is built once for each tuple of target names, and rebuilt
+        when a public attribute of the transform is set or `add_targets` is called.
+
+        Args:
+            keys (tuple of str): target names (e.g. ('image', 'mask'))
+        """
+        version = self.serialized_version
+        if self._dispatch_tables is None or self._dispatch_tables[0] != version:
+            self._dispatch_tables = (version, {})
+        tables = self._dispatch_tables[1]
+        table = tables.get(keys)
+        if table is None:
+            targets = self.targets
+            target_dependence = self.target_dependence
+            table = tuple(
+                (
+                    key,
+                    targets.get(self._additional_targets.get(key, key), _apply_identity),
+                    tuple(target_dependence.get(key, ())),
+                )
+                for key in keys
+            )
+            tables[keys] = table
+        return table
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # the dispatch tables hold methods bound to this object, copies build their own
+        state.pop("_dispatch_tables", None)
+        return state
 
     def apply(self, img: np.ndarray, **params) -> np.ndarray:
         """
@@ -240,6 +326,28 @@ class BasicTransform(Serializable):
         """
         raise NotImplementedError
 
+    @property
+    def is_batchable(self) -> bool:
+        """
+        Returns whether the transform implements `apply_to_batch`, so that `Compose.batch` can apply it to
+        all the images of a batch in one call.
+        """
+        return False
+
+    def apply_to_batch(
+        self, images: np.ndarray, params: Sequence[Dict[str, Any]]
+    ) -> np.ndarray:
+        """
+        Applies the augmentation to a batch of images of shape (N,H,W,D) or (N,H,W,D,C)
+
+        Args:
+            images (np.ndarray): a batch of images
+            params (list of dict): the parameters of the `apply` method for each image of the batch
+        """
+        raise NotImplementedError(
+            "Method apply_to_batch is not implemented in class " + self.__class__.__name__
+        )
+
     def get_params(self) -> Dict:
         """Returns parameters needed for the `apply` methods"""
         return {}
@@ -278,6 +386,35 @@ class BasicTransform(Serializable):
         )
         return params
 
+    def get_output_shape(self, **params) -> Tuple[int, int, int]:
+        """
+        Returns the `(rows, cols, slices)` of the image that `apply` would return, without applying it.
+        `ReplayCompose.dry_run` uses it to follow the shape of the image through the pipeline.
+
+        Args:
+            params (dict): the parameters for the `apply` methods, including `rows`, `cols` and `slices`
+        """
+        return params["rows"], params["cols"], params["slices"]
+
+    @property
+    def is_pointwise(self) -> bool:
+        """
+        Returns whether the transform maps each voxel of the image by its value alone, so that `get_lut` can
+        describe it as a lookup table. Such transforms can be fused with their neighbours by `Compose(fuse_lut=True)`.
+        """
+        return False
+
+    def get_lut(self, dtype: np.dtype, **params) -> Optional[np.ndarray]:
+        """
+        Returns the lookup table (see `augmentations.functional.make_lut`) that `apply` maps images of `dtype`
+        through, or None if these params do not describe a lookup table.
+
+        Args:
+            dtype (np.dtype): the data type of the image, one of uint8, uint16, int16
+            params (dict): the parameters for the `apply` methods, including `rows`, `cols` and `slices`
+        """
+        return None
+
     @property
     def target_dependence(self) -> Dict:
         """An unused alternate form of the `get_parameters` and `get_params_dependent_on_targets`"""
@@ -293,6 +430,7 @@ class BasicTransform(Serializable):
             additional_targets (dict): keys - new target name, values - old target name. ex: {'image2': 'image'}
         """
         self._additional_targets = additional_targets
+        self._dispatch_tables = None
 
     @property
     def targets_as_params(self) -> List[str]:
@@ -407,37 +545,140 @@ class DualTransform(BasicTransform):
             + self.__class__.__name__
         )
 
+    def apply_to_bboxes_array(self, bboxes: np.ndarray, **params) -> np.ndarray:
+        """
+        Applies the augmentation to an array of bboxes. Transforms that implement it transform all the bboxes
+        of `apply_to_bboxes` at once; by default, `apply_to_bbox` is applied to each row.
+
+        Args:
+            bboxes (np.ndarray): internal bbox representations, an array of shape (N, 6)
+
+        Returns:
+            the augmented internal bbox representations, an array of shape (N, 6)
+        """
+        return np.array(
+            [tuple(self.apply_to_bbox(tuple(bbox), **params))[:6] for bbox in bboxes[:, :6].tolist()],
+            dtype=np.float64,
+        ).reshape(-1, 6)
+
+    @classmethod
+    def _has_array_method(cls, array_method: str, method: str) -> bool:
+        """Returns whether `array_method` is implemented further down the class hierarchy than `method`"""
+        for klass in cls.__mro__:
+            if array_method in vars(klass):
+                return klass is not DualTransform
+            if method in vars(klass):
+                return False
+        return False
+
     def apply_to_bboxes(self, bboxes: Sequence[BoxType], **params) -> List[BoxType]:
-        """Applies the augmentation to a sequence of bbox types. See `apply_to_bbox`"""
-        return [tuple(self.apply_to_bbox(tuple(bbox[:6]), **params)) + tuple(bbox[6:]) for bbox in bboxes]  # type: ignore
+        """Applies the augmentation to a sequence of bbox types. See `apply_to_bbox` and `apply_to_bboxes_array`"""
+        if not len(bboxes) or not self._has_array_method("apply_to_bboxes_array", "apply_to_bbox"):
+            return [
+                tuple(self.apply_to_bbox(tuple(bbox[:6]), **params)) + tuple(bbox[6:])  # type: ignore
+                for bbox in bboxes
+            ]
+        array = np.array([bbox[:6] for bbox in bboxes], dtype=np.float64)
+        return [
+            tuple(coords) + tuple(bbox[6:])  # type: ignore
+            for coords, bbox in zip(self.apply_to_bboxes_array(array, **params).tolist(), bboxes)
+        ]
+
+    def apply_to_keypoints_array(self, keypoints: np.ndarray, **params) -> np.ndarray:
+        """
+        Applies the augmentation to an array of keypoints. Transforms that implement it transform all the keypoints
+        of `apply_to_keypoints` at once; by default, `apply_to_keypoint` is applied to each row.
+
+        Args:
+            keypoints (np.ndarray): internal keypoint representations, an array of shape (N, 5)
+
+        Returns:
+            the augmented internal keypoint representations, an array of shape (N, 5)
+        """
+        return np.array(
+            [tuple(self.apply_to_keypoint(tuple(kp), **params))[:5] for kp in keypoints[:, :5].tolist()],
+            dtype=np.float64,
+        ).reshape(-1, 5)
 
     def apply_to_keypoints(
         self, keypoints: Sequence[KeypointType], **params
     ) -> List[KeypointType]:
-        """Applies the augmentation to a sequence of keypoint types. See `apply_to_keypoints`"""
-        return [  # type: ignore
-            self.apply_to_keypoint(tuple(keypoint[:5]), **params) + tuple(keypoint[5:])  # type: ignore
-            for keypoint in keypoints
+        """Applies the augmentation to a sequence of keypoint types. See `apply_to_keypoint` and
+        `apply_to_keypoints_array`"""
+        if not len(keypoints) or not self._has_array_method("apply_to_keypoints_array", "apply_to_keypoint"):
+            return [  # type: ignore
+                self.apply_to_keypoint(tuple(keypoint[:5]), **params) + tuple(keypoint[5:])  # type: ignore
+                for keypoint in keypoints
+            ]
+        array = np.array([keypoint[:5] for keypoint in keypoints], dtype=np.float64)
+        return [
+            tuple(coords) + tuple(keypoint[5:])  # type: ignore
+            for coords, keypoint in zip(self.apply_to_keypoints_array(array, **params).tolist(), keypoints)
         ]
 
     def apply_to_mask(self, img: np.ndarray, **params) -> np.ndarray:
         """Applies the augmentation to a mask and forces INTER_NEAREST interpolation"""
-        return self.apply(
-            img,
-            **{
-                k: INTER_NEAREST if k == "interpolation" else v
-                for k, v in params.items()
-            }
-        )
+        if "interpolation" in params:
+            params = dict(params, interpolation=INTER_NEAREST)
+        return self.apply(img, **params)
 
     def apply_to_masks(self, masks: Sequence[np.ndarray], **params) -> List[np.ndarray]:
         """Applies the augmentation to a sequence of mask types. See `apply_to_mask`"""
         return [self.apply_to_mask(mask, **params) for mask in masks]
 
+    def apply_to_mask_batch(
+        self, masks: np.ndarray, params: Sequence[Dict[str, Any]]
+    ) -> np.ndarray:
+        """Applies the augmentation to a batch of masks and forces INTER_NEAREST interpolation. See `apply_to_batch`"""
+        return self.apply_to_batch(
+            masks,
+            [
+                {k: INTER_NEAREST if k == "interpolation" else v for k, v in p.items()}
+                for p in params
+            ],
+        )
+
     def apply_to_dicom(self, dicom: DicomType, **params) -> DicomType:
         """Applies the augmentation to a dicom type"""
         return dicom
 
+    @property
+    def is_affine(self) -> bool:
+        """
+        Returns whether the effect of the transform on images and masks is fully described by `get_affine`.
+        Such transforms can be fused with their neighbours by `Compose(fuse_affine=True)`.
+        """
+        return False
+
+    def get_affine(
+        self, **params
+    ) -> Tuple[np.ndarray, Tuple[int, int, int]]:
+        """
+        Returns the homogeneous 4x4 matrix that maps output voxel coordinates `(row, col, slice, 1)` to input
+        voxel coordinates, together with the output shape.
+
+        Args:
+            params (dict): the parameters for the `apply` methods, including `rows`, `cols` and `slices`
+        """
+        raise NotImplementedError(
+            "Method get_affine is not implemented in class " + self.__class__.__name__
+        )
+
+    def get_output_shape(self, **params) -> Tuple[int, int, int]:
+        """Returns the `(rows, cols, slices)` of the output of `apply`, see `BasicTransform.get_output_shape`"""
+        if self.is_affine:
+            rows, cols, slices = self.get_affine(**params)[1]
+            return rows, cols, slices
+        return super(DualTransform, self).get_output_shape(**params)
+
+    @property
+    def is_crop(self) -> bool:
+        """
+        Returns whether `apply` only slices a region of the image whose coordinates depend on the image shape and
+        params alone. `Compose` uses such a transform to read only that region of a `LazyVolume` or `np.memmap`.
+        """
+        return False
+
 
 class ImageOnlyTransform(BasicTransform):
     """
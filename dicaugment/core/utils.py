@@ -5,6 +5,7 @@ from typing import Any, Dict, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
+from .lazy import LazyVolume
 from .serialization import Serializable
 
 
@@ -21,7 +22,7 @@ def get_shape(img: Union[np.ndarray, 'torch.tensor']) -> Tuple[int, int, int]: #
     Raises:
         RuntimeError: if image is not a numpy array or torch tensor
     """
-    if isinstance(img, np.ndarray):
+    if isinstance(img, (np.ndarray, LazyVolume)):
         if img.ndim not in {3, 4}:
             raise ValueError(
                 f"Albumenatations3D expected numpy.ndarray or torch.Tensor of shape (H,W,D) or (H,W,D,C). Got: {img.shape}"
@@ -1,76 +1,263 @@
 # Use `Any` as the return type to avoid mypy problems with Union data types,
 # because numpy can return single number and ndarray
 
+import itertools
+import os
 import random as py_random
+import threading
 from typing import Any, Optional, Sequence, Type, Union
 
 import numpy as np
 
+from .augmentations.utils import get_precision
 from .core.transforms_interface import NumType
 
 IntNumType = Union[int, np.ndarray]
 Size = Union[int, Sequence[int]]
+RandomStateType = Union[np.random.RandomState, np.random.Generator]
 
+_BACKENDS = ("legacy", "generator")
+_BACKEND = "legacy"
 
-def get_random_state() -> np.random.RandomState:
-    """Returns a RandomState object"""
-    return np.random.RandomState(py_random.randint(0, (1 << 32) - 1))
+_LOCK = threading.Lock()
+_LOCAL = threading.local()
+_SEED_SEQUENCE: Optional[np.random.SeedSequence] = None
+_THREAD_INDEX = itertools.count()
+# number of values drawn at once when sampling float32 values with a RandomState
+_BLOCK_SIZE = 1 << 16
+# bumped by `seed` and after a fork, so that every thread creates a new generator on its next draw
+_GENERATION = 0
+
+
+def set_backend(backend: str) -> None:
+    """
+    Sets the random number generator that the functions of this module draw from when no `random_state` is given.
+
+    - "legacy" (default): a new `np.random.RandomState` (MT19937) seeded from Python's `random` on every call, so
+      seeding Python's `random` (e.g. `random.seed(0)`) makes every draw reproducible.
+    - "generator": one `np.random.Generator` (PCG64) per thread, created on its first draw and seeded by `seed`.
+      It is never rebuilt, is faster to draw from, and draws float32 arrays directly (see `set_precision`).
+
+    Random fields that `ReplayCompose` saves as a seed (`GaussNoise`, `PixelDropout`) are regenerated from it with the
+    backend in use, so replay them with the backend they were recorded with.
+
+    Args:
+        backend (str): one of "legacy", "generator"
+
+    Raises:
+        ValueError: if backend is not one of "legacy", "generator"
+    """
+    global _BACKEND
+    if backend not in _BACKENDS:
+        raise ValueError("backend must be one of {}, got {}".format(_BACKENDS, backend))
+    _BACKEND = backend
+
+
+def get_backend() -> str:
+    """Returns the name of the random number generator backend. See `set_backend`"""
+    return _BACKEND
+
+
+def seed(seed: Optional[int] = None) -> None:
+    """
+    Seeds Python's `random`, which transforms draw their parameters from, and the generators of the "generator"
+    backend.
+
+    Each thread draws from its own generator, seeded with `np.random.SeedSequence(seed, spawn_key=(i,))`, where `i`
+    numbers the threads in the order of their first draw after the call. Threads therefore never share generator
+    state: the arrays drawn in a thread are reproducible whatever the other threads do, as long as the threads
+    make their first draw in the same order (e.g. a single thread, or `seed` called before starting the pool).
+    Parameters drawn from Python's `random` are shared between threads.
+
+    After a fork (e.g. a DataLoader worker), generators are seeded from fresh OS entropy, so workers never draw the
+    same values, unless `seed` is called in the worker. Use `seed_worker` as `worker_init_fn` for reproducible
+    workers.
+
+    Args:
+        seed (int, None): the seed. If None, fresh entropy is drawn from the OS.
+    """
+    global _SEED_SEQUENCE, _THREAD_INDEX, _GENERATION
+    py_random.seed(seed)
+    with _LOCK:
+        _SEED_SEQUENCE = np.random.SeedSequence(seed)
+        _THREAD_INDEX = itertools.count()
+        _GENERATION += 1
+
+
+def seed_worker(worker_id: int) -> None:  # skipcq: PYL-W0613
+    """
+    A `worker_init_fn` for `torch.utils.data.DataLoader` that seeds each worker with `torch.initial_seed()`.
+
+    The DataLoader sets it to a base seed plus the worker id, so workers draw different values, and runs that set
+    the same `torch.manual_seed` (or DataLoader `generator`) draw the same values.
+
+    Example:
+
+    .. code-block:: python
+
+        from torch.utils.data import DataLoader
+        from dicaugment import random_utils
+
+        random_utils.set_backend("generator")
+        loader = DataLoader(dataset, num_workers=8, worker_init_fn=random_utils.seed_worker)
+    """
+    import torch
+
+    seed(torch.initial_seed())
+
+
+def _reset_after_fork() -> None:
+    global _SEED_SEQUENCE, _THREAD_INDEX, _GENERATION, _LOCK
+    _LOCK = threading.Lock()
+    _SEED_SEQUENCE = None
+    _THREAD_INDEX = itertools.count()
+    _GENERATION += 1
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _get_generator() -> np.random.Generator:
+    """Returns the generator of the calling thread, creating it if needed"""
+    global _SEED_SEQUENCE
+    if getattr(_LOCAL, "generation", None) != _GENERATION:
+        with _LOCK:
+            if _SEED_SEQUENCE is None:
+                _SEED_SEQUENCE = np.random.SeedSequence()
+            sequence = np.random.SeedSequence(_SEED_SEQUENCE.entropy, spawn_key=(next(_THREAD_INDEX),))
+            _LOCAL.generator = np.random.Generator(np.random.PCG64(sequence))
+            _LOCAL.generation = _GENERATION
+    return _LOCAL.generator
+
+
+def get_seed() -> int:
+    """
+    Returns a random 32-bit seed for `get_random_state`, drawn from the generator of the calling thread with the
+    "generator" backend and from Python's `random` otherwise
+    """
+    if _BACKEND == "generator":
+        return int(_get_generator().integers(1 << 32))
+    return py_random.randint(0, (1 << 32) - 1)
+
+
+def get_random_state(seed: Optional[int] = None) -> RandomStateType:
+    """
+    Returns a RandomState object, or the generator of the calling thread with the "generator" backend.
+
+    Args:
+        seed (int, None): if not None, a new RandomState, or a new generator with the "generator" backend, seeded with
+            `seed`. Random fields are saved as such a seed and regenerated from it. Default: None
+    """
+    if _BACKEND == "generator":
+        return _get_generator() if seed is None else np.random.Generator(np.random.PCG64(seed))
+    return np.random.RandomState(get_seed() if seed is None else seed)
+
+
+def _to_precision(values: Any) -> Any:
+    """Casts an array of random floats to the precision set by `set_precision`"""
+    if isinstance(values, np.ndarray) and values.dtype == np.float64 and get_precision() != np.float64:
+        return values.astype(get_precision())
+    return values
+
+
+def _draws_float32(*params: Any) -> bool:
+    """Returns whether a generator draws an array of float32 directly, scaled by scalar `params`"""
+    return get_precision() == np.float32 and all(np.ndim(p) == 0 for p in params)
 
 
 def uniform(
     low: NumType = 0.0,
     high: NumType = 1.0,
     size: Optional[Size] = None,
-    random_state: Optional[np.random.RandomState] = None,
+    random_state: Optional[RandomStateType] = None,
 ) -> Any:
     """Draw samples from a uniform distribution."""
     if random_state is None:
         random_state = get_random_state()
-    return random_state.uniform(low, high, size)
+    if isinstance(random_state, np.random.Generator) and size is not None and _draws_float32(low, high):
+        return random_state.random(size, dtype=np.float32) * np.float32(high - low) + np.float32(low)
+    return _to_precision(random_state.uniform(low, high, size))
 
 
 def rand(
     d0: NumType,
     d1: NumType,
     *more,
-    random_state: Optional[np.random.RandomState] = None,
+    random_state: Optional[RandomStateType] = None,
     **kwargs
 ) -> Any:
     """Returns random values in a given shape."""
     if random_state is None:
         random_state = get_random_state()
-    return random_state.rand(d0, d1, *more, **kwargs)  # type: ignore
+    if isinstance(random_state, np.random.Generator):
+        return random(tuple(int(d) for d in (d0, d1, *more)), random_state=random_state)
+    return _to_precision(random_state.rand(d0, d1, *more, **kwargs))  # type: ignore
 
 
 def randn(
     d0: NumType,
     d1: NumType,
     *more,
-    random_state: Optional[np.random.RandomState] = None,
+    random_state: Optional[RandomStateType] = None,
     **kwargs
 ) -> Any:
     """Return a sample (or samples) from the "standard normal" distribution."""
     if random_state is None:
         random_state = get_random_state()
-    return random_state.randn(d0, d1, *more, **kwargs)  # type: ignore
+    if isinstance(random_state, np.random.Generator):
+        return normal(size=tuple(int(d) for d in (d0, d1, *more)), random_state=random_state)
+    return _to_precision(random_state.randn(d0, d1, *more, **kwargs))  # type: ignore
 
 
 def normal(
     loc: NumType = 0.0,
     scale: NumType = 1.0,
     size: Optional[Size] = None,
-    random_state: Optional[np.random.RandomState] = None,
+    random_state: Optional[RandomStateType] = None,
 ) -> Any:
     """Draw random samples from a normal (Gaussian) distribution"""
     if random_state is None:
         random_state = get_random_state()
-    return random_state.normal(loc, scale, size)
+    if isinstance(random_state, np.random.Generator) and size is not None and _draws_float32(loc, scale):
+        values = random_state.standard_normal(size, dtype=np.float32)
+        values *= np.float32(scale)
+        values += np.float32(loc)
+        return values
+    return _to_precision(random_state.normal(loc, scale, size))
+
+
+def standard_normal(
+    size: Optional[Size] = None,
+    dtype: Optional[Union[np.dtype, Type]] = None,
+    random_state: Optional[RandomStateType] = None,
+) -> Any:
+    """
+    Draw samples from a standard normal distribution of `dtype`, float32 or float64. By default, the precision set by
+    `set_precision`. The "generator" backend samples float32 values directly.
+    """
+    if random_state is None:
+        random_state = get_random_state()
+    float_type = np.float32 if np.dtype(get_precision() if dtype is None else dtype) == np.float32 else np.float64
+    if isinstance(random_state, np.random.Generator):
+        if size is None:
+            return random_state.standard_normal(dtype=float_type)
+        return random_state.standard_normal(size, dtype=float_type)
+    if size is None or float_type is np.float64:
+        return random_state.standard_normal(size)
+
+    # RandomState only samples float64 values, draw them in blocks to not hold a float64 copy of the result
+    values = np.empty(size, dtype=float_type)
+    flat = values.reshape(-1)
+    for i in range(0, flat.size, _BLOCK_SIZE):
+        flat[i : i + _BLOCK_SIZE] = random_state.standard_normal(len(flat[i : i + _BLOCK_SIZE]))
+    return values
 
 
 def poisson(
     lam: NumType = 1.0,
     size: Optional[Size] = None,
-    random_state: Optional[np.random.RandomState] = None,
+    random_state: Optional[RandomStateType] = None,
 ) -> Any:
     """Draw samples from a Poisson distribution."""
     if random_state is None:
@@ -80,7 +267,7 @@ def poisson(
 
 def permutation(
     x: Union[int, Sequence[float], np.ndarray],
-    random_state: Optional[np.random.RandomState] = None,
+    random_state: Optional[RandomStateType] = None,
 ) -> Any:
     """Randomly permute a sequence"""
     if random_state is None:
@@ -93,21 +280,25 @@ def randint(
     high: Optional[IntNumType] = None,
     size: Optional[Size] = None,
     dtype: Type = np.int32,
-    random_state: Optional[np.random.RandomState] = None,
+    random_state: Optional[RandomStateType] = None,
 ) -> Any:
     """Return random integers from low (inclusive) to high (exclusive)."""
     if random_state is None:
         random_state = get_random_state()
+    if isinstance(random_state, np.random.Generator):
+        return random_state.integers(low, high, size, dtype)
     return random_state.randint(low, high, size, dtype)
 
 
 def random(
-    size: Optional[NumType] = None, random_state: Optional[np.random.RandomState] = None
+    size: Optional[Size] = None, random_state: Optional[RandomStateType] = None
 ) -> Any:
     """Return random floats in the half-open interval [0.0, 1.0)"""
     if random_state is None:
         random_state = get_random_state()
-    return random_state.random(size)  # type: ignore
+    if isinstance(random_state, np.random.Generator) and size is not None and _draws_float32():
+        return random_state.random(size, dtype=np.float32)
+    return _to_precision(random_state.random(size))  # type: ignore
 
 
 def choice(
@@ -115,7 +306,7 @@ def choice(
     size: Optional[Size] = None,
     replace: bool = True,
     p: Optional[Union[Sequence[float], np.ndarray]] = None,
-    random_state: Optional[np.random.RandomState] = None,
+    random_state: Optional[RandomStateType] = None,
 ) -> Any:
     """Generates a random sample from a given 1-D array"""
     if random_state is None:
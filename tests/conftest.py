@@ -54,6 +54,24 @@ def pytest_ignore_collect(path):
     return False
 
 
+@pytest.fixture
+def float32_precision():
+    import dicaugment
+
+    dicaugment.set_precision("float32")
+    yield
+    dicaugment.set_precision("float64")
+
+
+@pytest.fixture
+def generator_backend():
+    from dicaugment import random_utils
+
+    random_utils.set_backend("generator")
+    yield
+    random_utils.set_backend("legacy")
+
+
 @pytest.fixture
 def image():
     return np.random.randint(low=0, high=256, size=(100, 100, 100), dtype=np.uint8)
@@ -1,14 +1,22 @@
+import random
+
 import numpy as np
 import pytest
 
+import dicaugment as dca
 from dicaugment import Crop, RandomCrop, RandomSizedCrop, Rotate
 from dicaugment.core.bbox_utils import (
+    bboxes_to_array,
     calculate_bbox_area_volume,
     convert_bbox_from_dicaugment,
     convert_bbox_to_dicaugment,
+    convert_bboxes_array_from_dicaugment,
+    convert_bboxes_array_to_dicaugment,
     convert_bboxes_to_dicaugment,
     denormalize_bbox,
     denormalize_bboxes,
+    filter_bboxes,
+    filter_bboxes_array,
     normalize_bbox,
     normalize_bboxes,
 )
@@ -424,3 +432,86 @@ def test_bbox_params_edges(
     )
     res = aug(image=image, bboxes=bboxes)["bboxes"]
     assert np.allclose(res, result_bboxes)
+
+
+def _random_bboxes(n, seed=0):
+    rng = np.random.RandomState(seed)
+    low = rng.uniform(-0.2, 0.8, size=(n, 3))
+    return np.concatenate([low, low + rng.uniform(0.01, 0.5, size=(n, 3))], axis=1)
+
+
+@pytest.mark.parametrize("bbox_format", ["coco_3d", "pascal_voc_3d", "yolo_3d"])
+def test_convert_bboxes_array_matches_convert_bbox(bbox_format):
+    bboxes = np.clip(_random_bboxes(50), 0.01, 0.99)
+    bboxes[:, 3:] = np.maximum(bboxes[:, 3:], bboxes[:, :3] + 0.001)
+    converted = convert_bboxes_array_from_dicaugment(bboxes, bbox_format, 40, 50, 60)
+    expected = [convert_bbox_from_dicaugment(tuple(b), bbox_format, 40, 50, 60) for b in bboxes.tolist()]
+    assert np.array_equal(converted, expected)
+
+    restored = convert_bboxes_array_to_dicaugment(converted, bbox_format, 40, 50, 60)
+    expected = [convert_bbox_to_dicaugment(tuple(b), bbox_format, 40, 50, 60) for b in converted.tolist()]
+    assert np.array_equal(restored, expected)
+
+
+def test_filter_bboxes_array_keeps_labels():
+    bboxes = [tuple(b) + ("label_{}".format(i),) for i, b in enumerate(_random_bboxes(100).tolist())]
+    filtered = filter_bboxes(bboxes, 40, 50, 60, min_area_visibility=0.5, min_width=5)
+    assert 0 < len(filtered) < len(bboxes)
+
+    array, tails = bboxes_to_array(bboxes)
+    clipped, indices = filter_bboxes_array(array, 40, 50, 60, min_area_visibility=0.5, min_width=5)
+    assert [t[0] for t in (tails[i] for i in indices)] == [b[6] for b in filtered]
+    assert np.array_equal(clipped, [b[:6] for b in filtered])
+    assert clipped.min() >= 0 and clipped.max() <= 1
+
+
+@pytest.mark.parametrize(
+    ["augmentation", "params"],
+    [
+        [dca.VerticalFlip, {}],
+        [dca.HorizontalFlip, {}],
+        [dca.SliceFlip, {}],
+        [dca.Flip, {}],
+        [dca.RandomRotate90, {}],
+        [dca.Rotate, {"limit": 45}],
+        [dca.Rotate, {"limit": 45, "rotate_method": "ellipse", "crop_to_border": True}],
+        [dca.ShiftScaleRotate, {}],
+        [dca.ShiftScaleRotate, {"rotate_method": "ellipse", "crop_to_border": True}],
+        [dca.PadIfNeeded, {"min_height": 64, "min_width": 80, "min_depth": 48}],
+        [dca.RandomCrop, {"height": 20, "width": 24, "depth": 16}],
+        [dca.CenterCrop, {"height": 20, "width": 24, "depth": 16}],
+        [dca.Crop, {"x_min": 3, "y_min": 4, "z_min": 5, "x_max": 30, "y_max": 25, "z_max": 20}],
+        [dca.RandomSizedCrop, {"min_max_height": (10, 30), "height": 16, "width": 16, "depth": 16}],
+        [dca.CropAndPad, {"px": (-4, 4)}],
+        [dca.RandomCropFromBorders, {}],
+    ],
+)
+def test_apply_to_bboxes_array_matches_apply_to_bbox(augmentation, params):
+    aug = augmentation(p=1, **params)
+    image = np.zeros((40, 50, 32), dtype=np.int16)
+    bboxes = [tuple(b) + (i,) for i, b in enumerate(_random_bboxes(20).tolist())]
+
+    for seed in range(5):
+        random.seed(seed)
+        np.random.seed(seed)
+        params = aug.get_params()
+        params = aug.update_params(params, image=image)
+        if aug.targets_as_params:
+            params.update(aug.get_params_dependent_on_targets({"image": image}))
+
+        assert aug._has_array_method("apply_to_bboxes_array", "apply_to_bbox")
+        result = aug.apply_to_bboxes(bboxes, **params)
+        expected = [tuple(aug.apply_to_bbox(b[:6], **params)) + b[6:] for b in bboxes]
+        assert [b[6:] for b in result] == [b[6:] for b in expected]
+        np.testing.assert_allclose([b[:6] for b in result], [b[:6] for b in expected], rtol=0, atol=1e-12)
+
+
+def test_apply_to_bboxes_uses_subclass_apply_to_bbox():
+    class ImageOnlyFlip(dca.HorizontalFlip):
+        def apply_to_bbox(self, bbox, **params):
+            return bbox
+
+    aug = ImageOnlyFlip(p=1)
+    bboxes = [(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, "a")]
+    assert not aug._has_array_method("apply_to_bboxes_array", "apply_to_bbox")
+    assert aug.apply_to_bboxes(bboxes, rows=10, cols=10, slices=10) == bboxes
@@ -1,13 +1,23 @@
 from __future__ import absolute_import
 
+import json
+import pickle
+import random
+import subprocess
+import sys
+import threading
 import typing
+from copy import deepcopy
 from unittest import mock
 from unittest.mock import MagicMock, Mock, call
 
 import cv2
 import numpy as np
 import pytest
+from scipy.ndimage import affine_transform, gaussian_filter
 
+import dicaugment as A
+import dicaugment.augmentations.functional as F
 from dicaugment import (
     BasicTransform,
     Blur,
@@ -30,6 +40,7 @@ from dicaugment.core.composition import (
     OneOrOther,
     # PerChannel,
     ReplayCompose,
+    ReplayRecord,
     Sequential,
     SomeOf,
 )
@@ -39,7 +50,7 @@ from dicaugment.core.transforms_interface import (
     to_tuple,
 )
 
-from .utils import get_filtered_transforms
+from .utils import get_filtered_transforms, peak_memory
 
 
 def test_one_or_other():
@@ -191,6 +202,48 @@ def test_additional_targets(image, mask):
             mocked_apply.assert_has_calls([image_call, image2_call], any_order=True)
 
 
+def test_dispatch_table_is_rebuilt_when_targets_change(image, mask):
+    aug = A.HorizontalFlip(p=1)
+    aug(image=image, mask=mask)
+    table = aug._get_dispatch_table(("image", "mask"))
+    assert aug._get_dispatch_table(("image", "mask")) is table
+    assert [function.__name__ for _, function, _ in table] == ["apply", "apply_to_mask"]
+
+    aug.add_targets({"image2": "image"})
+    result = aug(image=image, image2=mask)
+    assert np.array_equal(result["image2"], mask[:, ::-1])
+
+    aug.p = 0.5
+    assert aug._get_dispatch_table(("image", "mask")) is not table
+
+
+@pytest.mark.parametrize("copy", [deepcopy, lambda aug: pickle.loads(pickle.dumps(aug))])
+def test_dispatch_table_is_not_shared_by_copies(image, copy):
+    aug = A.HorizontalFlip(p=1)
+    aug(image=image)
+    other = copy(aug)
+    assert other._get_dispatch_table(("image",))[0][1].__self__ is other
+
+
+def test_compose_compile(image, mask):
+    aug = Compose(
+        [A.HorizontalFlip(p=1), OneOf([A.VerticalFlip(p=1)], p=1), Compose([A.SliceFlip(p=1)])],
+        bbox_params=BboxParams(format="pascal_voc_3d"),
+    )
+    assert aug.compile("image", "mask") is aug
+    assert aug._checked_processors == [aug.processors["bboxes"]]
+    for transform in (aug[0], aug[1][0], aug[2][0]):
+        assert ("image", "mask") in transform._dispatch_tables[1]
+
+    result = aug(image=image, mask=mask, bboxes=[])
+    assert np.array_equal(result["image"], image[::-1, ::-1, ::-1])
+
+    # setting a public attribute recompiles the pipeline
+    aug.processors = {}
+    aug(image=image, mask=mask)
+    assert aug._checked_processors == []
+
+
 def test_check_bboxes_with_correct_values():
     try:
         check_bboxes(
@@ -545,3 +598,638 @@ def test_compose_image_mask_equal_size(targets):
     # test after disabling shapes check
     transforms = Compose([], is_check_shapes=False)
     transforms(**targets)
+
+
+@pytest.mark.parametrize(
+    "transforms",
+    [
+        [A.HorizontalFlip(p=1), A.VerticalFlip(p=1), A.SliceFlip(p=1)],
+        [A.Flip(p=1), A.HorizontalFlip(p=1)],
+        [A.Rotate(limit=(90, 90), p=1), A.HorizontalFlip(p=1), A.VerticalFlip(p=1)],
+    ],
+)
+def test_fuse_affine_exact_for_grid_aligned_transforms(transforms):
+    image = np.random.randint(0, 256, (20, 24, 16), dtype=np.uint8)
+    mask = np.random.randint(0, 2, (20, 24, 16), dtype=np.uint8)
+    keypoints = [(5, 6, 7), (10, 3, 2)]
+
+    results = []
+    for fuse_affine in (False, True):
+        random.seed(42)
+        aug = Compose(transforms, keypoint_params=KeypointParams("xyz"), fuse_affine=fuse_affine)
+        results.append(aug(image=image, mask=mask, keypoints=keypoints))
+
+    unfused, fused = results
+    assert np.array_equal(unfused["image"], fused["image"])
+    assert np.array_equal(unfused["mask"], fused["mask"])
+    assert np.allclose(unfused["keypoints"], fused["keypoints"])
+
+
+def test_fuse_affine_resamples_once():
+    image = np.random.rand(20, 24, 16)
+    mask = np.random.randint(0, 2, (20, 24, 16), dtype=np.uint8)
+    transforms = [A.Rotate(p=1), A.RandomScale(p=1), A.HorizontalFlip(p=1), A.Resize(10, 12, 8)]
+    aug = Compose(transforms, fuse_affine=True)
+
+    with mock.patch(
+        "dicaugment.augmentations.geometric.functional.ndimage.affine_transform",
+        wraps=affine_transform,
+    ) as mocked_affine, mock.patch(
+        "dicaugment.augmentations.geometric.functional.ndimage.zoom"
+    ) as mocked_zoom:
+        data = aug(image=image, mask=mask)
+
+    assert mocked_affine.call_count == 2  # image and mask
+    assert not mocked_zoom.called
+    assert data["image"].shape == (10, 12, 8)
+    assert data["mask"].shape == (10, 12, 8)
+
+
+def test_fuse_affine_close_to_unfused():
+    image = gaussian_filter(np.random.rand(20, 24, 16), 3)
+    transforms = [A.Rotate(limit=30, p=1), A.Flip(p=1), A.RandomScale(p=1)]
+
+    results = []
+    for fuse_affine in (False, True):
+        random.seed(0)
+        results.append(Compose(transforms, fuse_affine=fuse_affine)(image=image)["image"])
+
+    unfused, fused = results
+    assert unfused.shape == fused.shape
+    # unfused pipelines resample the volume after every transform, so only interpolation error is allowed
+    assert np.abs(unfused - fused)[2:-2, 2:-2, 2:-2].max() < 0.01
+
+
+def test_fuse_affine_splits_runs_on_border_mode():
+    transforms = [
+        A.Rotate(p=1, border_mode="constant"),
+        A.Rotate(p=1, border_mode="reflect"),
+    ]
+    aug = Compose(transforms, fuse_affine=True)
+
+    with mock.patch.object(
+        Compose, "_apply_affine_run", autospec=True, side_effect=Compose._apply_affine_run
+    ) as mocked_run:
+        aug(image=np.random.rand(10, 10, 10))
+
+    assert [len(c.args[1]) for c in mocked_run.call_args_list] == [1, 1]
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.int16])
+def test_fuse_lut_matches_unfused(dtype):
+    image = np.random.randint(0, 200, (20, 24, 16)).astype(dtype)
+    mask = np.random.randint(0, 2, (20, 24, 16), dtype=np.uint8)
+    transforms = [
+        A.RandomGamma(p=1),
+        A.InvertImg(p=1),
+        A.RandomBrightnessContrast(max_brightness=150, p=1),
+        A.Posterize(num_bits=6, p=1),
+        A.HorizontalFlip(p=1),
+        A.InvertImg(p=1),
+        A.RandomBrightnessContrast(p=1),
+    ]
+
+    results = []
+    for fuse_lut in (False, True):
+        random.seed(42)
+        results.append(Compose(transforms, fuse_lut=fuse_lut)(image=image, mask=mask))
+
+    unfused, fused = results
+    assert np.array_equal(unfused["image"], fused["image"])
+    assert np.array_equal(unfused["mask"], fused["mask"])
+
+
+def test_fuse_lut_maps_image_once():
+    image = np.random.randint(0, 4000, (20, 24, 16)).astype(np.int16)
+    transforms = [A.RandomGamma(p=1), A.InvertImg(p=1), A.RandomBrightnessContrast(max_brightness=4000, p=1)]
+    aug = Compose(transforms, fuse_lut=True)
+
+    with mock.patch(
+        "dicaugment.augmentations.functional.apply_lut", wraps=F.apply_lut
+    ) as mocked_apply_lut:
+        aug(image=image)
+
+    # the other calls compose the tables
+    assert sum(c.args[0].shape == image.shape for c in mocked_apply_lut.call_args_list) == 1
+
+
+def test_compose_inplace():
+    image = np.random.rand(64, 64, 32).astype(np.float32)
+    transforms = [
+        A.Normalize(0.5, 0.2, p=1),
+        A.GaussNoise(var_limit=0.01, p=1),
+        A.RandomGamma(p=1),
+        A.RandomBrightnessContrast(p=1),
+    ]
+
+    results = []
+    for inplace in (False, True):
+        random.seed(0)
+        np.random.seed(0)
+        data, peak = peak_memory(Compose(transforms, inplace=inplace), image=image if inplace else image.copy())
+        results.append((data["image"], peak))
+
+    (expected, peak), (result, inplace_peak) = results
+    assert np.array_equal(result, expected)
+    assert np.shares_memory(result, image)
+    # the noise parameter of GaussNoise is the only volume left to allocate
+    assert inplace_peak < peak - 2 * image.nbytes
+
+
+def _recording_volume(array):
+    requests = []
+
+    def reader(rows, cols, slices):
+        requests.append((rows, cols, slices))
+        return array[rows, cols, slices]
+
+    return A.LazyVolume(reader, array.shape, array.dtype), requests
+
+
+@pytest.mark.parametrize(
+    "crop",
+    [
+        A.RandomCrop(8, 10, 6),
+        A.CenterCrop(8, 10, 6),
+        A.Crop(2, 3, 4, 12, 11, 10),
+        A.RandomSizedCrop((6, 10), 8, 8, 8),
+    ],
+)
+def test_lazy_volume_reads_only_the_crop(crop):
+    image = np.random.randint(0, 1000, (20, 24, 16)).astype(np.int16)
+    mask = (image > 500).astype(np.uint8)
+    keypoints = [(5.0, 6.0, 7.0)]
+    aug = A.Compose([crop, A.HorizontalFlip(p=0.5)], keypoint_params=A.KeypointParams("xyz"))
+
+    volume, requests = _recording_volume(image)
+    random.seed(0)
+    lazy = aug(image=volume, mask=A.LazyVolume.from_array(mask), keypoints=keypoints)
+    random.seed(0)
+    expected = aug(image=image, mask=mask, keypoints=keypoints)
+
+    assert len(requests) == 1
+    assert tuple(s.stop - s.start for s in requests[0]) != image.shape
+    assert isinstance(lazy["image"], np.ndarray)
+    assert np.array_equal(lazy["image"], expected["image"])
+    assert np.array_equal(lazy["mask"], expected["mask"])
+    assert lazy["keypoints"] == expected["keypoints"]
+
+
+def test_lazy_volume_read_whole_without_leading_crop():
+    image = np.random.randint(0, 1000, (20, 24, 16)).astype(np.int16)
+    volume, requests = _recording_volume(image)
+
+    data = A.Compose([A.HorizontalFlip(p=1), A.RandomCrop(8, 8, 8)])(image=volume)
+
+    assert requests == [(slice(0, 20), slice(0, 24), slice(0, 16))]
+    assert data["image"].shape == (8, 8, 8)
+
+
+def test_memmap_crop_first(tmp_path):
+    image = np.random.random((20, 24, 16)).astype(np.float32)
+    np.save(tmp_path / "image.npy", image)
+    volume = np.load(tmp_path / "image.npy", mmap_mode="r")
+
+    data = A.Compose([A.Crop(2, 3, 4, 12, 11, 10)])(image=volume)
+
+    assert type(data["image"]) is np.ndarray
+    assert np.array_equal(data["image"], image[3:11, 2:12, 4:10])
+
+
+def test_compose_batch_matches_per_sample_calls():
+    images = np.random.randint(0, 1000, (4, 10, 12, 8)).astype(np.int16)
+    masks = (images > 500).astype(np.uint8)
+    keypoints = [[(1.0, 2.0, 3.0)], [(4.0, 5.0, 6.0)], [], [(9.0, 1.0, 7.0)]]
+    transforms = [A.HorizontalFlip(p=1), A.InvertImg(p=1), A.Crop(1, 2, 0, 9, 8, 6), A.Normalize(mean=10, std=2)]
+    aug = A.Compose(transforms, keypoint_params=A.KeypointParams("xyz"))
+
+    result = aug.batch(images=images, masks=masks, keypoints=keypoints)
+
+    assert result["images"].shape == (4, 6, 8, 6)
+    for i in range(4):
+        expected = aug(image=images[i], mask=masks[i], keypoints=keypoints[i])
+        assert np.array_equal(result["images"][i], expected["image"])
+        assert np.array_equal(result["masks"][i], expected["mask"])
+        assert result["keypoints"][i] == expected["keypoints"]
+
+
+def test_compose_batch_draws_params_per_sample():
+    images = np.full((8, 6, 6, 6), 100, dtype=np.uint16)
+    aug = A.Compose([A.RandomBrightnessContrast(p=1), A.SliceFlip(p=0.5)])
+
+    with mock.patch.object(
+        A.RandomBrightnessContrast, "apply_to_batch", autospec=True, side_effect=lambda self, x, params: x
+    ) as apply_to_batch, mock.patch.object(A.RandomBrightnessContrast, "apply") as apply:
+        aug.batch(images=images)
+
+    apply.assert_not_called()
+    apply_to_batch.assert_called_once()
+    params = apply_to_batch.call_args[0][2]
+    assert len({p["alpha"] for p in params}) == len(images)
+    assert np.array_equal(images, np.full((8, 6, 6, 6), 100, dtype=np.uint16))
+
+
+def test_compose_batch_partial_application_keeps_input():
+    images = np.random.randint(0, 1000, (16, 6, 6, 6)).astype(np.int16)
+    random.seed(0)
+    result = A.Compose([A.VerticalFlip(p=0.5)]).batch(images=images)
+
+    flipped = [np.array_equal(r, images[i, ::-1]) and not np.array_equal(r, images[i]) for i, r in enumerate(result["images"])]
+    kept = [np.array_equal(r, images[i]) for i, r in enumerate(result["images"])]
+    assert all(f or k for f, k in zip(flipped, kept))
+    assert any(flipped) and any(kept)
+
+
+def test_compose_batch_checks_length():
+    with pytest.raises(ValueError):
+        A.Compose([A.InvertImg()]).batch(images=np.zeros((2, 4, 4, 4), dtype=np.uint8), bboxes=[[]])
+
+
+@pytest.mark.parametrize(
+    "transform",
+    [
+        A.RandomCrop(8, 10, 6, p=1),
+        A.CenterCrop(8, 10, 6, p=1),
+        A.Crop(2, 3, 4, 12, 11, 10, p=1),
+        A.RandomSizedCrop((6, 10), 8, 9, 7, p=1),
+        A.RandomCropFromBorders(p=1),
+        A.CropAndPad(px=2, keep_size=False, p=1),
+        A.PadIfNeeded(24, 30, 20, p=1),
+        A.Transpose(p=1),
+        A.RandomRotate90(axes=["xy", "yz", "xz"], p=1),
+        A.Rotate(crop_to_border=True, p=1),
+        A.ShiftScaleRotate(p=1),
+        A.RandomScale(p=1),
+        A.LongestMaxSize(30, p=1),
+        A.SmallestMaxSize(12, p=1),
+        A.Resize(9, 11, 13, p=1),
+    ],
+)
+def test_get_output_shape_matches_apply(transform):
+    image = np.random.randint(0, 1000, (20, 24, 16)).astype(np.int16)
+    for _ in range(5):
+        params = transform.sample_params(image=image)
+        params = transform.update_params(params, image=image)
+        assert tuple(transform.get_output_shape(**params)) == transform.apply(image, **params).shape
+
+
+def test_replay_compose_dry_run_matches_call():
+    image = np.random.randint(0, 1000, (20, 24, 16)).astype(np.int16)
+    bboxes = [(2, 3, 1, 15, 12, 9, "lesion")]
+    aug = ReplayCompose(
+        [
+            A.RandomCrop(16, 18, 12),
+            OneOf([A.RandomRotate90(), A.Transpose()], p=1),
+            A.RandomBrightnessContrast(),
+            A.PadIfNeeded(20, 20, 16),
+            A.BBoxSafeRandomCrop(),
+            A.RandomCropFromBorders(p=1),
+        ],
+        bbox_params=BboxParams("pascal_voc_3d"),
+    )
+
+    for seed in range(5):
+        random.seed(seed)
+        np.random.seed(seed)
+        expected = aug(image=image, bboxes=bboxes)
+        random.seed(seed)
+        np.random.seed(seed)
+        saved = aug.dry_run(image.shape, image.dtype, bboxes=bboxes)
+
+        assert saved == expected["replay"]
+        replayed = ReplayCompose.replay(saved, image=image, bboxes=bboxes)
+        assert np.array_equal(replayed["image"], expected["image"])
+        assert replayed["bboxes"] == expected["bboxes"]
+
+
+def test_replay_compose_dry_run_does_not_read_voxels():
+    with mock.patch.object(A.RandomCrop, "apply") as apply:
+        saved = ReplayCompose([A.RandomCrop(8, 8, 8), A.HorizontalFlip(p=1)]).dry_run((20, 24, 16))
+
+    apply.assert_not_called()
+    assert saved["transforms"][0]["applied"] and saved["transforms"][1]["applied"]
+
+
+class _ThresholdCrop(DualTransform):
+    @property
+    def targets_as_params(self):
+        return ["image"]
+
+    def get_params_dependent_on_targets(self, params):
+        return {"threshold": float(np.mean(params["image"]))}
+
+    def apply(self, img, threshold=0, **params):
+        return img
+
+
+def test_replay_compose_dry_run_flags_transforms_reading_voxels():
+    aug = ReplayCompose([A.HorizontalFlip(), _ThresholdCrop(p=1)])
+
+    with pytest.raises(A.PixelDataUnavailableError, match="_ThresholdCrop"):
+        aug.dry_run((20, 24, 16))
+    with pytest.raises(ValueError, match="mask"):
+        aug.dry_run((20, 24, 16), mask=np.zeros((20, 24, 16), dtype=np.uint8))
+
+
+def test_compiled_replay_restores_once():
+    image = np.random.randint(0, 1000, (20, 24, 16)).astype(np.int16)
+    mask = (image > 500).astype(np.uint8)
+    aug = ReplayCompose([A.RandomCrop(16, 18, 12), A.Rotate(p=1), A.HorizontalFlip(), A.GaussNoise(p=1)])
+    data = aug(image=image, mask=mask)
+
+    with mock.patch.object(
+        ReplayCompose, "_restore_for_replay", side_effect=ReplayCompose._restore_for_replay
+    ) as restore:
+        replay = A.CompiledReplay(data["replay"])
+        results = [replay(image=image, mask=mask) for _ in range(3)]
+
+    assert restore.call_count == 1 + len(aug.transforms)
+    for result in results:
+        assert np.array_equal(result["image"], data["image"])
+        assert np.array_equal(result["mask"], data["mask"])
+        assert "replay" not in result
+
+
+def test_replay_does_not_change_saved_params():
+    image = np.random.randint(0, 1000, (20, 24, 16)).astype(np.int16)
+    data = ReplayCompose([A.PadIfNeeded(24, 24, 24, p=1), A.RandomCrop(8, 8, 8)])(image=image)
+    saved = [dict(t["params"]) for t in data["replay"]["transforms"]]
+
+    ReplayCompose.replay(data["replay"], image=image)
+    A.CompiledReplay(data["replay"])(image=image)
+
+    assert [t["params"] for t in data["replay"]["transforms"]] == saved
+
+
+def test_replay_compose_builds_serialized_template_once():
+    image = np.random.rand(10, 12, 8).astype(np.float32)
+    aug = ReplayCompose([A.HorizontalFlip(), OneOf([A.RandomGamma(), A.InvertImg()]), A.RandomBrightnessContrast()])
+
+    with mock.patch.object(ReplayCompose, "get_dict_with_id", wraps=aug.get_dict_with_id) as get_dict_with_id:
+        records = [aug(image=image)["replay"] for _ in range(10)]
+    assert get_dict_with_id.call_count == 1
+
+    aug.lazy_records = True
+    with mock.patch.object(ReplayCompose, "get_dict_with_id", wraps=aug.get_dict_with_id) as get_dict_with_id:
+        lazy_records = [aug(image=image)["replay"] for _ in range(10)]
+    assert get_dict_with_id.call_count == 1
+
+    for record in records:
+        assert type(record) is dict
+        assert json.loads(json.dumps(record))["transforms"][0]["__class_fullname__"] == "HorizontalFlip"
+        assert record["transforms"][0]["applied"] == (record["transforms"][0]["params"] is not None)
+
+    for record in lazy_records:
+        expected = aug.get_dict_with_id()
+        aug.fill_with_params(expected, record._params)
+        aug.fill_applied(expected)
+        assert isinstance(record, ReplayRecord)
+        assert record == expected
+        assert list(record) == list(expected)
+        assert type(pickle.loads(pickle.dumps(record))) is dict
+        assert json.dumps(dict(record)) == json.dumps(expected)
+
+
+@pytest.mark.parametrize("lazy_records", [False, True])
+def test_changing_replay_record_does_not_change_template(lazy_records):
+    image = np.random.rand(10, 12, 8).astype(np.float32)
+    bboxes = [[1, 2, 1, 6, 8, 5, 0]]
+    aug = ReplayCompose([A.HorizontalFlip()], bbox_params=BboxParams("pascal_voc_3d"), lazy_records=lazy_records)
+
+    record = aug(image=image, bboxes=bboxes)["replay"]
+    record["bbox_params"]["min_volume"] = 99
+    record["additional_targets"]["image2"] = "image"
+
+    assert aug(image=image, bboxes=bboxes)["replay"]["bbox_params"]["min_volume"] == 0
+    assert aug.get_template()["bbox_params"]["min_volume"] == 0
+    assert aug.get_template()["additional_targets"] == {}
+
+
+def test_replay_compose_template_is_rebuilt_when_pipeline_changes():
+    aug = ReplayCompose([A.HorizontalFlip(), OneOf([A.RandomGamma(), A.InvertImg()])])
+    template = aug.get_template()
+    assert aug.get_template() is template
+
+    aug.transforms[1].transforms[0].gamma_limit = (90, 110)
+    assert aug.get_template()["transforms"][1]["transforms"][0]["gamma_limit"] == (90, 110)
+
+    aug.transforms.append(A.VerticalFlip())
+    assert len(aug.get_template()["transforms"]) == 3
+
+    aug.transforms[0] = A.Transpose()
+    assert aug.get_template()["transforms"][0]["__class_fullname__"] == "Transpose"
+
+
+def _record_replays(aug, images, log, start=0):
+    outputs = []
+    for i, image in enumerate(images, start):
+        data = aug(image=image)
+        outputs.append(data["image"])
+        # both records that were read and records that were not
+        log.append(dict(data["replay"]) if i % 2 else data["replay"], index=100 + i)
+    return outputs
+
+
+def test_replay_log(tmp_path):
+    images = [np.random.randint(0, 1000, (20, 24, 12)).astype(np.int16) for _ in range(20)]
+    aug = ReplayCompose(
+        [
+            A.RandomCrop(16, 16, 8),
+            OneOf([A.HorizontalFlip(), A.RandomGamma()], p=1),
+            A.GaussNoise(),
+            A.PixelDropout(drop_value=None),
+            A.Rotate(),
+        ],
+        lazy_records=True,
+    )
+    log = A.ReplayLog()
+    outputs = _record_replays(aug, images[:5], log)
+    # the parameters of transforms that were not applied yet are stored anew
+    assert len(log.tables) == 8
+    outputs += _record_replays(aug, images[5:], log, start=5)
+    log.save(str(tmp_path / "replay.npz"))
+
+    for saved in (log, A.ReplayLog.load(str(tmp_path / "replay.npz"))):
+        assert len(saved) == len(images)
+        assert all(table.dtype.names[0] == "applied" and not table.dtype.hasobject for table in saved.tables)
+        for i, image in enumerate(images):
+            replayed = ReplayCompose.replay(saved[saved.find(100 + i)], image=image)
+            assert np.array_equal(replayed["image"], outputs[i])
+            assert np.array_equal(ReplayCompose.replay(saved[i], image=image)["image"], outputs[i])
+
+
+def test_changing_replay_log_row_does_not_change_log():
+    image = np.random.rand(10, 12, 8).astype(np.float32)
+    bboxes = [[1, 2, 1, 6, 8, 5, 0]]
+    aug = ReplayCompose([A.HorizontalFlip()], bbox_params=BboxParams("pascal_voc_3d"))
+    log = A.ReplayLog()
+    log.append(aug(image=image, bboxes=bboxes)["replay"])
+
+    row = log[0]
+    row["bbox_params"]["min_volume"] = 5.0
+
+    assert log.template["bbox_params"]["min_volume"] == 0
+    log.append(aug(image=image, bboxes=bboxes)["replay"])
+    assert log[1]["bbox_params"]["min_volume"] == 0
+
+
+def test_replay_log_concatenate_workers(tmp_path):
+    image = np.random.rand(12, 12, 8).astype(np.float32)
+    aug = ReplayCompose([A.HorizontalFlip(), A.RandomGamma(), A.GaussNoise()])
+
+    logs = [A.ReplayLog() for _ in range(3)]
+    threads = [
+        threading.Thread(target=lambda log=log: [log.append(aug(image=image)["replay"]) for _ in range(10)])
+        for log in logs
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for i, log in enumerate(logs):
+        log.save(str(tmp_path / "worker_{}.npz".format(i)))
+
+    log = A.ReplayLog.concatenate([A.ReplayLog.load(str(tmp_path / "worker_{}.npz".format(i))) for i in range(3)])
+    assert len(log) == 30
+    assert log.indices.tolist() == list(range(10)) * 3
+    assert log[25] == logs[2][5]
+
+    with pytest.raises(ValueError):
+        A.ReplayLog.concatenate([log, _log_of(ReplayCompose([A.VerticalFlip()]), image)])
+
+
+def _log_of(aug, image):
+    log = A.ReplayLog()
+    log.append(aug(image=image)["replay"])
+    return log
+
+
+def test_replay_log_object_params(tmp_path):
+    lengths = iter([1, 3])
+
+    class ListParams(A.NoOp):
+        def get_params(self):
+            return {"values": list(range(next(lengths)))}
+
+    image = np.zeros((4, 4, 4), dtype=np.float32)
+    log = _log_of(ReplayCompose([ListParams(p=1)]), image)
+    log.append(ReplayCompose([ListParams(p=1)])(image=image)["replay"])
+    log.save(str(tmp_path / "replay.npz"))
+
+    with pytest.raises(ValueError):
+        A.ReplayLog.load(str(tmp_path / "replay.npz"))[0]
+    loaded = A.ReplayLog.load(str(tmp_path / "replay.npz"), allow_pickle=True)
+    assert [loaded[i]["transforms"][0]["params"] for i in range(2)] == [log[i]["transforms"][0]["params"] for i in range(2)]
+
+
+def test_replay_log_widens_fields_between_reads():
+    names = iter(["a", "abc", "abcdef", "ab", 7])
+
+    class NamedParams(A.NoOp):
+        def get_params(self):
+            return {"name": next(names)}
+
+    image = np.zeros((4, 4, 4), dtype=np.float32)
+    aug = ReplayCompose([A.HorizontalFlip(p=0.5), NamedParams(p=1)])
+    log = A.ReplayLog()
+    records = []
+    for i in range(4):
+        records.append(aug(image=image)["replay"])
+        log.append(records[-1])
+        # every read moves the appended rows to the tables
+        assert log[i] == records[-1]
+
+    assert log.tables[2].dtype["name"] == np.dtype("<U6")
+    assert all(not table.dtype.hasobject for table in log.tables)
+    assert [log[i] for i in range(4)] == records
+
+    # a parameter of another kind is stored anew
+    records.append(aug(image=image)["replay"])
+    log.append(records[-1])
+    assert [log[i] for i in range(5)] == records
+    assert log.tables[2].dtype["name"].hasobject
+
+
+def test_replay_compose_saves_immutable_params_without_copy():
+    image = np.random.randint(0, 1000, (20, 24, 16)).astype(np.int16)
+    aug = ReplayCompose([A.RandomCrop(16, 18, 12), A.GaussNoise(p=1), A.PixelDropout(p=1)])
+
+    with mock.patch("dicaugment.core.transforms_interface.deepcopy") as deepcopy:
+        data = aug(image=image)
+
+    deepcopy.assert_not_called()
+    assert np.array_equal(ReplayCompose.replay(data["replay"], image=image)["image"], data["image"])
+
+
+@pytest.mark.parametrize(
+    "transform",
+    [
+        A.GaussNoise(p=1),
+        A.GaussNoise(per_channel=False, p=1),
+        A.GaussNoise(noise_bank_shape=(24, 24, 24), p=1),
+        A.PixelDropout(dropout_prob=0.1, drop_value=None, mask_drop_value=0, p=1),
+    ],
+)
+@pytest.mark.parametrize("backend", ["legacy", "generator"])
+def test_replay_compose_saves_seeds_of_random_fields(transform, backend):
+    image = np.random.randint(0, 1000, (20, 24, 16, 2)).astype(np.int16)
+    mask = np.ones((20, 24, 16), dtype=np.uint8)
+    aug = ReplayCompose([transform])
+
+    with mock.patch.object(A.random_utils, "_BACKEND", backend):
+        data = aug(image=image, mask=mask)
+        # the replay restores new transforms, which regenerate the noise bank from its seed
+        replayed = ReplayCompose.replay(pickle.loads(pickle.dumps(data["replay"])), image=image, mask=mask)
+
+    params = data["replay"]["transforms"][0]["params"]
+    assert not any(isinstance(v, np.ndarray) and v.size > 8 for v in params.values())
+    assert len(pickle.dumps(data["replay"])) < 2000
+    assert np.array_equal(replayed["image"], data["image"])
+    assert np.array_equal(replayed["mask"], data["mask"])
+
+
+def _run_python(code):
+    return subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+
+
+def test_import_is_lazy():
+    code = "import sys, dicaugment; print(sorted(m for m in ('cv2', 'scipy', 'pydicom', 'dicaugment.core') if m in sys.modules))"
+    assert _run_python(code).strip() == "[]"
+
+
+def test_lazy_names_match_submodules():
+    import importlib
+
+    for module, names in A._EXPORTS.items():
+        submodule = importlib.import_module("dicaugment." + module)
+        if module in {"core.bbox_utils", "core.keypoints_utils"}:
+            assert set(names) <= set(submodule.__all__)
+        else:
+            assert set(names) == set(submodule.__all__)
+        for name in names:
+            # names exported by several submodules come from the last one
+            if A._LAZY_NAMES[name] == module:
+                assert getattr(A, name) is getattr(submodule, name)
+    assert A.functional is F
+    assert "Blur" in dir(A) and "Blur" in A.__all__
+    with pytest.raises(AttributeError):
+        A.NotATransform
+
+
+def test_from_dict_imports_transforms_lazily():
+    code = "import dicaugment as A; print(A.from_dict({'transform': {'__class_fullname__': 'Blur', 'p': 1}}))"
+    assert _run_python(code).startswith("Blur(")
+
+
+def test_submodules_resolve_lazily():
+    code = (
+        "import dicaugment as A; "
+        "print(A.augmentations.functional.__name__, A.augmentations.geometric.functional.__name__, "
+        "A.augmentations.transforms.__name__, A.core.composition.__name__)"
+    )
+    assert _run_python(code).split() == [
+        "dicaugment.augmentations.functional",
+        "dicaugment.augmentations.geometric.functional",
+        "dicaugment.augmentations.transforms",
+        "dicaugment.core.composition",
+    ]
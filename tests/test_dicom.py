@@ -1,5 +1,13 @@
+import json
+from unittest import mock
+
 import numpy as np
 import pytest
+from pydicom.dataset import FileDataset, FileMetaDataset
+from pydicom.uid import CTImageStorage, ExplicitVRLittleEndian, generate_uid
+
+import dicaugment.augmentations.dicom.functional as FD
+import dicaugment.augmentations.utils as utils
 
 from dicaugment import (
     RescaleSlopeIntercept,
@@ -11,6 +19,8 @@ from dicaugment import (
     Compose,
     RandomScale,
     NPSNoise,
+    read_dcm_image,
+    read_cached_dcm_image,
 )
 
 
@@ -207,3 +217,151 @@ def test_nps_noise():
 
     aug = Compose([NPSNoise(sample_tube_current=True, p=1.0)])
     out = aug(image=img, dicom=dicom)
+
+
+def test_nps_noise_float32_precision(float32_precision):
+    nps = FD._get_cartesian_nps("standard", (32, 32), 0.5, 0.5)
+
+    with mock.patch("numpy.fft.ifftn") as mocked_ifftn:
+        noise = FD._generate_NPS_noise(nps)
+
+    assert not mocked_ifftn.called
+    assert noise.dtype == np.float32
+    assert np.isclose(np.std(noise), 1, atol=1e-4)
+
+
+def _loop_nps_radial_to_cartesian(rad_nps, shape, x_step, y_step):
+    """The original per-frequency implementation of `_nps_radial_to_cartesian`"""
+    nNPS = np.zeros(shape=shape)
+    freq_row = np.fft.fftfreq(n=shape[1], d=x_step)
+    freq_col = np.fft.fftfreq(n=shape[0], d=y_step)
+    spatial_freq = rad_nps["Spatial_frequency"]
+    for i in range(shape[1]):
+        for j in range(shape[0]):
+            spatial_val = np.sqrt(freq_row[i] ** 2 + freq_col[j] ** 2)
+            idx = min(range(len(spatial_freq) - 1), key=lambda x: abs(spatial_freq[x] - spatial_val))
+            nNPS[j, i] = rad_nps["nNPS"][idx]
+    nNPS[nNPS < 0] = 0
+    return nNPS
+
+
+@pytest.mark.parametrize(
+    ["kernel", "shape", "x_step", "y_step"],
+    [
+        ("STANDARD", (32, 32), 0.5, 0.5),
+        ("bone", (24, 40), 0.7, 0.35),
+        ("b70f", (33, 17), 1.0, 0.8),
+    ],
+)
+def test_nps_radial_to_cartesian_matches_loop(kernel, shape, x_step, y_step):
+    rad_nps = FD._load_kernel(kernel)
+    expected = _loop_nps_radial_to_cartesian(rad_nps, shape, x_step, y_step)
+    assert np.array_equal(FD._nps_radial_to_cartesian(rad_nps, shape, x_step, y_step), expected)
+
+
+def test_nps_kernel_and_geometry_are_cached():
+    assert FD._load_kernel("STANDARD") is FD._load_kernel("standard")
+
+    nps = FD._get_cartesian_nps("standard", (16, 16), 0.5, 0.5)
+    assert FD._get_cartesian_nps("standard", (16, 16), 0.5, 0.5) is nps
+    assert FD._get_cartesian_nps("standard", (16, 16), 0.5, 0.6) is not nps
+    assert not nps.flags.writeable
+
+
+def _write_dcm_slice(fp, pixels, position, instance):
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = CTImageStorage
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds = FileDataset(str(fp), {}, file_meta=meta, preamble=b"\0" * 128)
+    ds.SOPClassUID = meta.MediaStorageSOPClassUID
+    ds.SOPInstanceUID = meta.MediaStorageSOPInstanceUID
+    ds.Rows, ds.Columns = pixels.shape
+    ds.BitsAllocated = 16
+    ds.BitsStored = 16
+    ds.HighBit = 15
+    ds.PixelRepresentation = 0
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.PixelSpacing = [0.5, 0.7]
+    ds.RescaleIntercept = -1024
+    ds.RescaleSlope = 1
+    ds.ConvolutionKernel = "STANDARD"
+    ds.XRayTubeCurrent = 160
+    ds.ImageOrientationPatient = [1, 0, 0, 0, 1, 0]
+    ds.ImagePositionPatient = [0, 0, position]
+    ds.InstanceNumber = instance
+    ds.PixelData = pixels.astype(np.uint16).tobytes()
+    ds.save_as(str(fp))
+
+
+@pytest.mark.parametrize("num_threads", [1, 3])
+def test_read_dcm_image_sorts_by_position(tmp_path, num_threads):
+    slices = [np.full((8, 6), i * 100, dtype=np.uint16) for i in range(5)]
+    # filenames are deliberately out of order w.r.t. the slice positions
+    for name, i in zip("ecabd", range(5)):
+        _write_dcm_slice(tmp_path / "{}.dcm".format(name), slices[i], position=-2.5 * i, instance=5 - i)
+
+    img, dicom = read_dcm_image(str(tmp_path), num_threads=num_threads)
+
+    assert img.shape == (8, 6, 5)
+    assert img.dtype == np.int16
+    assert np.array_equal(img, np.stack(slices[::-1], axis=2))
+    assert dicom == {
+        "PixelSpacing": (0.5, 0.7),
+        "RescaleIntercept": -1024.0,
+        "RescaleSlope": 1.0,
+        "ConvolutionKernel": "STANDARD",
+        "XRayTubeCurrent": 160,
+    }
+
+
+def test_read_cached_dcm_image(tmp_path):
+    src, cache_dir = tmp_path / "series", tmp_path / "cache"
+    src.mkdir()
+    slices = [np.full((8, 6), i, dtype=np.uint16) for i in range(4)]
+    for i, pixels in enumerate(slices):
+        _write_dcm_slice(src / "{}.dcm".format(i), pixels, position=i, instance=i)
+
+    expected, expected_dicom = read_dcm_image(str(src))
+    with mock.patch("dicaugment.augmentations.utils.read_dcm_image", wraps=read_dcm_image) as reader:
+        img, dicom = read_cached_dcm_image(str(src), str(cache_dir))
+        assert isinstance(img, np.memmap)
+        assert np.array_equal(img, expected)
+        assert dicom == expected_dicom
+
+        read_cached_dcm_image(str(src), str(cache_dir))
+        assert reader.call_count == 1
+
+        # replacing a slice invalidates the cache
+        _write_dcm_slice(src / "3.dcm", np.full((8, 6), 42, dtype=np.uint16), position=3, instance=3)
+        img = read_cached_dcm_image(str(src), str(cache_dir), include_header=False)
+        assert reader.call_count == 2
+        assert np.all(img[..., 3] == 42)
+
+
+def test_read_cached_dcm_image_reads_sidecar_once(tmp_path):
+    src, cache_dir = tmp_path / "series", tmp_path / "cache"
+    src.mkdir()
+    for i in range(3):
+        _write_dcm_slice(src / "{}.dcm".format(i), np.full((8, 6), i, dtype=np.uint16), position=i, instance=i)
+    expected, expected_dicom = read_dcm_image(str(src))
+
+    # a sidecar without a fingerprint is rebuilt
+    cache_dir.mkdir()
+    npy_path, json_path = utils._dcm_cache_paths(str(src), str(cache_dir))
+    np.save(npy_path, expected)
+    with open(json_path, "w") as f:
+        json.dump({}, f)
+    read_cached_dcm_image(str(src), str(cache_dir))
+
+    # another process removes the sidecar once it was validated
+    read_header = utils._read_dcm_cache_header
+    with mock.patch(
+        "dicaugment.augmentations.utils._read_dcm_cache_header",
+        side_effect=[read_header(json_path), None],
+    ):
+        img, dicom = read_cached_dcm_image(str(src), str(cache_dir))
+
+    assert np.array_equal(img, expected)
+    assert dicom == expected_dicom
@@ -1,18 +1,23 @@
 from __future__ import absolute_import
 
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
 import cv2
 import numpy as np
 import pytest
+import scipy.ndimage as ndimage
 from numpy.testing import assert_array_almost_equal_nulp
 
 import dicaugment as A
 import dicaugment.augmentations.functional as F
 import dicaugment.augmentations.geometric.functional as FGeometric
 from dicaugment.augmentations.utils import (
+    _maybe_process_by_channel,
     is_multispectral_image,
 )
 from dicaugment.core.bbox_utils import filter_bboxes
-from tests.utils import convert_3d_to_target_format
+from tests.utils import convert_3d_to_target_format, peak_memory
 
 
 @pytest.mark.parametrize("target", ["image", "mask"])
@@ -665,6 +670,55 @@ def test_scale_float_from_shift_scale_rotate(target):
     assert_array_almost_equal_nulp(scaled_img, expected)
 
 
+def _two_pass_shift_scale_rotate(img, angle, scale, dx, dy, dz, axes, interpolation, border_mode):
+    """Reference implementation that rotates and scales first, then translates in a second resampling pass"""
+    matrix, out_shape = FGeometric.get_shift_scale_rotate_affine(img.shape, angle, scale, 0, 0, 0, axes)
+    warped = ndimage.affine_transform(
+        img, matrix[:3, :3], matrix[:3, 3], out_shape, order=interpolation, mode=border_mode
+    )
+    shift = np.array([dy, dx, dz]) * np.array(out_shape)
+    return ndimage.shift(warped, shift, order=interpolation, mode=border_mode)
+
+
+@pytest.mark.parametrize("interpolation", [0, 1, 3])
+@pytest.mark.parametrize("border_mode", ["constant", "nearest", "reflect"])
+@pytest.mark.parametrize(["dx", "dy", "dz"], [(0.25, 0, 0), (0, -0.125, 0.25), (-0.5, 0.25, -0.25)])
+def test_shift_scale_rotate_single_pass_equals_two_pass_for_voxel_shifts(interpolation, border_mode, dx, dy, dz):
+    img = np.random.rand(16, 16, 8)
+    expected = _two_pass_shift_scale_rotate(img, 0, 1, dx, dy, dz, "xy", interpolation, border_mode)
+    result = FGeometric.shift_scale_rotate(
+        img, 0, 1, dx, dy, dz, "xy", interpolation=interpolation, border_mode=border_mode
+    )
+    assert np.allclose(result, expected)
+
+
+@pytest.mark.parametrize("interpolation", [1, 3])
+@pytest.mark.parametrize("axes", ["xy", "xz", "yz"])
+@pytest.mark.parametrize(
+    ["angle", "scale", "dx", "dy", "dz"],
+    [(30, 1, 0.03, -0.05, 0.02), (-15, 0.9, -0.04, 0.01, 0.03), (45, 1.1, 0.0625, 0.0625, -0.0625)],
+)
+def test_shift_scale_rotate_single_pass_close_to_two_pass(interpolation, axes, angle, scale, dx, dy, dz):
+    rows, cols, slices = np.meshgrid(np.arange(32), np.arange(32), np.arange(32), indexing="ij")
+    img = np.sin(rows / 5) + np.cos(cols / 6) + np.sin(slices / 7)
+    expected = _two_pass_shift_scale_rotate(img, angle, scale, dx, dy, dz, axes, interpolation, "nearest")
+    result = FGeometric.shift_scale_rotate(
+        img, angle, scale, dx, dy, dz, axes, interpolation=interpolation, border_mode="nearest"
+    )
+    # the two-pass version interpolates twice and extends the border of the intermediate volume,
+    # so away from the border the results only differ by interpolation error
+    assert np.abs(result - expected)[4:-4, 4:-4, 4:-4].max() < 1e-2 * np.ptp(img)
+
+
+def test_shift_scale_rotate_resamples_once(image):
+    with mock.patch.object(ndimage, "shift") as mocked_shift, mock.patch.object(
+        ndimage, "affine_transform", wraps=ndimage.affine_transform
+    ) as mocked_affine:
+        FGeometric.shift_scale_rotate(image, angle=10, scale=1.1, dx=0.1, dy=0.1, dz=0.1)
+    assert not mocked_shift.called
+    assert mocked_affine.call_count == 1
+
+
 @pytest.mark.parametrize("target", ["image", "mask"])
 def test_shift_x_from_shift_scale_rotate(target):
     img = np.array(
@@ -1609,6 +1663,46 @@ def test_equalize_checks():
         F.equalize(img, mask=mask)
     assert str(exc_info.value) == "Image must have int or uint type"
 
+
+def _loop_equalize(img, hist_range):
+    """The original dict based implementation of `F.equalize` for a single channel"""
+    lo, hi = hist_range
+    bins = np.linspace(lo, hi + 1, hi - lo + 1)
+    histogram = sum(np.histogram(x, bins=bins)[0] for x in img)
+    cumsum = (np.cumsum(histogram / np.sum(histogram)) * (hi - lo)) + lo
+    lut = {i: np.clip(round(cumsum[i - lo]), lo, hi).astype(img.dtype) for i in range(lo, hi)}
+    return np.vectorize(lambda x: lut.get(x, x))(img)
+
+
+@pytest.mark.parametrize(
+    ["dtype", "low", "high", "hist_range"],
+    [
+        ["uint8", 0, 256, None],
+        ["uint8", 0, 256, (10, 200)],
+        ["uint16", 0, 4096, None],
+        ["int16", -1024, 3072, (-1024, 3071)],
+        ["int16", -1024, 3072, (-200, 400)],
+        ["int16", -1024, 3072, None],
+    ],
+)
+def test_equalize_matches_loop_implementation(dtype, low, high, hist_range):
+    img = np.random.randint(low, high, [20, 20, 8]).astype(dtype)
+    expected = _loop_equalize(img, hist_range or (0, int(np.max(img))))
+
+    result = F.equalize(img, hist_range=hist_range)
+    assert result.dtype == img.dtype
+    assert np.array_equal(result, expected)
+
+
+def test_equalize_mask():
+    img = np.random.randint(-1024, 3072, [20, 20, 8]).astype(np.int16)
+    mask = np.zeros(img.shape, dtype=bool)
+    mask[5:15, 5:15] = True
+
+    result = F.equalize(img, hist_range=(-1024, 3071), mask=mask)
+    expected = F.equalize(img[5:15, 5:15], hist_range=(-1024, 3071))
+    assert np.array_equal(result[5:15, 5:15], expected)
+
 @pytest.mark.parametrize("dtype", ["float32", "uint8"])
 def test_downscale_ones(dtype):
     img = np.ones((100, 100, 10), dtype=dtype)
@@ -1631,3 +1725,323 @@ def test_maybe_process_by_channel():
         before = image[:, :, :i]
         after = FGeometric.rotate(before, angle=0, axes="xy")
         assert before.shape == after.shape
+
+
+@pytest.mark.parametrize(
+    ["func", "kwargs"],
+    [
+        [FGeometric.rotate, {"angle": 30, "axes": "xy"}],
+        [FGeometric.shift_scale_rotate, {"angle": 30, "scale": 1.1, "dx": 0.1, "dy": 0, "dz": -0.1}],
+        [FGeometric.resize, {"height": 10, "width": 14, "depth": 6}],
+        [FGeometric.scale, {"scale": 0.5}],
+        [A.median_blur, {"ksize": 3}],
+        [A.gaussian_blur, {"ksize": 3}],
+        [A.blur, {"ksize": 3}],
+        [F.convolve, {"kernel": np.ones((3, 3, 3)) / 27}],
+    ],
+)
+@pytest.mark.parametrize("num_channels", [2, 5])
+def test_maybe_process_by_channel_threaded(func, kwargs, num_channels):
+    image = np.random.randint(0, 256, (16, 20, 12, num_channels), np.uint8)
+    serial = func(image, num_threads=1, **kwargs)
+    threaded = func(image, num_threads=4, **kwargs)
+    assert threaded.dtype == serial.dtype
+    assert np.array_equal(serial, threaded)
+
+
+@pytest.mark.parametrize("num_threads", [1, 3])
+def test_maybe_process_by_channel_writes_into_output(num_threads):
+    image = np.random.rand(16, 20, 12, 3).astype(np.float32)
+    zoom = mock.Mock(wraps=ndimage.zoom)
+    result = _maybe_process_by_channel(zoom, num_threads=num_threads, channel_shape=(8, 10, 6), zoom=0.5)(image)
+    assert result.shape == (8, 10, 6, 3)
+    assert result.dtype == np.float32
+    assert all(isinstance(call.kwargs["output"], np.ndarray) for call in zoom.call_args_list)
+    for i in range(image.shape[-1]):
+        assert np.array_equal(result[..., i], ndimage.zoom(image[..., i], 0.5))
+
+
+def test_maybe_process_by_channel_global_num_threads():
+    image = np.random.rand(16, 16, 8, 4)
+    expected = FGeometric.rotate(image, angle=10, axes="xy")
+    assert A.get_num_threads() == 1
+    try:
+        A.set_num_threads(3)
+        assert A.get_num_threads() == 3
+        with mock.patch("dicaugment.augmentations.utils.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as executor:
+            result = FGeometric.rotate(image, angle=10, axes="xy")
+        executor.assert_called_once_with(max_workers=3)
+        assert np.array_equal(result, expected)
+    finally:
+        A.set_num_threads(1)
+
+    with pytest.raises(ValueError):
+        A.set_num_threads(0)
+
+
+@pytest.mark.parametrize(
+    ["func", "kwargs"],
+    [
+        [A.median_blur, {"ksize": 5}],
+        [A.median_blur, {"ksize": 3, "by_slice": True}],
+        [A.gaussian_blur, {"ksize": 7}],
+        [A.gaussian_blur, {"ksize": 0, "sigma": 1.5}],
+        [A.blur, {"ksize": 3}],
+        [A.blur, {"ksize": 4}],
+        [A.blur, {"ksize": 5}],
+        [A.blur, {"ksize": 7}],
+        [F.convolve, {"kernel": np.random.rand(3, 5, 4)}],
+    ],
+)
+@pytest.mark.parametrize("mode", ["constant", "reflect", "nearest", "mirror", "wrap"])
+@pytest.mark.parametrize("shape", [(16, 12, 29), (16, 12, 29, 3)])
+@pytest.mark.parametrize("dtype", [np.uint8, np.float32, np.float64])
+def test_slab_filtering_bit_identical(func, kwargs, mode, shape, dtype):
+    image = np.random.randint(0, 256, shape).astype(dtype)
+    if dtype != np.uint8:
+        image /= 255
+    expected = func(image, mode=mode, num_threads=1, **kwargs)
+    result = func(image, mode=mode, num_threads=4, **kwargs)
+    assert result.dtype == expected.dtype
+    assert np.array_equal(result, expected)
+
+
+def test_slab_filtering_splits_depth():
+    image = np.random.rand(8, 8, 40)
+    with mock.patch.object(ndimage, "median_filter", wraps=ndimage.median_filter) as mocked_filter:
+        A.median_blur(image, ksize=5, num_threads=4)
+    # four slabs, each extended by the kernel radius on the inner sides
+    depths = sorted(c.args[0].shape[2] for c in mocked_filter.call_args_list)
+    assert depths == [12, 12, 14, 14]
+
+
+@pytest.mark.parametrize("ksize", [3, 4, 5, 7])
+@pytest.mark.parametrize("by_slice", [False, True])
+@pytest.mark.parametrize("mode", ["constant", "reflect", "nearest", "mirror", "wrap"])
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.float32, np.float64])
+def test_blur_matches_dense_mean_kernel(ksize, by_slice, mode, dtype):
+    image = np.random.randint(0, 256, (12, 14, 10, 2)).astype(dtype)
+    if dtype == np.float32:
+        image /= 255
+    kernel = np.ones((ksize, ksize, 1) if by_slice else (ksize,) * 3)
+    kernel /= kernel.sum()
+
+    expected = F.convolve(image.astype(np.float64), kernel, mode=mode, cval=0.1)
+    result = A.blur(image, ksize, by_slice=by_slice, mode=mode, cval=0.1)
+
+    assert result.dtype == image.dtype
+    if np.issubdtype(dtype, np.integer):
+        # both truncate when casting back, so only voxels on a rounding boundary may differ by one
+        assert np.abs(result.astype(np.int64) - expected.astype(dtype).astype(np.int64)).max() <= 1
+    else:
+        assert np.allclose(result, expected, atol=1e-5)
+
+
+@pytest.mark.parametrize("ksize", [3, 4, 5, 7])
+@pytest.mark.parametrize("by_slice", [False, True])
+@pytest.mark.parametrize("mode", ["constant", "reflect", "nearest", "mirror", "wrap"])
+@pytest.mark.parametrize(["dtype", "low", "high"], [[np.uint8, 0, 256], [np.uint16, 0, 65536], [np.int16, -1024, 3072]])
+def test_blur_integer_matches_dense_kernel_exactly(ksize, by_slice, mode, dtype, low, high):
+    image = np.random.randint(low, high, (24, 28, 12, 2)).astype(dtype)
+    kernel = np.ones((ksize, ksize, 1) if by_slice else (ksize,) * 3, dtype=np.int64)
+
+    # the exact sums of each neighbourhood, truncated after a single division
+    sums = np.stack(
+        [ndimage.convolve(image[..., i].astype(np.int64), kernel, mode=mode, cval=3) for i in range(2)], axis=-1
+    )
+    expected = np.trunc(sums / kernel.size).astype(dtype)
+    result = A.blur(image, ksize, by_slice=by_slice, mode=mode, cval=3)
+
+    assert result.dtype == image.dtype
+    assert np.array_equal(result, expected)
+
+
+def test_blur_is_separable():
+    image = np.random.rand(10, 10, 10)
+    with mock.patch.object(ndimage, "correlate1d", wraps=ndimage.correlate1d) as mocked_filter, mock.patch.object(
+        ndimage, "convolve"
+    ) as mocked_convolve:
+        A.blur(image, 5)
+        assert mocked_filter.call_count == 3
+        A.blur(image, 5, by_slice=True)
+        assert mocked_filter.call_count == 5
+    assert not mocked_convolve.called
+
+
+@pytest.mark.parametrize(
+    ["func", "reference"],
+    [
+        [lambda img: F.gamma_transform(img, 0.8), lambda img: F._gamma_transform(img, 0.8)],
+        [F.invert, F._invert],
+        [
+            lambda img: F.brightness_contrast_adjust(img, 1.3, 0.1, 200),
+            lambda img: F._brightness_contrast_adjust(img, 1.3, 0.1, 200),
+        ],
+        [
+            lambda img: F.brightness_contrast_adjust(img, 0.7, -0.2),
+            lambda img: F._brightness_contrast_adjust(img, 0.7, -0.2),
+        ],
+    ],
+)
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.int16])
+def test_lut_matches_pointwise_computation(func, reference, dtype):
+    info = np.iinfo(dtype)
+    img = np.random.randint(max(info.min, -1000), min(info.max, 3000) + 1, (64, 64, 20)).astype(dtype)
+
+    with mock.patch("dicaugment.augmentations.functional.apply_lut", wraps=F.apply_lut) as mocked_apply_lut:
+        result = func(img)
+
+    expected = reference(img)
+    assert mocked_apply_lut.called
+    assert result.dtype == expected.dtype
+    assert np.array_equal(result, expected)
+
+
+@pytest.mark.parametrize("dtype", [np.uint16, np.int16])
+def test_multiply_lut_matches_pointwise_computation(dtype):
+    img = np.random.randint(-1000, 3000, (64, 64, 20)).astype(dtype)
+    multiplier = np.array([1.5])
+
+    assert np.array_equal(F.multiply(img, multiplier), F._multiply_non_uint8(img, multiplier))
+
+
+@pytest.mark.filterwarnings("error")
+def test_gamma_lut_of_non_negative_int16_image_does_not_warn():
+    img = np.random.randint(0, 3000, (64, 64, 20)).astype(np.int16)
+
+    result = A.RandomGamma(p=1)(image=img)["image"]
+
+    assert result.dtype == np.dtype("int16")
+    assert np.array_equal(F.gamma_transform(img, 0.8), F._gamma_transform(img, 0.8))
+
+
+def test_lut_not_used_for_small_and_float_images():
+    with mock.patch("dicaugment.augmentations.functional.apply_lut") as mocked_apply_lut:
+        F.invert(np.random.randint(0, 100, (10, 10, 10), dtype=np.int16))
+        F.gamma_transform(np.random.rand(64, 64, 20).astype(np.float32), 0.8)
+
+    assert not mocked_apply_lut.called
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.int16])
+def test_compose_luts(dtype):
+    img = np.random.randint(0, 200, (10, 10, 10)).astype(dtype)
+    first = F.make_lut(dtype, F._gamma_transform, 1.2)
+    second = F.make_lut(dtype, F._invert)
+
+    lut = F.compose_luts(first, second)
+
+    assert lut.dtype == np.dtype(dtype)
+    assert np.array_equal(F.apply_lut(img, lut), F._invert(F._gamma_transform(img, 1.2)))
+
+
+def test_make_lut_rejects_unsupported_dtype():
+    assert not F.supports_lut(np.float32)
+    with pytest.raises(TypeError):
+        F.make_lut(np.int32, F._invert)
+
+
+def test_compose_luts_rejects_mismatched_tables():
+    with pytest.raises(ValueError):
+        F.compose_luts(F.make_lut(np.uint8, F._invert), F.make_lut(np.uint16, F._invert))
+
+
+@pytest.mark.parametrize(
+    ["func", "volumes", "inplace_volumes"],
+    [
+        [lambda img: F.normalize(img, 0.5, 0.2), 1, 0],
+        [lambda img: F.gauss_noise(img, np.full(img.shape, 0.1, dtype=np.float32)), 2, 1],
+        [lambda img: F.to_float(img, 0, 2), 1, 0],
+        [lambda img: F.from_float(img, "float32"), 1, 0],
+        [lambda img: F.add_weighted(img, 0.3, img[::-1], 0.7), 2, 1],
+        [lambda img: F.unsharp_mask(img, 5), 3, 3],
+        [lambda img: F.brightness_contrast_adjust(img, 1.2, 0.1), 1, 0],
+    ],
+)
+def test_inplace_mode_peak_memory(func, volumes, inplace_volumes):
+    # peak memory regression test: the number of image sized arrays allocated at once, with some slack for
+    # the buffers of numpy
+    image = np.random.rand(64, 64, 32).astype(np.float32)
+
+    expected, peak = peak_memory(func, image.copy())
+    with A.inplace_mode():
+        result, inplace_peak = peak_memory(func, image)
+
+    assert np.array_equal(result, expected)
+    assert np.shares_memory(result, image)
+    assert peak <= (volumes + 0.25) * image.nbytes
+    assert inplace_peak <= (inplace_volumes + 0.25) * image.nbytes
+
+
+def test_inplace_mode_writes_clipped_result_into_integer_image():
+    image = np.random.randint(0, 1000, (64, 64, 32)).astype(np.int16)
+    gauss = np.random.normal(0, 100, image.shape)
+    expected = F.gauss_noise(image, gauss)
+
+    with A.inplace_mode():
+        result = F.gauss_noise(image, gauss)
+
+    assert result is image
+    assert np.array_equal(result, expected)
+
+
+def test_out_argument():
+    image = np.random.rand(10, 10, 10).astype(np.float32)
+    out = np.empty_like(image)
+
+    assert F.normalize(image, 0.5, 0.2, out=out) is out
+    assert np.array_equal(out, F.normalize(image, 0.5, 0.2))
+
+    out = np.empty(image.shape, dtype=np.uint8)
+    assert F.from_float(image, "uint8", out=out) is out
+    assert np.array_equal(out, F.from_float(image, "uint8"))
+
+
+def test_inplace_mode_is_restored():
+    assert not A.is_inplace()
+    with A.inplace_mode():
+        assert A.is_inplace()
+        with A.inplace_mode(False):
+            assert not A.is_inplace()
+        assert A.is_inplace()
+    assert not A.is_inplace()
+
+
+def test_float32_precision_keeps_intermediates_in_float32(float32_precision):
+    images = np.random.randint(0, 1000, (4, 32, 32, 16)).astype(np.int16)
+    gamma = np.full((4, 1, 1, 1), 0.9)
+
+    result, peak = peak_memory(F.gamma_transform, images, gamma)
+
+    assert result.dtype == np.int16
+    # the float32 power of the int16 images and the int16 result
+    assert peak <= 3.25 * images.nbytes
+
+
+@pytest.mark.parametrize("dtype", [np.uint16, np.float32])
+@pytest.mark.parametrize("inplace", [False, True])
+def test_gauss_noise_scale_and_loc(dtype, inplace):
+    image = np.random.randint(0, 1000, (40, 30, 20)).astype(dtype)
+    gauss = np.random.standard_normal((40, 30, 20)).astype(np.float32)
+    expected = F.gauss_noise(image, gauss * np.float32(30.0) + np.float32(5.0))
+
+    with A.inplace_mode(inplace):
+        result = F.gauss_noise(image, gauss, scale=30.0, loc=5.0)
+
+    assert result.dtype == dtype
+    np.testing.assert_allclose(result, expected, atol=1e-3)
+
+
+def test_float32_precision_gauss_noise(float32_precision):
+    image = np.random.rand(32, 32, 16).astype(np.float32)
+    aug = A.GaussNoise(var_limit=0.01, p=1)
+
+    gauss = aug.update_params(aug.get_params_dependent_on_targets({"image": image}), image=image)["gauss"]
+
+    assert gauss.dtype == np.float32
+    assert F.gauss_noise(image, gauss).dtype == np.float32
+
+
+def test_set_precision_rejects_unknown_precision():
+    with pytest.raises(ValueError):
+        A.set_precision("float16")
@@ -1,4 +1,5 @@
 import math
+import random
 
 import numpy as np
 import pytest
@@ -11,6 +12,10 @@ from dicaugment.core.keypoints_utils import (
     convert_keypoint_to_dicaugment,
     convert_keypoints_from_dicaugment,
     convert_keypoints_to_dicaugment,
+    convert_keypoints_array_from_dicaugment,
+    convert_keypoints_array_to_dicaugment,
+    filter_keypoints,
+    keypoints_to_array,
 )
 
 
@@ -452,3 +457,102 @@ def test_coarse_dropout_remove_keypoints(keypoints, expected_keypoints, holes):
     result_keypoints = t.apply_to_keypoints(keypoints, holes)
 
     assert set(result_keypoints) == set(expected_keypoints)
+
+
+def _random_keypoints(n, shape=(40, 50, 32), seed=0):
+    rng = np.random.RandomState(seed)
+    rows, cols, slices = shape
+    return np.stack(
+        [
+            rng.uniform(0, cols, n),
+            rng.uniform(0, rows, n),
+            rng.uniform(0, slices, n),
+            rng.uniform(0, 2 * math.pi, n),
+            rng.uniform(0.5, 2, n),
+        ],
+        axis=1,
+    )
+
+
+@pytest.mark.parametrize("keypoint_format", ["xyz", "zyx", "xyza", "xyzs", "xyzas", "xyzsa"])
+@pytest.mark.parametrize("angle_in_degrees", [True, False])
+def test_convert_keypoints_array_matches_convert_keypoint(keypoint_format, angle_in_degrees):
+    keypoints = _random_keypoints(50)
+    converted = convert_keypoints_array_from_dicaugment(
+        keypoints, keypoint_format, 40, 50, 32, check_validity=True, angle_in_degrees=angle_in_degrees
+    )
+    expected = [
+        convert_keypoint_from_dicaugment(kp, keypoint_format, 40, 50, 32, True, angle_in_degrees)
+        for kp in keypoints.tolist()
+    ]
+    assert np.array_equal(converted, expected)
+
+    restored = convert_keypoints_array_to_dicaugment(
+        converted, keypoint_format, 40, 50, 32, check_validity=True, angle_in_degrees=angle_in_degrees
+    )
+    expected = [
+        convert_keypoint_to_dicaugment(kp, keypoint_format, 40, 50, 32, True, angle_in_degrees)
+        for kp in converted.tolist()
+    ]
+    assert np.array_equal(restored, expected)
+
+
+def test_convert_keypoints_reports_invalid_keypoint_with_labels():
+    keypoints = [(1, 2, 3, "a"), (60, 2, 3, "b")]
+    with pytest.raises(ValueError, match="Expected x for keypoint \\(60, 2, 3, 0.0, 0.0, 'b'\\)"):
+        convert_keypoints_to_dicaugment(keypoints, "xyz", 40, 50, 32, check_validity=True)
+
+
+def test_filter_keypoints_keeps_labels():
+    keypoints = [tuple(kp) + (i,) for i, kp in enumerate((_random_keypoints(100) * 1.2 - 3).tolist())]
+    filtered = filter_keypoints(keypoints, 40, 50, 32, remove_invisible=True)
+    expected = [kp for kp in keypoints if 0 <= kp[0] < 50 and 0 <= kp[1] < 40 and 0 <= kp[2] < 32]
+    assert 0 < len(filtered) < len(keypoints)
+    assert filtered == expected
+
+
+@pytest.mark.parametrize(
+    ["augmentation", "params"],
+    [
+        [A.VerticalFlip, {}],
+        [A.HorizontalFlip, {}],
+        [A.SliceFlip, {}],
+        [A.Flip, {}],
+        [A.Transpose, {}],
+        [A.RandomRotate90, {}],
+        [A.Rotate, {"limit": 45}],
+        [A.Rotate, {"limit": 45, "crop_to_border": True}],
+        [A.ShiftScaleRotate, {}],
+        [A.ShiftScaleRotate, {"crop_to_border": True}],
+        [A.PadIfNeeded, {"min_height": 64, "min_width": 80, "min_depth": 48}],
+        [A.RandomScale, {}],
+        [A.LongestMaxSize, {"max_size": 64}],
+        [A.SmallestMaxSize, {"max_size": 64}],
+        [A.Resize, {"height": 20, "width": 30, "depth": 40}],
+        [A.RandomCrop, {"height": 20, "width": 24, "depth": 16}],
+        [A.CenterCrop, {"height": 20, "width": 24, "depth": 16}],
+        [A.Crop, {"x_min": 3, "y_min": 4, "z_min": 5, "x_max": 30, "y_max": 25, "z_max": 20}],
+        [A.RandomSizedCrop, {"min_max_height": (10, 30), "height": 16, "width": 16, "depth": 16}],
+        [A.CropAndPad, {"px": (-4, 4)}],
+        [A.CropAndPad, {"px": (-4, 4), "keep_size": False}],
+        [A.RandomCropFromBorders, {}],
+    ],
+)
+def test_apply_to_keypoints_array_matches_apply_to_keypoint(augmentation, params):
+    aug = augmentation(p=1, **params)
+    image = np.zeros((40, 50, 32), dtype=np.int16)
+    keypoints = [tuple(kp) + ("label",) for kp in _random_keypoints(20).tolist()]
+
+    for seed in range(5):
+        random.seed(seed)
+        np.random.seed(seed)
+        params = aug.get_params()
+        params = aug.update_params(params, image=image)
+        if aug.targets_as_params:
+            params.update(aug.get_params_dependent_on_targets({"image": image}))
+
+        assert aug._has_array_method("apply_to_keypoints_array", "apply_to_keypoint")
+        result = aug.apply_to_keypoints(keypoints, **params)
+        expected = [tuple(aug.apply_to_keypoint(kp[:5], **params)) + kp[5:] for kp in keypoints]
+        assert [kp[5:] for kp in result] == [kp[5:] for kp in expected]
+        np.testing.assert_allclose([kp[:5] for kp in result], [kp[:5] for kp in expected], rtol=0, atol=1e-9)
@@ -1,4 +1,7 @@
+import multiprocessing
+import os
 import random
+import threading
 
 import numpy as np
 import pytest
@@ -37,3 +40,94 @@ def test_multiprocessing(func, args, mp_pool):
         if status:
             break
     assert status
+
+
+@pytest.mark.parametrize(
+    ["func", "args"],
+    [
+        [random_utils.uniform, [0, 1, 10]],
+        [random_utils.rand, [10, 10]],
+        [random_utils.randn, [10, 10]],
+        [random_utils.normal, [0, 1, 10]],
+        [random_utils.random, [10]],
+    ],
+)
+def test_float32_precision(func, args, float32_precision):
+    assert func(*args).dtype == np.float32
+    # scalar parameters are not affected
+    assert isinstance(random_utils.uniform(0, 1), float)
+
+
+def _draw_normal(size):
+    return random_utils.normal(0, 1, size)
+
+
+@pytest.mark.parametrize(
+    ["func", "args"],
+    [
+        [random_utils.uniform, [-(1 << 15), 1 << 15, 100]],
+        [random_utils.rand, [10, 10]],
+        [random_utils.randn, [10, 10]],
+        [random_utils.normal, [0, 1, 100]],
+        [random_utils.poisson, [1 << 15, 100]],
+        [random_utils.permutation, [np.arange(1000)]],
+        [random_utils.randint, [-(1 << 15), 1 << 15, 100]],
+        [random_utils.random, [100]],
+        [random_utils.choice, [np.arange(1000), 100]],
+    ],
+)
+def test_generator_backend_is_reproducible(func, args, generator_backend):
+    random_utils.seed(0)
+    first = func(*args)
+    random_utils.seed(0)
+    second = func(*args)
+    assert isinstance(random_utils.get_random_state(), np.random.Generator)
+    assert np.array_equal(first, second)
+    assert not np.array_equal(second, func(*args))
+
+
+def test_generator_backend_reuses_generator(generator_backend):
+    random_utils.seed(0)
+    assert random_utils.get_random_state() is random_utils.get_random_state()
+
+
+def test_generator_backend_float32_precision(generator_backend, float32_precision):
+    random_utils.seed(0)
+    res = random_utils.normal(1, 2, (1000, 10))
+    assert res.dtype == np.float32
+    assert abs(res.mean() - 1) < 0.1 and abs(res.std() - 2) < 0.1
+
+
+def test_generator_backend_threads(generator_backend):
+    def draw(out):
+        out.extend(random_utils.normal(0, 1, 10) for _ in range(10))
+
+    def run_in_thread():
+        out = []
+        thread = threading.Thread(target=draw, args=(out,))
+        thread.start()
+        thread.join()
+        return out
+
+    random_utils.seed(0)
+    first, second = run_in_thread(), run_in_thread()
+    random_utils.seed(0)
+    assert all(np.array_equal(a, b) for a, b in zip(first, run_in_thread()))
+    assert all(np.array_equal(a, b) for a, b in zip(second, run_in_thread()))
+    # every thread draws from its own stream
+    assert not any(np.array_equal(a, b) for a, b in zip(first, second))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_generator_backend_forked_workers_differ(generator_backend):
+    random_utils.seed(0)
+    random_utils.normal(0, 1, 10)
+    with multiprocessing.get_context("fork").Pool(2) as pool:
+        res = pool.map(_draw_normal, [10] * 2, chunksize=1)
+    assert not np.array_equal(res[0], res[1])
+
+
+def test_set_backend_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        random_utils.set_backend("mt19937")
+    assert random_utils.get_backend() == "legacy"
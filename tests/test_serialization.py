@@ -638,9 +638,24 @@ def test_serialization_v2_to_dict():
         "keypoint_params": None,
         "additional_targets": {},
         "is_check_shapes": True,
+        "fuse_affine": False,
+        "fuse_lut": False,
+        "inplace": False,
     }
 
 
+@pytest.mark.parametrize("compose_cls", [A.Compose, A.ReplayCompose])
+def test_compose_flags_serialization(compose_cls):
+    aug = compose_cls([A.HorizontalFlip(), A.Rotate()], fuse_affine=True, fuse_lut=True, inplace=True)
+    deserialized_aug = A.from_dict(A.to_dict(aug))
+    assert deserialized_aug.fuse_affine
+    assert deserialized_aug.fuse_lut
+    assert deserialized_aug.inplace
+    assert "fuse_affine=True" in repr(aug)
+    assert "fuse_lut=True" in repr(aug)
+    assert "inplace=True" in repr(aug)
+
+
 @pytest.mark.parametrize(
     ["class_fullname", "expected_short_class_name"],
     [
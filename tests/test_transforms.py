@@ -1,11 +1,13 @@
 import random
 from functools import partial
+from unittest import mock
 
 import cv2
 import numpy as np
 import pytest
 
 import dicaugment as A
+from dicaugment import random_utils
 import dicaugment.augmentations.functional as F
 import dicaugment.augmentations.geometric.functional as FGeometric
 from dicaugment.augmentations.blur.functional import gaussian_blur
@@ -548,6 +550,67 @@ def test_gauss_noise_incorrect_var_limit_type():
     assert str(exc_info.value) == message
 
 
+def test_gauss_noise_float32_noise():
+    image = np.random.randint(0, 1000, (10, 12, 8)).astype(np.uint16)
+    aug = A.GaussNoise(var_limit=(100, 100), mean=5, p=1)
+    params = aug.update_params(aug.get_params_dependent_on_targets({"image": image}), image=image)
+
+    assert params["gauss"].dtype == np.float32
+    expected = np.clip(image + params["gauss"] * params["sigma"] + params["mean"], 0, 65535).astype(np.uint16)
+    np.testing.assert_allclose(aug.apply(image, **params), expected, atol=1)
+
+
+@pytest.mark.parametrize("shape", [(10, 12, 8), (10, 12, 8, 3), (20, 12, 30)])
+def test_gauss_noise_noise_bank(shape):
+    image = np.zeros(shape, dtype=np.float32)
+    aug = A.GaussNoise(var_limit=(1, 1), noise_bank_shape=(16, 16, 16), p=1)
+
+    with mock.patch("dicaugment.random_utils.standard_normal", wraps=random_utils.standard_normal) as mocked:
+        windows = [
+            aug.update_params(aug.get_params_dependent_on_targets({"image": image}), image=image)["gauss"]
+            for _ in range(10)
+        ]
+    bank = aug._noise_bank
+
+    assert mocked.call_count == 1
+    assert bank.shape == tuple(max(16, i) for i in shape[:3])
+    for gauss in windows:
+        assert gauss.shape == shape
+        if gauss.ndim == 3:
+            assert np.shares_memory(gauss, bank)
+    assert not all(np.array_equal(windows[0], gauss) for gauss in windows[1:])
+
+
+def test_gauss_noise_apply_to_channel_idx():
+    image = np.random.randint(0, 1000, (10, 12, 8, 3)).astype(np.uint16)
+    aug = A.GaussNoise(var_limit=(100, 100), apply_to_channel_idx=1, p=1)
+
+    result = aug(image=image)["image"]
+
+    assert result.dtype == image.dtype
+    assert np.array_equal(result[..., [0, 2]], image[..., [0, 2]])
+    assert not np.array_equal(result[..., 1], image[..., 1])
+
+
+def test_gauss_noise_incorrect_noise_bank_shape():
+    with pytest.raises(ValueError):
+        A.GaussNoise(noise_bank_shape=(16, 16))
+
+
+@pytest.mark.parametrize("drop_value", [0, None])
+def test_pixel_dropout_legacy_mask_stream(drop_value):
+    image = np.random.randint(0, 256, (24, 28, 12), np.uint8)
+    random.seed(7)
+    # the mask is drawn as it was before it was saved as a seed
+    expected = np.random.RandomState(random.randint(0, 1 << 31)).choice([True, False], image.shape, p=[0.1, 0.9])
+
+    random.seed(7)
+    aug = A.PixelDropout(dropout_prob=0.1, drop_value=drop_value, p=1)
+    params = aug.get_params_dependent_on_targets({"image": image})
+    params = aug.update_params(params, image=image)
+    assert np.array_equal(params["drop_mask"].reshape(image.shape), expected)
+
+
 @pytest.mark.parametrize(
     ["blur_limit", "sigma", "result_blur", "result_sigma"],
     [
@@ -694,3 +757,36 @@ def test_bbox_clipping(
 
     res = transform(image=image, bboxes=bboxes)["bboxes"]
     assert np.isclose(res, expected).all()
+
+
+@pytest.mark.parametrize(
+    "augmentation",
+    [
+        A.Normalize(),
+        A.Normalize(mean=100, std=20),
+        A.RandomBrightnessContrast(p=1),
+        A.RandomBrightnessContrast(max_brightness=1000, p=1),
+        A.RandomGamma(p=1),
+        A.GaussNoise(p=1),
+        A.GaussNoise(per_channel=False, noise_bank_shape=(8, 8, 8), p=1),
+        A.InvertImg(p=1),
+        A.VerticalFlip(p=1),
+        A.HorizontalFlip(p=1),
+        A.SliceFlip(p=1),
+        A.Flip(p=1),
+    ],
+)
+@pytest.mark.parametrize("shape", [(6, 10, 12, 8), (6, 10, 12, 8, 2)])
+def test_apply_to_batch_matches_apply(augmentation, shape):
+    images = np.random.randint(0, 1000, shape).astype(np.uint16)
+    params = [
+        augmentation.update_params(augmentation.sample_params(force_apply=True, image=image), image=image)
+        for image in images
+    ]
+
+    expected = np.stack([augmentation.apply(image, **p) for image, p in zip(images, params)])
+    result = augmentation.apply_to_batch(images, params)
+
+    assert augmentation.is_batchable
+    assert result.dtype == expected.dtype
+    np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1)
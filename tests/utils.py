@@ -1,5 +1,7 @@
+import gc
 import inspect
 import random
+import tracemalloc
 import typing
 from io import StringIO
 from typing import Optional, Set, Type
@@ -61,6 +63,19 @@ class OpenMock:
         self.values[file] = value
 
 
+def peak_memory(func, *args, **kwargs):
+    # Returns the result of func(*args, **kwargs) and the peak number of bytes allocated during the call,
+    # as traced by tracemalloc, to which numpy reports the buffers of its arrays
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
 def set_seed(seed):
     random.seed(seed)
     np.random.seed(seed)